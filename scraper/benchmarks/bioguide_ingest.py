@@ -0,0 +1,59 @@
+"""
+Compare writing bioguide profiles one transaction per file against the batched
+UNWIND path.
+
+Runs against the database configured through the usual `VOTE_SCRAPER_*` environment
+variables. Both passes MERGE the same profiles, so the database ends up in the same state
+whichever order they run in.
+
+Usage:
+    python -m benchmarks.bioguide_ingest --limit 1000 --batch-size 250
+"""
+import argparse
+import logging
+from itertools import islice
+from time import perf_counter
+
+from scraper.settings import Settings
+from scraper.database import connect
+from scraper.schema import migrate
+from scraper.bioguide import open_bioguide_source, insert_bioguide_profile, insert_bioguide_profiles_batched
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=1000, help="Number of profiles to insert in each pass")
+    parser.add_argument("--batch-size", type=int, default=250, help="Profiles per transaction in the batched pass")
+    args = parser.parse_args()
+
+    settings = Settings.from_environs()
+    logging.basicConfig(level=logging.WARNING)
+
+    source = open_bioguide_source(settings.bioguide_path)
+    names = list(islice(source.names(), args.limit))
+    if len(names) == 0:
+        raise SystemExit(f"No bioguide profiles found in {settings.bioguide_path}")
+
+    driver = connect(settings)
+    migrate(driver)
+    with driver.session() as session:
+        start = perf_counter()
+        for name in names:
+            insert_bioguide_profile(source, name, session)
+        per_file = perf_counter() - start
+
+        start = perf_counter()
+        insert_bioguide_profiles_batched(source, names, session, args.batch_size)
+        batched = perf_counter() - start
+    driver.close()
+
+    print(f"profiles:  {len(names)}")
+    print(f"per-file:  {per_file:8.2f}s  {len(names) / per_file:8.1f} profiles/s")
+    print(f"batched:   {batched:8.2f}s  {len(names) / batched:8.1f} profiles/s  (batch size {args.batch_size})")
+    print(f"speedup:   {per_file / batched:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Compare profiles per second of the strict bioguide parser, which validates every field of a
+profile, against the lean parser, which reads only the fields written to the database, after
+checking that both lead to the same records.
+
+Reads every profile at `VOTE_SCRAPER_BIOGUIDE_PATH` into memory first, so only parsing is
+timed. Building the records costs the same whichever parser was used. No database is needed.
+
+Usage:
+    python -m benchmarks.bioguide_parse [--limit 1000]
+"""
+import argparse
+from itertools import islice
+from time import perf_counter
+from typing import Callable, List, Optional
+
+from scraper.settings import Settings
+from scraper.bioguide import AnyBioguideEntry, load_bioguide_entry, load_lean_bioguide_entry, open_bioguide_source, to_legislator_record
+
+
+def profiles_per_second(parse: Callable[[bytes], AnyBioguideEntry], profiles: List[bytes]) -> float:
+    start = perf_counter()
+    for raw in profiles:
+        parse(raw)
+    return len(profiles) / (perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=None, help="Number of profiles to parse. Defaults to every profile")
+    args = parser.parse_args()
+
+    settings = Settings.from_environs()
+    source = open_bioguide_source(settings.bioguide_path)
+    limit: Optional[int] = args.limit
+    profiles = [source.read(name) for name in islice(source.names(), limit)]
+    if len(profiles) == 0:
+        raise SystemExit(f"No bioguide profiles found in {settings.bioguide_path}")
+
+    for raw in profiles:
+        if to_legislator_record(load_bioguide_entry(raw)) != to_legislator_record(load_lean_bioguide_entry(raw)):
+            raise SystemExit(f"Parsers disagree on {load_bioguide_entry(raw).data.usCongressBioId}")
+
+    strict = profiles_per_second(load_bioguide_entry, profiles)
+    lean = profiles_per_second(load_lean_bioguide_entry, profiles)
+    megabytes = sum(len(raw) for raw in profiles) / 2**20
+
+    print(f"profiles:  {len(profiles)} ({megabytes:.1f} MB)")
+    print(f"strict:    {strict:8.1f} profiles/s  {len(profiles) / strict:8.2f}s")
+    print(f"lean:      {lean:8.1f} profiles/s  {len(profiles) / lean:8.2f}s")
+    print(f"speedup:   {lean / strict:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Measure per-roll-call insert latency of the House write path against the original
+statement-per-member implementation.
+
+Copies of `examples/call_the_house.xml` are written under a scratch congress number and
+deleted afterwards. The recorded votes still update each member's current state and party,
+so run this against a development database.
+
+Usage:
+    python -m benchmarks.house_insert --roll-calls 50 --votes-per-transaction 10
+"""
+import argparse
+import copy
+import logging
+from time import perf_counter
+from typing import List
+
+from neo4j import Transaction
+
+import scraper.models as models
+from scraper.settings import Settings
+from scraper.database import connect
+from scraper.schema import migrate
+from scraper.house import RollCallVote, parse_rollcall_vote, insert_votes, _parse_session
+
+SCRATCH_CONGRESS = 0
+
+
+def insert_single_vote_per_member(tx: Transaction, rc_vote: RollCallVote):
+    """The write path as it was before roll calls were written with a single UNWIND"""
+    roll_call_vote = models.RollCall(
+        chamber=models.Chamber.HOUSE_OF_REPS,
+        congress=rc_vote.vote_metadata.congress,
+        session=_parse_session(rc_vote.vote_metadata.session),
+        number=rc_vote.vote_metadata.rollcall_num,
+        when=rc_vote.vote_metadata.action_datetime,
+        question=rc_vote.vote_metadata.vote_question
+    )
+
+    tx.run("""
+        MERGE (rc: RollCall {
+            chamber: $rc.chamber,
+            congress: $rc.congress,
+            session: $rc.session,
+            number: $rc.number
+        })
+        ON CREATE SET rc = $rc
+        MERGE (c: Congress {number: $rc.congress})
+        MERGE (rc)-[:DURING_CONGRESS]->(c)
+    """, rc=roll_call_vote.model_dump(exclude_none=True))
+
+    for vote in rc_vote.vote_data:
+        voted_on = models.VotedOn(vote=vote.vote)
+        tx.run("""
+            MATCH (leg: Legislator {bioguide_id: $bioguide_id})
+                , (rc: RollCall {chamber: $rc.chamber, congress: $rc.congress, session: $rc.session, number: $rc.number})
+            MERGE (leg)-[vote: VOTED_ON]->(rc)
+            ON CREATE SET vote = $vote
+        """, bioguide_id=vote.id, rc=roll_call_vote.model_dump(exclude_none=True), vote=voted_on.model_dump(exclude_none=True))
+
+        tx.run("""
+            MATCH (l: Legislator { bioguide_id: $bioguide_id})
+            MATCH (new_state: State { code: $state })
+            MERGE (l)-[:CURRENTLY_REPRESENTS]->(new_state)
+            WITH l, new_state
+            MATCH (l)-[old_rep: CURRENTLY_REPRESENTS]->(old_state: State)
+            WHERE old_state.code <> new_state.code
+            DELETE old_rep
+        """, bioguide_id=vote.id, state=vote.state)
+
+        tx.run("""
+            MATCH (l: Legislator { bioguide_id: $bioguide_id})
+            MATCH (new_party: Party { abbreviation: $party })
+            MERGE (l)-[:CURRENTLY_MEMBER_OF]->(new_party)
+            WITH l, new_party
+            MATCH (l)-[old_membership: CURRENTLY_MEMBER_OF]->(old_party: State)
+            WHERE old_party.abbreviation <> new_party.abbreviation
+            DELETE old_membership
+        """, bioguide_id=vote.id, party=vote.party)
+
+
+def insert_votes_per_member(tx: Transaction, rc_votes: List[RollCallVote]):
+    for rc_vote in rc_votes:
+        insert_single_vote_per_member(tx, rc_vote)
+
+
+def scratch_roll_calls(template: RollCallVote, count: int, first_number: int) -> List[RollCallVote]:
+    roll_calls = []
+    for number in range(first_number, first_number + count):
+        roll_call = copy.deepcopy(template)
+        roll_call.vote_metadata.congress = SCRATCH_CONGRESS
+        roll_call.vote_metadata.rollcall_num = number
+        roll_calls.append(roll_call)
+    return roll_calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roll-calls", type=int, default=50, help="Number of roll calls to insert in each pass")
+    parser.add_argument("--votes-per-transaction", type=int, default=1, help="Roll calls committed together by the UNWIND pass")
+    args = parser.parse_args()
+
+    settings = Settings.from_environs()
+    logging.basicConfig(level=logging.WARNING)
+
+    with open("examples/call_the_house.xml", "rb") as f:
+        template = parse_rollcall_vote(f.read())
+
+    driver = connect(settings)
+    migrate(driver)
+    try:
+        with driver.session() as session:
+            before = scratch_roll_calls(template, args.roll_calls, 1)
+            start = perf_counter()
+            for roll_call in before:
+                session.execute_write(insert_votes_per_member, [roll_call])
+            per_member = perf_counter() - start
+
+            after = scratch_roll_calls(template, args.roll_calls, args.roll_calls + 1)
+            start = perf_counter()
+            for i in range(0, len(after), args.votes_per_transaction):
+                session.execute_write(insert_votes, after[i:i + args.votes_per_transaction])
+            unwind = perf_counter() - start
+    finally:
+        driver.execute_query("MATCH (rc: RollCall {congress: $congress}) DETACH DELETE rc", congress=SCRATCH_CONGRESS)
+        driver.execute_query("MATCH (c: Congress {number: $congress}) WHERE NOT (c)--() DELETE c", congress=SCRATCH_CONGRESS)
+        driver.close()
+
+    recorded = len(template.vote_data)
+    print(f"roll calls:        {args.roll_calls} x {recorded} recorded votes")
+    print(f"statement/member:  {per_member * 1000 / args.roll_calls:8.1f} ms per roll call")
+    print(f"single UNWIND:     {unwind * 1000 / args.roll_calls:8.1f} ms per roll call  ({args.votes_per_transaction} per transaction)")
+    print(f"speedup:           {per_member / unwind:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Micro-benchmarks of the parsers and models on the scrape and ingest paths, recorded per commit
+so that regressions in documents per second or memory show up between runs.
+
+Each case is timed for `--seconds` and then run once more under `tracemalloc` to measure the
+peak memory allocated by a single call. Results are appended to `--results` along with the
+current commit, and compared against the latest run recorded for a different commit, or for
+the commit given with `--baseline`. Throughput falling, or peak memory rising, by more than
+`--tolerance` is reported as a regression, and `--check` turns regressions into a failing
+exit status.
+
+Timings are only comparable between runs on the same machine, so the results file is not
+checked in.
+
+Usage:
+    python -m benchmarks.micro [--seconds 1] [--baseline COMMIT] [--check] [case ...]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import subprocess
+import tracemalloc
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
+
+from neo4j import Transaction
+
+import scraper.models as models
+from scraper import house, senate
+from scraper.bioguide import BioguideEntry, load_bioguide_entry, load_lean_bioguide_entry, to_legislator_record
+from scraper.senate.member_list import parse_contact_information
+
+from .parsers import HOUSE_EXAMPLE, SENATE_EXAMPLE, full_senate
+
+BIOGUIDE_EXAMPLE = "examples/sanders_bioguide.json"
+DEFAULT_RESULTS = "benchmarks/micro_results.jsonl"
+DEFAULT_TOLERANCE = 0.10
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[], object]
+
+
+@dataclass
+class Measurement:
+    docs_per_second: float
+    peak_bytes: int
+
+
+class _CapturingTransaction:
+    """Stands in for a transaction so the parameters of the insert paths can be built without a database"""
+
+    def __init__(self):
+        self.parameters: List[Dict[str, Any]] = []
+
+    def run(self, query: str, **parameters):
+        self.parameters.append(parameters)
+
+
+def capturing_transaction() -> Transaction:
+    # The insert paths only call `run`
+    return cast(Transaction, _CapturingTransaction())
+
+
+def contact_information(senate_doc: bytes) -> str:
+    """A senators_cfm.xml style member list with an entry for each senator on a Senate vote"""
+    members = []
+    for i, member in enumerate(re.findall(rb"<member>.*?</member>", senate_doc, re.DOTALL)):
+        fields = dict(re.findall(rb"<(\w+)>([^<]*)</\1>", member))
+        last_name = fields[b"last_name"].decode()
+        first_name = fields[b"first_name"].decode()
+        members.append(f"""
+            <member>
+                <member_full>{fields[b"member_full"].decode()}</member_full>
+                <last_name>{last_name}</last_name>
+                <first_name>{first_name}</first_name>
+                <party>{fields[b"party"].decode()}</party>
+                <state>{fields[b"state"].decode()}</state>
+                <address>{100 + i} Russell Senate Office Building Washington DC 20510</address>
+                <phone>(202) 224-{i:04d}</phone>
+                <email>https://www.{last_name.lower()}.senate.gov/contact</email>
+                <website>https://www.{last_name.lower()}.senate.gov</website>
+                <class>Class {"I" * (i % 3 + 1)}</class>
+                <bioguide_id>X{i:06d}</bioguide_id>
+            </member>""")
+    return f"<contact_information>{''.join(members)}<last_updated>Thursday, January 9, 2025</last_updated></contact_information>"
+
+
+def house_insert_parameters(vote: house.RollCallVote):
+    house.insert_single_vote(capturing_transaction(), vote)
+
+
+def senate_insert_parameters(vote: senate.RollCallVote):
+    voters = [
+        {
+            'bioguide_id': member.id,
+            'state': member.state,
+            'party': member.party,
+            'voted_on': models.VotedOn(vote=member.vote).model_dump(exclude_none=True),
+        }
+        for member in vote.members
+    ]
+    senate.insert_single_vote(capturing_transaction(), vote, voters)
+
+
+def cases() -> List[Case]:
+    with open(HOUSE_EXAMPLE, "rb") as f:
+        house_doc = f.read()
+    with open(SENATE_EXAMPLE, "rb") as f:
+        senate_doc = full_senate(f.read())
+    with open(BIOGUIDE_EXAMPLE, "rb") as f:
+        bioguide_doc = f.read()
+
+    members_doc = contact_information(senate_doc)
+    house_vote = house.parse_rollcall_vote(house_doc)
+    senate_vote = senate.parse_roll_call_vote(senate_doc)
+    bioguide_entry = load_bioguide_entry(bioguide_doc)
+
+    return [
+        Case("house.parse_rollcall_vote", lambda: house.parse_rollcall_vote(house_doc)),
+        Case("senate.parse_roll_call_vote", lambda: senate.parse_roll_call_vote(senate_doc)),
+        Case("member_list.parse_contact_information", lambda: parse_contact_information(members_doc)),
+        Case("bioguide.load_bioguide_entry", lambda: load_bioguide_entry(bioguide_doc)),
+        Case("bioguide.BioguideEntry.model_validate_json", lambda: BioguideEntry.model_validate_json(bioguide_doc)),
+        Case("bioguide.load_lean_bioguide_entry", lambda: load_lean_bioguide_entry(bioguide_doc)),
+        Case("bioguide.to_legislator_record", lambda: to_legislator_record(bioguide_entry)),
+        Case("house.insert_single_vote parameters", lambda: house_insert_parameters(house_vote)),
+        Case("senate.insert_single_vote parameters", lambda: senate_insert_parameters(senate_vote)),
+    ]
+
+
+def peak_bytes(run: Callable[[], object]) -> int:
+    """Peak memory allocated while `run` is called once, including whatever it returns"""
+    tracemalloc.start()
+    try:
+        result = run()
+        _, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def calls_per_second(run: Callable[[], object], seconds: float) -> float:
+    count = 0
+    start = perf_counter()
+    while (elapsed := perf_counter() - start) < seconds:
+        run()
+        count += 1
+    return count / elapsed
+
+
+def measure(case: Case, seconds: float) -> Measurement:
+    case.run()
+    return Measurement(
+        docs_per_second=calls_per_second(case.run, seconds),
+        peak_bytes=peak_bytes(case.run),
+    )
+
+
+def git_commit() -> Tuple[Optional[str], bool]:
+    """The checked out commit, and whether the working tree has uncommitted changes"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, status != ""
+
+
+def load_runs(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_baseline(runs: List[Dict[str, Any]], commit: Optional[str], baseline: Optional[str]) -> Optional[Dict[str, Any]]:
+    for run in reversed(runs):
+        if baseline is not None:
+            if run["commit"] is not None and run["commit"].startswith(baseline):
+                return run
+        elif run["commit"] != commit:
+            return run
+    return None
+
+
+def change(before: float, after: float) -> float:
+    return (after - before) / before if before else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cases", nargs="*", help="Only run cases whose name contains one of these")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time spent on each case")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="JSON lines file runs are appended to")
+    parser.add_argument("--baseline", help="Compare against the latest run of this commit")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Fractional change reported as a regression")
+    parser.add_argument("--no-save", action="store_true", help="Don't append this run to the results")
+    parser.add_argument("--check", action="store_true", help="Exit with an error if any case regressed")
+    args = parser.parse_args()
+
+    selected = [case for case in cases() if not args.cases or any(pattern in case.name for pattern in args.cases)]
+    commit, dirty = git_commit()
+    baseline = find_baseline(load_runs(args.results), commit, args.baseline)
+    previous: Dict[str, Dict[str, float]] = baseline["results"] if baseline is not None else {}
+    if baseline is not None:
+        print(f"Comparing against {baseline['commit']}{' (dirty)' if baseline['dirty'] else ''} from {baseline['recorded_at']}")
+
+    results: Dict[str, Dict[str, float]] = {}
+    regressions: List[str] = []
+    print(f"{'case':<45} {'docs/s':>10} {'change':>8} {'peak KiB':>10} {'change':>8}")
+    for case in selected:
+        measurement = measure(case, args.seconds)
+        results[case.name] = {"docs_per_second": measurement.docs_per_second, "peak_bytes": measurement.peak_bytes}
+
+        line = f"{case.name:<45} {measurement.docs_per_second:>10.0f}"
+        before = previous.get(case.name)
+        if before is None:
+            print(f"{line} {'':>8} {measurement.peak_bytes / 1024:>10.1f}")
+            continue
+
+        speed = change(before["docs_per_second"], measurement.docs_per_second)
+        memory = change(before["peak_bytes"], measurement.peak_bytes)
+        regressed = speed < -args.tolerance or memory > args.tolerance
+        if regressed:
+            regressions.append(case.name)
+        print(f"{line} {speed:>+8.1%} {measurement.peak_bytes / 1024:>10.1f} {memory:>+8.1%}{'  REGRESSION' if regressed else ''}")
+
+    if not args.no_save:
+        with open(args.results, "a") as f:
+            f.write(json.dumps({
+                "commit": commit,
+                "dirty": dirty,
+                "recorded_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.node(),
+                "results": results,
+            }) + "\n")
+
+    if args.check and regressions:
+        raise SystemExit(f"{len(regressions)} case(s) regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure how roll call write throughput scales with the number of database writers.
+
+Copies of `examples/call_the_house.xml` are written under a scratch congress number with 1, 2,
+4, ... writers in turn, partitioned by roll call the way `RollCallWriter` does, and deleted
+afterwards. Only the roll calls and their votes are written, not the voters' current state
+and party or the scrape cursor, which `RollCallWriter` finishes in order on a single session.
+
+Usage:
+    python -m benchmarks.parallel_writers --roll-calls 200 --writers 1 2 4 8
+"""
+import argparse
+import logging
+from concurrent.futures import Future
+from operator import itemgetter
+from time import perf_counter
+from typing import List
+
+from scraper import metrics
+from scraper.settings import Settings
+from scraper.database import connect, insert_roll_call_votes
+from scraper.schema import migrate
+from scraper.house import parse_rollcall_vote, roll_call_parameters
+from scraper.writers import ParallelWriter
+
+SCRATCH_CONGRESS = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roll-calls", type=int, default=200, help="Number of roll calls written by each pass")
+    parser.add_argument("--votes-per-transaction", type=int, default=1, help="Roll calls committed together")
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 2, 4, 8], help="Number of writers in each pass")
+    args = parser.parse_args()
+
+    settings = Settings.from_environs()
+    logging.basicConfig(level=logging.WARNING)
+
+    with open("examples/call_the_house.xml", "rb") as f:
+        rc, votes = roll_call_parameters(parse_rollcall_vote(f.read()))
+    votes = sorted(votes, key=itemgetter('bioguide_id'))
+
+    driver = connect(settings)
+    migrate(driver)
+    results = []
+    try:
+        first_number = 1
+        for writers in args.writers:
+            numbers = range(first_number, first_number + args.roll_calls)
+            first_number += args.roll_calls
+            deadlocks_before = metrics.REGISTRY.totals(metrics.TRANSACTION_DEADLOCKS, by='stage').get('benchmark', (0.0, 0))[0]
+
+            start = perf_counter()
+            with ParallelWriter(driver, 'benchmark', writers) as writer:
+                futures: List[Future] = []
+                for i in range(0, len(numbers), args.votes_per_transaction):
+                    chunk = [({**rc, 'congress': SCRATCH_CONGRESS, 'number': number}, votes) for number in numbers[i:i + args.votes_per_transaction]]
+                    futures.append(writer.submit(chunk[-1][0]['number'], insert_roll_call_votes, chunk, rows=len(chunk)))
+                for future in futures:
+                    future.result()
+            elapsed = perf_counter() - start
+
+            deadlocks = metrics.REGISTRY.totals(metrics.TRANSACTION_DEADLOCKS, by='stage').get('benchmark', (0.0, 0))[0] - deadlocks_before
+            results.append((writers, args.roll_calls / elapsed, deadlocks))
+    finally:
+        driver.execute_query("MATCH (rc: RollCall {congress: $congress}) DETACH DELETE rc", congress=SCRATCH_CONGRESS)
+        driver.execute_query("MATCH (c: Congress {number: $congress}) WHERE NOT (c)--() DELETE c", congress=SCRATCH_CONGRESS)
+        driver.close()
+
+    print(f"roll calls:  {args.roll_calls} x {len(votes)} recorded votes per pass, {args.votes_per_transaction} per transaction")
+    print(f"{'writers':>8} {'roll calls/s':>14} {'speedup':>8} {'deadlocks':>10}")
+    baseline = results[0][1]
+    for writers, throughput, deadlocks in results:
+        print(f"{writers:>8} {throughput:>14.1f} {throughput / baseline:>7.2f}x {int(deadlocks):>10}")
+
+
+if __name__ == "__main__":
+    main()
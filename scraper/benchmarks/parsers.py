@@ -0,0 +1,164 @@
+"""
+Measure documents per second of the House and Senate roll call parsers.
+
+Senate documents are also parsed with `parse_roll_call_vote_before`, a copy of the Senate
+parser as it was before it looked up each section once and read fields with `findtext`, so the
+change shows up as documents per second before and after. Both must parse every document the
+same.
+
+Parses `examples/call_the_house.xml` and `examples/senate_roll_call.xml`, plus a copy of the
+Senate example padded out to a full chamber of 100 senators. Further House or Senate vote
+documents, e.g. ones saved from clerk.house.gov or senate.gov, can be passed as arguments.
+
+Usage:
+    python -m benchmarks.parsers [--seconds 2] [vote.xml ...]
+"""
+import argparse
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from time import perf_counter
+from typing import Callable, List, Tuple, no_type_check
+
+from scraper.house import parse_rollcall_vote
+from scraper.recorded_votes import RecordedVotes
+from scraper.senate import Amendment, Count, Document, RollCallVote, TieBreaker, parse_roll_call_vote
+
+HOUSE_EXAMPLE = "examples/call_the_house.xml"
+SENATE_EXAMPLE = "examples/senate_roll_call.xml"
+SENATE_SIZE = 100
+
+
+@no_type_check
+def parse_roll_call_vote_before(xml_string: bytes | str) -> RollCallVote:
+    root = ET.fromstring(xml_string)
+
+    def get_text(element, tag):
+        return element.find(tag).text if element.find(tag) is not None else None
+
+    document = Document(
+        document_congress=int(get_text(root.find("document"), "document_congress")),
+        document_type=get_text(root.find("document"), "document_type"),
+        document_number=get_text(root.find("document"), "document_number"),
+        document_name=get_text(root.find("document"), "document_name"),
+        document_title=get_text(root.find("document"), "document_title"),
+        document_short_title=get_text(root.find("document"), "document_short_title"),
+    )
+
+    amendment = Amendment(
+        amendment_number=get_text(root.find("amendment"), "amendment_number"),
+        amendment_to_amendment_number=get_text(
+            root.find("amendment"), "amendment_to_amendment_number"
+        ),
+        amendment_to_amendment_to_amendment_number=get_text(
+            root.find("amendment"), "amendment_to_amendment_to_amendment_number"
+        ),
+        amendment_to_document_number=get_text(
+            root.find("amendment"), "amendment_to_document_number"
+        ),
+        amendment_to_document_short_title=get_text(
+            root.find("amendment"), "amendment_to_document_short_title"
+        ),
+        amendment_purpose=get_text(root.find("amendment"), "amendment_purpose"),
+    )
+
+    yeas = get_text(root.find("count"), "yeas")
+    nays = get_text(root.find("count"), "nays")
+    present = get_text(root.find("count"), "present")
+    absent = get_text(root.find("count"), "absent")
+
+    count = Count(
+        yeas=yeas and int(yeas),
+        nays=nays and int(nays),
+        present=present and int(present),
+        absent=absent and int(absent),
+    )
+
+    tie_breaker = TieBreaker(
+        by_whom=get_text(root.find("tie_breaker"), "by_whom"),
+        tie_breaker_vote=get_text(root.find("tie_breaker"), "tie_breaker_vote"),
+    )
+
+    members = RecordedVotes()
+    for member in root.find("members").findall("member"):
+        members.append(
+            id=get_text(member, "lis_member_id"),
+            name=get_text(member, "last_name"),
+            party=get_text(member, "party"),
+            state=get_text(member, "state"),
+            vote=get_text(member, "vote_cast"),
+        )
+
+    return RollCallVote(
+        congress=int(get_text(root, "congress")),
+        session=int(get_text(root, "session")),
+        congress_year=int(get_text(root, "congress_year")),
+        vote_number=int(get_text(root, "vote_number")),
+        vote_date=datetime.strptime(get_text(root, "vote_date"), "%B %d, %Y, %I:%M %p"),
+        modify_date=get_text(root, "modify_date"),
+        vote_question_text=get_text(root, "vote_question_text"),
+        vote_document_text=get_text(root, "vote_document_text"),
+        vote_result_text=get_text(root, "vote_result_text"),
+        question=get_text(root, "question"),
+        vote_title=get_text(root, "vote_title"),
+        majority_requirement=get_text(root, "majority_requirement"),
+        vote_result=get_text(root, "vote_result"),
+        document=document,
+        amendment=amendment,
+        count=count,
+        tie_breaker=tie_breaker,
+        members=members,
+    )
+
+
+def full_senate(doc: bytes) -> bytes:
+    """Repeat the members of a Senate vote until there are 100 of them"""
+    members = re.findall(rb"<member>.*?</member>\s*", doc, re.DOTALL)
+    padded = b"".join(members[i % len(members)] for i in range(SENATE_SIZE))
+    return re.sub(rb"<members>.*</members>", b"<members>\n" + padded + b"</members>", doc, flags=re.DOTALL)
+
+
+def docs_per_second(parse: Callable[[bytes], object], doc: bytes, seconds: float) -> float:
+    count = 0
+    start = perf_counter()
+    while (elapsed := perf_counter() - start) < seconds:
+        parse(doc)
+        count += 1
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("documents", nargs="*", help="Additional House or Senate vote XML files")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Time spent on each parser and document")
+    args = parser.parse_args()
+
+    with open(HOUSE_EXAMPLE, "rb") as f:
+        house_example = f.read()
+    with open(SENATE_EXAMPLE, "rb") as f:
+        senate_example = f.read()
+
+    samples: List[Tuple[str, bytes]] = [
+        (HOUSE_EXAMPLE, house_example),
+        (SENATE_EXAMPLE, senate_example),
+        (f"{SENATE_EXAMPLE} x{SENATE_SIZE}", full_senate(senate_example)),
+    ]
+    for path in args.documents:
+        with open(path, "rb") as f:
+            samples.append((path, f.read()))
+
+    print(f"{'document':<45} {'before':>12} {'after':>12} {'change':>8}")
+    for name, doc in samples:
+        if b"<rollcall-vote>" in doc:
+            print(f"{name:<45} {'':>12} {docs_per_second(parse_rollcall_vote, doc, args.seconds):>10.0f}/s")
+            continue
+
+        if parse_roll_call_vote_before(doc) != parse_roll_call_vote(doc):
+            raise SystemExit(f"The Senate parsers disagree on {name}")
+        before = docs_per_second(parse_roll_call_vote_before, doc, args.seconds)
+        after = docs_per_second(parse_roll_call_vote, doc, args.seconds)
+        print(f"{name:<45} {before:>10.0f}/s {after:>10.0f}/s {after / before - 1:>+8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Measure end to end ingest speed by running the scraper's whole `__main__` flow against a
+synthetic data set served locally, and report recorded votes ingested per second.
+
+The data set is generated with `benchmarks.synthetic` into `--data`, or a temporary directory,
+and served by `benchmarks.stand_in`. Everything else, including the Neo4j connection, comes
+from the usual `VOTE_SCRAPER_*` environment variables. The scraper resumes from whatever the
+database already holds, so point this at an empty, disposable database, or pass `--reset` to
+delete everything in it first.
+
+Usage:
+    python -m benchmarks.scale [--reset] [--congresses 2] [--house-votes 200] [--senate-votes 100]
+"""
+import argparse
+import dataclasses
+import logging
+import tempfile
+from time import perf_counter
+from typing import Dict
+
+from neo4j import Driver
+
+from scraper.settings import Settings
+from scraper.database import connect
+from scraper.__main__ import main as run_scraper
+
+from .synthetic import BIOGUIDE_PATH, add_spec_arguments, generate, spec_from_arguments, year_of
+from .stand_in import StandIn
+
+
+def counts(driver: Driver) -> Dict[str, int]:
+    records, _, _ = driver.execute_query("""
+        CALL { MATCH (l: Legislator) RETURN count(l) AS legislators }
+        CALL { MATCH (rc: RollCall) RETURN count(rc) AS roll_calls }
+        CALL { MATCH (:Legislator)-[v:VOTED_ON]->(:RollCall) RETURN count(v) AS votes }
+        RETURN legislators, roll_calls, votes
+    """)
+    return records[0].data()
+
+
+def reset(driver: Driver):
+    """Delete every node, leaving the schema in place"""
+    with driver.session() as session:
+        session.run("""
+            MATCH (n)
+            CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS
+        """).consume()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", help="Directory to generate the data set in. A temporary directory if not given")
+    parser.add_argument("--reset", action="store_true", help="Delete everything in the database before scraping")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    settings = Settings.from_environs()
+    logging.basicConfig(level=settings.log_level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    spec = spec_from_arguments(args)
+
+    with tempfile.TemporaryDirectory() as temporary:
+        root = args.data or temporary
+        start = perf_counter()
+        data = generate(root, spec)
+        print(f"generated: {data.files} files in {perf_counter() - start:.1f}s")
+
+        driver = connect(settings)
+        if args.reset:
+            reset(driver)
+        before = counts(driver)
+
+        with StandIn(root) as server:
+            settings = dataclasses.replace(
+                settings,
+                house_url=server.house_url,
+                senate_url=server.senate_url,
+                senate_member_url=server.senate_member_url,
+                senate_vote_menu_url=server.senate_vote_menu_url,
+                bioguide_path=f"{root}/{BIOGUIDE_PATH}",
+                resume_year=year_of(spec.first_congress, 1),
+                resume_congress=spec.first_congress,
+                crawl_delay_seconds=0,
+                http_cache_path=None,
+                replay_archive=False,
+            )
+            start = perf_counter()
+            run_scraper(settings)
+            elapsed = perf_counter() - start
+
+        after = counts(driver)
+        driver.close()
+
+    roll_calls = after["roll_calls"] - before["roll_calls"]
+    votes = after["votes"] - before["votes"]
+    print(f"legislators: {after['legislators'] - before['legislators']:>10}")
+    print(f"roll calls:  {roll_calls:>10}  of {data.house_roll_calls + data.senate_roll_calls} generated")
+    print(f"votes:       {votes:>10}  of {data.recorded_votes} generated")
+    print(f"elapsed:     {elapsed:>10.1f}s")
+    print(f"throughput:  {votes / elapsed:>10.0f} votes/s  {roll_calls / elapsed:.1f} roll calls/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Serve a data set written by `benchmarks.synthetic` over HTTP, standing in for clerk.house.gov
+and senate.gov.
+
+Files are served from the same paths the real sites use, so pointing the scraper's URL settings
+at `http://host:port/evs`, `http://host:port/legislative/LIS/roll_call_votes` and
+`http://host:port/general/contact_information/senators_cfm.xml`, and the vote menu URL at
+`http://host:port/legislative/LIS/roll_call_lists`, scrapes them. Missing House votes are a 404,
+while missing Senate votes and vote menus are the HTML page senate.gov answers with instead.
+Files are sent gzip-compressed when the client accepts it, with an `ETag` and `Last-Modified`
+that conditional requests are answered with 304 for.
+
+Usage:
+    python -m benchmarks.stand_in data [--port 8080]
+"""
+import argparse
+import email.utils
+import gzip
+import os
+import posixpath
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Self
+from urllib.parse import unquote, urlsplit
+
+from .synthetic import HOUSE_PATH, SENATE_PATH, SENATE_MEMBER_LIST_PATH, SENATE_VOTE_MENU_PATH
+
+SENATE_NOT_FOUND_PAGE = b"""<!DOCTYPE html>
+<html lang="en">
+<head><title>U.S. Senate: Page Not Found</title></head>
+<body><h1>Page Not Found</h1><p>The page you requested could not be found.</p></body>
+</html>
+"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StandIn"
+
+    def do_GET(self):
+        path = posixpath.normpath(unquote(urlsplit(self.path).path)).lstrip("/")
+        full_path = os.path.join(self.server.root, *path.split("/"))
+
+        if not path.startswith(".") and os.path.isfile(full_path):
+            self._respond_with_file(full_path)
+        elif path.startswith((SENATE_PATH, SENATE_VOTE_MENU_PATH)):
+            self._respond(200, "text/html; charset=UTF-8", SENATE_NOT_FOUND_PAGE)
+        else:
+            self._respond(404, "text/html; charset=UTF-8", b"<!DOCTYPE html><html><body>Not Found</body></html>")
+
+    def _respond_with_file(self, full_path: str):
+        stat = os.stat(full_path)
+        validators = {
+            "ETag": f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+            "Last-Modified": email.utils.formatdate(stat.st_mtime, usegmt=True),
+        }
+        if self._not_modified(validators["ETag"], int(stat.st_mtime)):
+            self.send_response(304)
+            for name, value in validators.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+
+        with open(full_path, "rb") as f:
+            body = f.read()
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            validators["Content-Encoding"] = "gzip"
+        self._respond(200, "application/xml", body, validators)
+
+    def _not_modified(self, etag: str, modified: int) -> bool:
+        if "If-None-Match" in self.headers:
+            return self.headers["If-None-Match"] == etag
+        if "If-Modified-Since" in self.headers:
+            try:
+                since = email.utils.parsedate_to_datetime(self.headers["If-Modified-Since"])
+            except (TypeError, ValueError):
+                return False
+            return modified <= since.timestamp()
+        return False
+
+    def _respond(self, status: int, content_type: str, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandIn(ThreadingHTTPServer):
+    """HTTP server for a synthetic data set, run on a background thread"""
+    daemon_threads = True
+    handler_class = _Handler
+
+    def __init__(self, root: str, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), self.handler_class)
+        self.root = root
+        self.host = host
+        self._thread = threading.Thread(target=self.serve_forever, name="stand-in", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        # `server_port` is the port bound, when `port` was 0
+        return f"http://{self.host}:{self.server_port}"
+
+    @property
+    def house_url(self) -> str:
+        return f"{self.base_url}/{HOUSE_PATH}"
+
+    @property
+    def senate_url(self) -> str:
+        return f"{self.base_url}/{SENATE_PATH}"
+
+    @property
+    def senate_member_url(self) -> str:
+        return f"{self.base_url}/{SENATE_MEMBER_LIST_PATH}"
+
+    @property
+    def senate_vote_menu_url(self) -> str:
+        return f"{self.base_url}/{SENATE_VOTE_MENU_PATH}"
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data", help="Directory written by benchmarks.synthetic")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    with StandIn(args.data, args.host, args.port) as server:
+        print(f"Serving {args.data} at {server.base_url}")
+        print(f"VOTE_SCRAPER_HOUSE_URL={server.house_url}")
+        print(f"VOTE_SCRAPER_SENATE_URL={server.senate_url}")
+        print(f"VOTE_SCRAPER_SENATE_MEMBER_URL={server.senate_member_url}")
+        print(f"VOTE_SCRAPER_SENATE_VOTE_MENU_URL={server.senate_vote_menu_url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+"""
+Generate a deterministic synthetic data set for exercising the scraper end to end without
+crawling clerk.house.gov or senate.gov.
+
+Produces House EVS roll call XML, Senate LIS roll call XML, the Senate's member contact list
+and a bioguide profile for every member, laid out under `output` the way the real sites lay
+out their URLs:
+
+    evs/{year}/roll{number:03}.xml
+    evs/{year}/index.asp
+    evs/{year}/ROLL_{hundreds:03}.asp
+    legislative/LIS/roll_call_votes/vote{congress}{session}/vote_{congress}_{session}_{number:05}.xml
+    legislative/LIS/roll_call_lists/vote_menu_{congress}_{session}.xml
+    general/contact_information/senators_cfm.xml
+    bioguide/{bioguide_id}.json
+
+The same seed and sizes always produce identical files. See `benchmarks.stand_in` to serve
+them and `benchmarks.scale` to scrape them into a database.
+
+Usage:
+    python -m benchmarks.synthetic output [--congresses 1] [--house-votes 100] [--senate-votes 50]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple
+from xml.sax.saxutils import escape
+
+HOUSE_PATH = "evs"
+SENATE_PATH = "legislative/LIS/roll_call_votes"
+SENATE_VOTE_MENU_PATH = "legislative/LIS/roll_call_lists"
+SENATE_MEMBER_LIST_PATH = "general/contact_information/senators_cfm.xml"
+BIOGUIDE_PATH = "bioguide"
+
+STATES = (
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA", "HI", "ID", "IL", "IN", "IA", "KS", "KY",
+    "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ", "NM", "NY", "NC", "ND",
+    "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
+)
+# Bioguide party name, abbreviation used on roll calls, and share of members
+PARTIES = (("Republican", "R", 0.49), ("Democrat", "D", 0.49), ("Independent", "I", 0.02))
+SYLLABLES = (
+    "al", "ber", "cas", "den", "el", "for", "gan", "hal", "is", "jor", "kel", "lan", "mar", "nor",
+    "os", "per", "quin", "ros", "sten", "tor", "ul", "van", "wes", "yor", "zan",
+)
+GIVEN_NAMES = ("Alex", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Drew")
+# Some family names are accented, so matching on unaccented names is exercised too
+ACCENTS = {"a": "á", "e": "é", "o": "ó", "u": "ú"}
+
+# Chance of a member not voting, and of voting against their party's position
+NOT_VOTING_RATE = 0.03
+DEFECTION_RATE = 0.08
+
+
+@dataclass(frozen=True)
+class Spec:
+    first_congress: int = 118
+    congresses: int = 1
+    sessions: int = 2
+    house_members: int = 435
+    senators: int = 100
+    house_votes_per_session: int = 100
+    senate_votes_per_session: int = 50
+    seed: int = 0
+
+
+@dataclass
+class Member:
+    bioguide_id: str
+    family_name: str
+    given_name: str
+    party: str
+    party_abbreviation: str
+    state: str
+    senator: bool
+    lis_member_id: str = ""
+
+    @property
+    def unaccented_family_name(self) -> str:
+        return "".join({accented: plain for plain, accented in ACCENTS.items()}.get(c, c) for c in self.family_name)
+
+
+@dataclass
+class DataSet:
+    spec: Spec
+    members: List[Member] = field(default_factory=list)
+    files: int = 0
+    house_roll_calls: int = 0
+    senate_roll_calls: int = 0
+    recorded_votes: int = 0
+
+
+def year_of(congress: int, session: int) -> int:
+    """Inverse of `house.congress_and_session_for_year`"""
+    return 1787 + 2 * congress + session - 1
+
+
+def _members(spec: Spec, rng: random.Random) -> List[Member]:
+    family_names = set()
+    members = []
+    for i in range(spec.house_members + spec.senators):
+        while True:
+            family_name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+            if rng.random() < 0.05:
+                vowel = next((c for c in family_name if c in ACCENTS), None)
+                if vowel is not None:
+                    family_name = family_name.replace(vowel, ACCENTS[vowel], 1)
+            if family_name not in family_names:
+                family_names.add(family_name)
+                break
+
+        party, abbreviation = rng.choices([(name, abbreviation) for name, abbreviation, _ in PARTIES], [share for _, _, share in PARTIES])[0]
+        senator = i >= spec.house_members
+        member = Member(
+            bioguide_id=f"{family_name[0].upper() if family_name[0].isascii() else 'X'}{i:06d}",
+            family_name=family_name,
+            given_name=rng.choice(GIVEN_NAMES),
+            party=party,
+            party_abbreviation=abbreviation,
+            state=STATES[(i - spec.house_members) // 2 % len(STATES)] if senator else STATES[i % len(STATES)],
+            senator=senator,
+        )
+        if senator:
+            member.lis_member_id = f"S{i - spec.house_members + 100:03d}"
+        members.append(member)
+    return members
+
+
+def _votes(members: List[Member], rng: random.Random) -> Iterator[Tuple[Member, str]]:
+    """A vote for each member, most voting with the position their party takes"""
+    positions = {abbreviation: rng.choice(("Yea", "Nay")) for _, abbreviation, _ in PARTIES}
+    for member in members:
+        roll = rng.random()
+        if roll < NOT_VOTING_RATE:
+            yield member, "Not Voting"
+        elif roll < NOT_VOTING_RATE + DEFECTION_RATE:
+            yield member, "Nay" if positions[member.party_abbreviation] == "Yea" else "Yea"
+        else:
+            yield member, positions[member.party_abbreviation]
+
+
+def _when(year: int, number: int, votes_per_session: int) -> datetime.datetime:
+    day = (number - 1) * 360 // max(votes_per_session, 1)
+    return datetime.datetime(year, 1, 3, 10) + datetime.timedelta(days=day, minutes=7 * (number % 60))
+
+
+def house_roll_call(congress: int, session: int, number: int, when: datetime.datetime, votes: List[Tuple[Member, str]]) -> str:
+    recorded_votes = "".join(
+        f'<recorded-vote><legislator name-id="{m.bioguide_id}" sort-field="{escape(m.family_name)}" '
+        f'unaccented-name="{m.unaccented_family_name}" party="{m.party_abbreviation}" state="{m.state}" '
+        f'role="legislator">{escape(m.family_name)}</legislator><vote>{vote}</vote></recorded-vote>\n'
+        for m, vote in votes
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rollcall-vote>
+<vote-metadata>
+<majority>R</majority>
+<congress>{congress}</congress>
+<session>{"1st" if session == 1 else "2nd"}</session>
+<chamber>U.S. House of Representatives</chamber>
+<rollcall-num>{number}</rollcall-num>
+<legis-num>H R {number}</legis-num>
+<vote-question>On Passage</vote-question>
+<vote-type>YEA-AND-NAY</vote-type>
+<vote-result>Passed</vote-result>
+<action-date>{when.day}-{when.strftime("%b-%Y")}</action-date>
+<action-time time-etz="{when.strftime("%H:%M")}">{when.strftime("%I:%M %p")}</action-time>
+<vote-desc>Synthetic House roll call {number}</vote-desc>
+</vote-metadata>
+<vote-data>
+{recorded_votes}</vote-data>
+</rollcall-vote>
+"""
+
+
+def senate_roll_call(congress: int, session: int, number: int, when: datetime.datetime, votes: List[Tuple[Member, str]]) -> str:
+    members = "".join(
+        f"""<member>
+<member_full>{escape(m.family_name)} ({m.party_abbreviation}-{m.state})</member_full>
+<last_name>{escape(m.family_name)}</last_name>
+<first_name>{m.given_name}</first_name>
+<party>{m.party_abbreviation}</party>
+<state>{m.state}</state>
+<vote_cast>{vote}</vote_cast>
+<lis_member_id>{m.lis_member_id}</lis_member_id>
+</member>
+"""
+        for m, vote in votes
+    )
+    yeas = sum(vote == "Yea" for _, vote in votes)
+    nays = sum(vote == "Nay" for _, vote in votes)
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<roll_call_vote>
+<congress>{congress}</congress>
+<session>{session}</session>
+<congress_year>{when.year}</congress_year>
+<vote_number>{number}</vote_number>
+<vote_date>{when.strftime("%B %d, %Y, %I:%M %p")}</vote_date>
+<modify_date>{when.strftime("%B %d, %Y, %I:%M %p")}</modify_date>
+<vote_question_text>On Passage of the Bill S. {number}</vote_question_text>
+<vote_document_text>Synthetic Senate roll call {number}</vote_document_text>
+<vote_result_text>Bill Passed ({yeas}-{nays})</vote_result_text>
+<question>On Passage of the Bill</question>
+<vote_title>Synthetic Senate roll call {number}</vote_title>
+<majority_requirement>1/2</majority_requirement>
+<vote_result>Bill Passed</vote_result>
+<document>
+<document_congress>{congress}</document_congress>
+<document_type>S.</document_type>
+<document_number>{number}</document_number>
+<document_name>S. {number}</document_name>
+<document_title>Synthetic Senate roll call {number}</document_title>
+<document_short_title></document_short_title>
+</document>
+<amendment>
+<amendment_number></amendment_number>
+<amendment_to_amendment_number></amendment_to_amendment_number>
+<amendment_to_amendment_to_amendment_number></amendment_to_amendment_to_amendment_number>
+<amendment_to_document_number></amendment_to_document_number>
+<amendment_to_document_short_title></amendment_to_document_short_title>
+<amendment_purpose></amendment_purpose>
+</amendment>
+<count>
+<yeas>{yeas}</yeas>
+<nays>{nays}</nays>
+<present></present>
+<absent>{len(votes) - yeas - nays}</absent>
+</count>
+<tie_breaker>
+<by_whom></by_whom>
+<tie_breaker_vote></tie_breaker_vote>
+</tie_breaker>
+<members>
+{members}</members>
+</roll_call_vote>
+"""
+
+
+def senate_vote_menu(congress: int, session: int, year: int, votes: List[Tuple[int, datetime.datetime]]) -> str:
+    listed = "".join(
+        f"""<vote>
+<vote_number>{number:05}</vote_number>
+<vote_date>{when.strftime("%d-%b")}</vote_date>
+<issue>S. {number}</issue>
+<question>On Passage of the Bill</question>
+<result>Passed</result>
+<title>Synthetic Senate roll call {number}</title>
+</vote>
+"""
+        # Newest first, as the Senate lists them
+        for number, when in reversed(votes)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<vote_summary>
+<congress>{congress}</congress>
+<session>{session}</session>
+<congress_year>{year}</congress_year>
+<votes>
+{listed}</votes>
+</vote_summary>
+"""
+
+
+def house_roll_call_index(year: int, roll_calls: int) -> str:
+    """The clerk's index of a year's roll calls, linking to a page for each hundred of them"""
+    groups = "".join(
+        f'<a href="ROLL_{group:03}.asp">{max(group, 1)}-{group + 99}</a>\n'
+        # Newest first, as the clerk lists them
+        for group in reversed(range(0, roll_calls + 1, 100))
+    )
+    return f"<html><body><h1>{year} Roll Call Votes</h1>\n{groups}</body></html>\n"
+
+
+def house_roll_call_group(year: int, group: int, roll_calls: int) -> str:
+    """One of the clerk's pages of a year's roll calls, listing roll calls `group` to `group + 99`"""
+    listed = "".join(
+        f'<tr><td><a href="https://clerk.house.gov/cgi-bin/vote.asp?year={year}&amp;rollnumber={number}">{number}</a></td></tr>\n'
+        for number in reversed(range(max(group, 1), min(group + 99, roll_calls) + 1))
+    )
+    return f"<html><body><table>\n{listed}</table></body></html>\n"
+
+
+def senate_member_list(senators: List[Member]) -> str:
+    members = "".join(
+        f"""<member>
+<member_full>{escape(m.family_name)} ({m.party_abbreviation}-{m.state})</member_full>
+<last_name>{escape(m.family_name)}</last_name>
+<first_name>{m.given_name}</first_name>
+<party>{m.party_abbreviation}</party>
+<state>{m.state}</state>
+<address>{100 + i} Russell Senate Office Building Washington DC 20510</address>
+<phone>(202) 224-{i:04d}</phone>
+<email>https://www.{m.unaccented_family_name.lower()}.senate.gov/contact</email>
+<website>https://www.{m.unaccented_family_name.lower()}.senate.gov</website>
+<class>Class {"I" * (i % 3 + 1)}</class>
+<bioguide_id>{m.bioguide_id}</bioguide_id>
+</member>
+"""
+        for i, m in enumerate(senators)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<contact_information>
+{members}<last_updated>Synthetic</last_updated>
+</contact_information>
+"""
+
+
+def bioguide_profile(member: Member, spec: Spec) -> Dict:
+    jobs = []
+    for congress in range(spec.first_congress, spec.first_congress + spec.congresses):
+        jobs.append({
+            "job": {"name": "Senator" if member.senator else "Representative", "jobType": "CongressMemberJob"},
+            "congressAffiliation": {
+                "congress": {
+                    "name": f"The {congress}th United States Congress",
+                    "congressNumber": congress,
+                    "congressType": "USCongress",
+                    "startDate": f"{year_of(congress, 1)}-01-03",
+                    "endDate": f"{year_of(congress, 1) + 2}-01-03",
+                },
+                "partyAffiliation": [{"party": {"name": member.party}}],
+                "represents": {"regionType": "StateRegion" if member.senator else "DistrictRegion", "regionCode": member.state},
+            },
+        })
+
+    return {"data": {
+        "usCongressBioId": member.bioguide_id,
+        "familyName": member.family_name,
+        "givenName": member.given_name,
+        "unaccentedFamilyName": member.unaccented_family_name,
+        "unaccentedGivenName": member.given_name,
+        "birthDate": str(1940 + int(member.bioguide_id[1:]) % 50),
+        "profileText": f"A {'Senator' if member.senator else 'Representative'} from {member.state}; synthetic profile",
+        "asset": [],
+        "jobPositions": jobs,
+        "creativeWork": [],
+        "researchRecord": [],
+    }}
+
+
+def _write(output: str, path: str, content: str):
+    full_path = os.path.join(output, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def generate(output: str, spec: Spec = Spec()) -> DataSet:
+    """Write the synthetic data set described by `spec` under `output`"""
+    rng = random.Random(spec.seed)
+    data = DataSet(spec, _members(spec, rng))
+    representatives = [m for m in data.members if not m.senator]
+    senators = [m for m in data.members if m.senator]
+
+    for member in data.members:
+        _write(output, f"{BIOGUIDE_PATH}/{member.bioguide_id}.json", json.dumps(bioguide_profile(member, spec), indent=1))
+    _write(output, SENATE_MEMBER_LIST_PATH, senate_member_list(senators))
+    data.files = len(data.members) + 1
+
+    for congress in range(spec.first_congress, spec.first_congress + spec.congresses):
+        for session in range(1, spec.sessions + 1):
+            year = year_of(congress, session)
+            for number in range(1, spec.house_votes_per_session + 1):
+                votes = list(_votes(representatives, rng))
+                when = _when(year, number, spec.house_votes_per_session)
+                _write(output, f"{HOUSE_PATH}/{year}/roll{number:03}.xml", house_roll_call(congress, session, number, when, votes))
+                data.house_roll_calls += 1
+                data.recorded_votes += len(votes)
+            _write(output, f"{HOUSE_PATH}/{year}/index.asp", house_roll_call_index(year, spec.house_votes_per_session))
+            for group in range(0, spec.house_votes_per_session + 1, 100):
+                _write(output, f"{HOUSE_PATH}/{year}/ROLL_{group:03}.asp", house_roll_call_group(year, group, spec.house_votes_per_session))
+                data.files += 1
+            data.files += 1
+
+            listed = []
+            for number in range(1, spec.senate_votes_per_session + 1):
+                votes = list(_votes(senators, rng))
+                when = _when(year, number, spec.senate_votes_per_session)
+                path = f"{SENATE_PATH}/vote{congress}{session}/vote_{congress}_{session}_{number:05}.xml"
+                _write(output, path, senate_roll_call(congress, session, number, when, votes))
+                listed.append((number, when))
+                data.senate_roll_calls += 1
+                data.recorded_votes += len(votes)
+            _write(output, f"{SENATE_VOTE_MENU_PATH}/vote_menu_{congress}_{session}.xml", senate_vote_menu(congress, session, year, listed))
+            data.files += 1
+
+    data.files += data.house_roll_calls + data.senate_roll_calls
+    return data
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser):
+    defaults = Spec()
+    parser.add_argument("--first-congress", type=int, default=defaults.first_congress)
+    parser.add_argument("--congresses", type=int, default=defaults.congresses)
+    parser.add_argument("--sessions", type=int, choices=(1, 2), default=defaults.sessions, help="Sessions per congress")
+    parser.add_argument("--house-members", type=int, default=defaults.house_members)
+    parser.add_argument("--senators", type=int, default=defaults.senators)
+    parser.add_argument("--house-votes", type=int, default=defaults.house_votes_per_session, help="House roll calls per session")
+    parser.add_argument("--senate-votes", type=int, default=defaults.senate_votes_per_session, help="Senate roll calls per session")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def spec_from_arguments(args: argparse.Namespace) -> Spec:
+    return Spec(
+        first_congress=args.first_congress,
+        congresses=args.congresses,
+        sessions=args.sessions,
+        house_members=args.house_members,
+        senators=args.senators,
+        house_votes_per_session=args.house_votes,
+        senate_votes_per_session=args.senate_votes,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="Directory to write the data set to")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    data = generate(args.output, spec_from_arguments(args))
+    print(
+        f"Wrote {data.files} files to {args.output}: {len(data.members)} members, {data.house_roll_calls} House and "
+        f"{data.senate_roll_calls} Senate roll calls with {data.recorded_votes} recorded votes"
+    )
+
+
+if __name__ == "__main__":
+    main()
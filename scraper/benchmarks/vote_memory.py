@@ -0,0 +1,124 @@
+"""
+Measure the memory held by a buffer of parsed roll calls, with the recorded votes stored as
+`RecordedVotes` columns against the dataclass per member they were stored as before.
+
+Parses `--roll-calls` copies of `examples/call_the_house.xml` and of the Senate example padded
+out to a full chamber, keeping every roll call as the write stage does while batching, and
+reports the size of everything the buffer holds. Objects shared between roll calls, such as
+interned strings, are counted once.
+
+Usage:
+    python -m benchmarks.vote_memory [--roll-calls 10000]
+"""
+import argparse
+import gc
+import sys
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from types import FunctionType, ModuleType
+from typing import Callable, List, Set, Tuple
+
+from scraper import house, senate
+
+from .parsers import HOUSE_EXAMPLE, SENATE_EXAMPLE, full_senate
+
+
+@dataclass
+class Legislator:
+    """A House member as recorded before `RecordedVotes`"""
+    name_id: str
+    sort_field: str
+    unaccented_name: str
+    party: str
+    state: str
+    role: str
+
+
+@dataclass
+class RecordedVote:
+    legislator: Legislator
+    vote: str
+
+
+@dataclass
+class Member:
+    """A senator as recorded before `RecordedVotes`"""
+    member_full: str
+    last_name: str
+    first_name: str
+    party: str
+    state: str
+    vote_cast: str
+    lis_member_id: str
+
+
+def house_dataclasses(doc: bytes) -> house.RollCallVote:
+    roll_call = house.parse_rollcall_vote(doc)
+    vote_data = []
+    for recorded_vote in ET.fromstring(doc).iter("recorded-vote"):
+        attrib = recorded_vote.find("legislator").attrib  # type: ignore[union-attr]
+        legislator = Legislator(*(attrib.get(name) for name in ("name-id", "sort-field", "unaccented-name", "party", "state", "role")))  # type: ignore[arg-type]
+        vote_data.append(RecordedVote(legislator, recorded_vote.findtext("vote")))  # type: ignore[arg-type]
+    roll_call.vote_data = vote_data  # type: ignore[assignment]
+    return roll_call
+
+
+def senate_dataclasses(doc: bytes) -> senate.RollCallVote:
+    roll_call = senate.parse_roll_call_vote(doc)
+    names = ("member_full", "last_name", "first_name", "party", "state", "vote_cast", "lis_member_id")
+    roll_call.members = [Member(*(member.findtext(name) for name in names)) for member in ET.fromstring(doc).iter("member")]  # type: ignore[assignment, arg-type]
+    return roll_call
+
+
+def retained_bytes(root: object) -> int:
+    """Size of `root` and every object reachable from it, leaving out classes, functions and modules"""
+    seen: Set[int] = set()
+    pending = [root]
+    size = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, (type, FunctionType, ModuleType)):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return size
+
+
+def buffered_bytes(parse: Callable[[bytes], object], doc: bytes, count: int) -> int:
+    """Size of a buffer of `count` roll calls, each parsed from `doc`"""
+    buffer = [parse(doc) for _ in range(count)]
+    return retained_bytes(buffer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roll-calls", type=int, default=10000, help="Number of roll calls buffered")
+    args = parser.parse_args()
+
+    with open(HOUSE_EXAMPLE, "rb") as f:
+        house_doc = f.read()
+    with open(SENATE_EXAMPLE, "rb") as f:
+        senate_doc = full_senate(f.read())
+
+    samples: List[Tuple[str, bytes, Callable[[bytes], object], Callable[[bytes], object], int]] = [
+        ("house", house_doc, house_dataclasses, house.parse_rollcall_vote,
+         len(house.parse_rollcall_vote(house_doc).vote_data)),
+        ("senate", senate_doc, senate_dataclasses, senate.parse_roll_call_vote,
+         len(senate.parse_roll_call_vote(senate_doc).members)),
+    ]
+
+    print(f"{args.roll_calls} roll calls buffered")
+    print(f"{'chamber':<8} {'dataclasses':>12} {'columns':>12} {'per vote':>16} {'saving':>8}")
+    for name, doc, original, columnar, recorded in samples:
+        before = buffered_bytes(original, doc, args.roll_calls)
+        after = buffered_bytes(columnar, doc, args.roll_calls)
+        votes = args.roll_calls * recorded
+        print(
+            f"{name:<8} {before / 2**20:>9.1f} MB {after / 2**20:>9.1f} MB "
+            f"{before / votes:>6.0f} -> {after / votes:>3.0f} B {before / after:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,13 +10,24 @@ WITH l, sum(toInteger(vote.vote <> max_data.items[0])) as votes_against, count(v
 RETURN l.given_name, l.family_name, votes_against, toFloat(votes_against)/total_votes as percent_against
 ORDER BY percent_against DESC
 
+// Votes against party, precomputed by the scraper
+MATCH (l: Legislator)-[:CURRENTLY_MEMBER_OF]-(p: Party {abbreviation: "D"})
+WHERE l.total_votes_party > 0
+RETURN l.given_name, l.family_name, l.votes_against_party as votes_against, l.percent_against_party as percent_against
+ORDER BY percent_against DESC
+
+// Party majority on a roll call
+MATCH (rc: RollCall {chamber: "house", congress: 119, session: 1, number: 1})
+RETURN rc.party_majority_D, rc.party_majority_votes_D, rc.party_votes_D
+       , rc.party_majority_R, rc.party_majority_votes_R, rc.party_votes_R
+
 // Member for lastname/state/party
 MATCH (l: Legislator { family_name: "Raskin"})
       , (l)-[:CURRENTLY_MEMBER_OF]->(:Party {abbreviation: "D"})
       , (l)-[:CURRENTLY_REPRESENTS]-(:State {code: "MD"})
 RETURN l
 
-// jacard index
+// jacard index, computed from every vote
 MATCH (l1: Legislator { bioguide_id: "R000606" })
 MATCH (l1)-[v1:VOTED_ON]-(rc: RollCall)
       , (l2)-[v2: VOTED_ON]-(rc)
@@ -34,3 +45,18 @@ RETURN l2.bioguide_id as bioguide_id
        , votes_total
        , percent_agreement
 ORDER BY percent_agreement
+
+// jacard index, precomputed by the scraper
+MATCH (l1: Legislator { bioguide_id: "R000606" })-[a:AGREES_WITH]-(l2: Legislator)
+WHERE a.votes_total > 20
+MATCH (l2)-[:CURRENTLY_MEMBER_OF]-(p: Party)
+MATCH (l2)-[:CURRENTLY_REPRESENTS]-(s: State)
+RETURN l2.bioguide_id as bioguide_id
+       , l2.family_name as family_name
+       , p.abbreviation as party
+       , s.code as state
+       , a.votes_together as votes_together
+       , a.votes_against as votes_againsts
+       , a.votes_total as votes_total
+       , a.percent_agreement as percent_agreement
+ORDER BY percent_agreement
@@ -5,9 +5,46 @@ from typing import Iterator
 
 from .settings import Settings
 from .database import connect
+from .schema import migrate
 from .bioguide import insert_all_legislators
 from .house import scrape_house
 from .senate import scrape_senate
+from .agreement import update_agreement
+from .loyalty import update_party_loyalty
+from .snapshot import export_snapshot
+from . import metrics
+
+
+def main(settings: Settings):
+    """Sync legislators, scrape new roll calls from both chambers and update what's derived from them"""
+    if settings.metrics_port > 0:
+        metrics.serve(settings.metrics_port)
+
+    driver = connect(settings)
+    migrate(driver)
+
+    try:
+        insert_all_legislators(
+            settings.bioguide_path,
+            driver,
+            batch_size=settings.bioguide_batch_size,
+            parse_workers=settings.bioguide_parse_workers,
+            queue_depth=settings.bioguide_queue_depth,
+            full_refresh=settings.bioguide_full_refresh,
+            strict=settings.bioguide_strict,
+            writers=settings.database_writers,
+            writer_queue_depth=settings.pipeline_queue_depth,
+        )
+        scrape_house(settings, driver)
+        scrape_senate(settings, driver)
+        update_agreement(settings, driver)
+        update_party_loyalty(driver)
+        if settings.snapshot_path is not None:
+            export_snapshot(driver, settings.snapshot_path)
+    finally:
+        # Also after a failure, when knowing how far the run got matters most
+        metrics.export(settings.metrics_textfile)
+
 
 if __name__ == "__main__":
     settings = Settings.from_environs()
@@ -16,8 +53,4 @@ if __name__ == "__main__":
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
 
-    driver = connect(settings)
-
-    insert_all_legislators(settings.bioguide_path + '/*.json', driver)
-    scrape_house(settings, driver)
-    scrape_senate(settings, driver)
+    main(settings)
@@ -0,0 +1,369 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import batched
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+import logging
+
+import numpy as np
+from neo4j import Driver, Session, Transaction
+
+from .settings import Settings
+from .models import NOT_VOTING
+from .database import execute_write
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Number of roll calls multiplied at a time, bounding the size of the one-hot matrices
+ROLL_CALL_CHUNK_SIZE = 1024
+
+# Number of new roll calls whose agreement is added to the stored counts in one transaction
+PENDING_ROLL_CALLS_PER_TRANSACTION = 100
+
+# Number of pairs sent to the database per statement
+WRITE_BATCH_SIZE = 5000
+
+
+@dataclass
+class VoteMatrix:
+    """
+    Every vote cast in one chamber during one congress, as a dense legislator × roll call matrix.
+    Each cell holds the code of the vote cast, or 0 if the legislator did not vote.
+    """
+    chamber: str
+    congress: int
+    # Index of each row's legislator in the list returned alongside the matrix
+    legislators: np.ndarray
+    # Element ID of each column's roll call
+    roll_calls: List[str]
+    codes: np.ndarray
+
+
+@dataclass
+class _VoteMatrixBuilder:
+    chamber: str
+    congress: int
+    rows: Dict[int, int] = field(default_factory=dict)
+    roll_calls: List[str] = field(default_factory=list)
+    votes: List[List[Tuple[int, int]]] = field(default_factory=list)
+
+    def add_roll_call(self, roll_call: str, votes: List[Tuple[int, int]]):
+        self.roll_calls.append(roll_call)
+        self.votes.append([(self.rows.setdefault(legislator, len(self.rows)), code) for legislator, code in votes])
+
+    def build(self) -> VoteMatrix:
+        codes = np.zeros((len(self.rows), len(self.votes)), dtype=np.int8)
+        for column, votes in enumerate(self.votes):
+            if len(votes) != 0:
+                rows, vote_codes = zip(*votes)
+                codes[list(rows), column] = vote_codes
+        legislators = np.fromiter(self.rows.keys(), dtype=np.int64, count=len(self.rows))
+        return VoteMatrix(self.chamber, self.congress, legislators, self.roll_calls, codes)
+
+
+@dataclass
+class AgreementCounts:
+    """
+    For every pair of legislators, the number of roll calls they both voted on (`total`) and how
+    many of those they voted the same way on (`together`). Rows and columns follow `legislators`.
+    """
+    legislators: List[str]
+    together: np.ndarray
+    total: np.ndarray
+
+    @property
+    def against(self) -> np.ndarray:
+        return self.total - self.together
+
+    def pairs(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield each pair that voted on at least one roll call together as a row for the write
+        queries. Each pair is stored once, from the lower bioguide ID to the higher.
+        """
+        first, second = np.nonzero(np.triu(self.total > 0, k=1))
+        together = self.together[first, second]
+        total = self.total[first, second]
+        for a, b, t, n in zip(first.tolist(), second.tolist(), together.tolist(), total.tolist()):
+            bioguide_id, other_bioguide_id = sorted((self.legislators[a], self.legislators[b]))
+            yield {'bioguide_id': bioguide_id, 'other_bioguide_id': other_bioguide_id, 'votes_together': t, 'votes_total': n}
+
+
+def load_vote_matrices(session: Session, pending_only: bool = False) -> Tuple[List[str], List[VoteMatrix]]:
+    """
+    Read votes from the database, returning the bioguide ID of each legislator that cast one and
+    a matrix of votes per chamber and congress. Legislators only vote alongside members of the
+    same chamber and congress, so the matrices are kept small by never mixing the two.
+
+    Args:
+        session: Session to read with
+        pending_only: Only read roll calls not yet counted in the stored agreement
+    """
+    legislators: Dict[str, int] = {}
+    vote_codes: Dict[str, int] = {}
+    builders: Dict[Tuple[str, int], _VoteMatrixBuilder] = {}
+
+    label = ':AgreementPending' if pending_only else ''
+    result = session.run(f"""
+        MATCH (rc: RollCall{label})<-[v:VOTED_ON]-(l: Legislator)
+        WHERE v.vote <> $not_voting
+        RETURN rc.chamber AS chamber
+            , rc.congress AS congress
+            , elementId(rc) AS roll_call
+            , collect([l.bioguide_id, v.vote]) AS votes
+    """, not_voting=NOT_VOTING)
+
+    for record in result:
+        key = (record['chamber'], record['congress'])
+        builder = builders.get(key)
+        if builder is None:
+            builder = builders[key] = _VoteMatrixBuilder(*key)
+
+        votes = []
+        for bioguide_id, vote in record['votes']:
+            code = vote_codes.get(vote)
+            if code is None:
+                code = vote_codes[vote] = len(vote_codes) + 1
+                if code > np.iinfo(np.int8).max:
+                    raise ValueError(f"Too many distinct votes to encode, the latest being {vote!r}")
+            votes.append((legislators.setdefault(bioguide_id, len(legislators)), code))
+        builder.add_roll_call(record['roll_call'], votes)
+
+    return list(legislators.keys()), [builder.build() for builder in builders.values()]
+
+
+def count_agreement(codes: np.ndarray, chunk_size: int = ROLL_CALL_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Count, for every pair of rows of `codes`, the columns where both are non-zero and the columns
+    where both hold the same non-zero value.
+
+    With a one-hot matrix M_v marking where each row voted v, the roll calls two legislators agree
+    on are the sum over v of (M_v @ M_v.T), and the roll calls they both voted on are P @ P.T where
+    P marks any vote at all. Multiplying in float32 keeps to BLAS, and is exact for counts below 2**24.
+
+    Returns:
+        `(together, total)`, both square int32 matrices with one row and column per row of `codes`
+    """
+    n = codes.shape[0]
+    together = np.zeros((n, n), dtype=np.int32)
+    total = np.zeros((n, n), dtype=np.int32)
+
+    for start in range(0, codes.shape[1], chunk_size):
+        chunk = codes[:, start:start + chunk_size]
+
+        participated = (chunk != 0).astype(np.float32)
+        total += (participated @ participated.T).astype(np.int32)
+
+        for code in np.unique(chunk):
+            if code == 0:
+                continue
+            voted = (chunk == code).astype(np.float32)
+            together += (voted @ voted.T).astype(np.int32)
+
+    # Nobody agrees or disagrees with themselves
+    np.fill_diagonal(together, 0)
+    np.fill_diagonal(total, 0)
+    return together, total
+
+
+def compute_agreement(legislators: List[str], matrices: List[VoteMatrix]) -> AgreementCounts:
+    n = len(legislators)
+    together = np.zeros((n, n), dtype=np.int32)
+    total = np.zeros((n, n), dtype=np.int32)
+
+    for matrix in matrices:
+        start = perf_counter()
+        matrix_together, matrix_total = count_agreement(matrix.codes)
+        rows = np.ix_(matrix.legislators, matrix.legislators)
+        together[rows] += matrix_together
+        total[rows] += matrix_total
+        logger.debug(
+            "Counted agreement between %d legislators over %d %s roll calls of the %dth congress in %.1f ms",
+            matrix.codes.shape[0],
+            matrix.codes.shape[1],
+            matrix.chamber,
+            matrix.congress,
+            (perf_counter() - start) * 1000,
+        )
+
+    return AgreementCounts(legislators, together, total)
+
+
+# Counts are kept for every pair of legislators who shared a roll call, however few, so they stay
+# correct as votes are added. Readers apply their own minimum to `votes_total`.
+ADD_AGREEMENT_QUERY = """
+UNWIND $pairs AS pair
+MATCH (l1: Legislator {bioguide_id: pair.bioguide_id})
+MATCH (l2: Legislator {bioguide_id: pair.other_bioguide_id})
+MERGE (l1)-[a:AGREES_WITH]->(l2)
+ON CREATE SET a.votes_together = 0, a.votes_total = 0
+SET a.votes_together = a.votes_together + pair.votes_together
+    , a.votes_total = a.votes_total + pair.votes_total
+SET a.votes_against = a.votes_total - a.votes_together
+    , a.percent_agreement = toFloat(a.votes_together) / a.votes_total
+"""
+
+REPLACE_AGREEMENT_QUERY = """
+UNWIND $pairs AS pair
+MATCH (l1: Legislator {bioguide_id: pair.bioguide_id})
+MATCH (l2: Legislator {bioguide_id: pair.other_bioguide_id})
+MERGE (l1)-[a:AGREES_WITH]->(l2)
+SET a.votes_together = pair.votes_together
+    , a.votes_total = pair.votes_total
+    , a.votes_against = pair.votes_total - pair.votes_together
+    , a.percent_agreement = toFloat(pair.votes_together) / pair.votes_total
+    , a.rebuilt_at = $rebuilt_at
+"""
+
+
+def _mark_counted(tx: Transaction, roll_calls: Sequence[str]):
+    tx.run("""
+        MATCH (rc: RollCall:AgreementPending)
+        WHERE elementId(rc) IN $roll_calls
+        REMOVE rc:AgreementPending
+    """, roll_calls=roll_calls)
+
+
+def _add_pending_agreement(tx: Transaction, counts: AgreementCounts, roll_calls: Sequence[str]):
+    # Counting and marking happen in one transaction, so a retry can't count a roll call twice
+    for chunk in batched(counts.pairs(), WRITE_BATCH_SIZE):
+        tx.run(ADD_AGREEMENT_QUERY, pairs=chunk)
+    _mark_counted(tx, roll_calls)
+
+
+def apply_pending_agreement(driver: Driver) -> int:
+    """
+    Add the agreement on every roll call inserted since the last update to the stored counts. Only
+    the new roll calls are read and multiplied, so this takes time in proportion to the number of
+    new votes rather than to the whole history.
+
+    Returns:
+        Number of roll calls counted
+    """
+    counted = 0
+    with driver.session() as session:
+        legislators, matrices = load_vote_matrices(session, pending_only=True)
+
+        for matrix in matrices:
+            names = [legislators[i] for i in matrix.legislators.tolist()]
+            for start in range(0, len(matrix.roll_calls), PENDING_ROLL_CALLS_PER_TRANSACTION):
+                roll_calls = matrix.roll_calls[start:start + PENDING_ROLL_CALLS_PER_TRANSACTION]
+                together, total = count_agreement(matrix.codes[:, start:start + len(roll_calls)])
+                execute_write(session, 'agreement', _add_pending_agreement, AgreementCounts(names, together, total), roll_calls, rows=len(roll_calls))
+                counted += len(roll_calls)
+
+        # Roll calls nobody voted on have nothing to count
+        result = session.run("""
+            MATCH (rc: RollCall:AgreementPending)
+            WHERE NOT EXISTS { (rc)<-[v:VOTED_ON]-() WHERE v.vote <> $not_voting }
+            REMOVE rc:AgreementPending
+        """, not_voting=NOT_VOTING)
+        metrics.record_summary('agreement', result.consume())
+
+    return counted
+
+
+def _replace_pairs(tx: Transaction, pairs: Sequence[Dict[str, Any]], rebuilt_at: datetime):
+    tx.run(REPLACE_AGREEMENT_QUERY, pairs=pairs, rebuilt_at=rebuilt_at)
+
+
+def verify_agreement(session: Session, counts: AgreementCounts) -> int:
+    """
+    Compare the stored agreement counts with `counts`, logging each pair that differs.
+
+    Returns:
+        Number of pairs that differ
+    """
+    index = {bioguide_id: i for i, bioguide_id in enumerate(counts.legislators)}
+    stored = np.zeros(counts.total.shape, dtype=np.bool_)
+    mismatches = 0
+
+    result = session.run("""
+        MATCH (l1: Legislator)-[a:AGREES_WITH]->(l2: Legislator)
+        RETURN l1.bioguide_id AS bioguide_id
+            , l2.bioguide_id AS other_bioguide_id
+            , a.votes_together AS votes_together
+            , a.votes_total AS votes_total
+    """)
+    for record in result:
+        i = index.get(record['bioguide_id'])
+        j = index.get(record['other_bioguide_id'])
+        expected = (0, 0)
+        if i is not None and j is not None:
+            stored[i, j] = stored[j, i] = True
+            expected = (int(counts.together[i, j]), int(counts.total[i, j]))
+
+        if (record['votes_together'], record['votes_total']) != expected:
+            mismatches += 1
+            logger.warning(
+                "Stored agreement between %s and %s is %s of %s votes, but should be %d of %d",
+                record['bioguide_id'],
+                record['other_bioguide_id'],
+                record['votes_together'],
+                record['votes_total'],
+                *expected,
+            )
+
+    missing = np.triu((counts.total > 0) & ~stored, k=1)
+    for i, j in zip(*np.nonzero(missing)):
+        logger.warning("No stored agreement between %s and %s", counts.legislators[i], counts.legislators[j])
+
+    return mismatches + int(missing.sum())
+
+
+def rebuild_agreement(driver: Driver) -> int:
+    """
+    Recount agreement from every vote in the graph and replace the stored counts with it. The
+    stored counts are checked against the recount first, and any differences logged.
+
+    Returns:
+        Number of pairs written
+    """
+    rebuilt_at = datetime.now(timezone.utc)
+    written = 0
+
+    with driver.session() as session:
+        start = perf_counter()
+        legislators, matrices = load_vote_matrices(session)
+        counts = compute_agreement(legislators, matrices)
+        logger.info("Recounted agreement between %d legislators in %.1f s", len(legislators), perf_counter() - start)
+
+        mismatches = verify_agreement(session, counts)
+        if mismatches != 0:
+            logger.warning("%d stored agreement counts were wrong and will be replaced", mismatches)
+
+        for chunk in batched(counts.pairs(), WRITE_BATCH_SIZE):
+            execute_write(session, 'agreement', _replace_pairs, chunk, rebuilt_at, rows=len(chunk))
+            written += len(chunk)
+
+        # Everything that existed when votes were read has now been counted
+        counted = [roll_call for matrix in matrices for roll_call in matrix.roll_calls]
+        for roll_calls in batched(counted, WRITE_BATCH_SIZE):
+            execute_write(session, 'agreement', _mark_counted, roll_calls)
+
+        result = session.run("""
+            MATCH ()-[a:AGREES_WITH]->()
+            WHERE a.rebuilt_at IS NULL OR a.rebuilt_at <> $rebuilt_at
+            CALL { WITH a DELETE a } IN TRANSACTIONS OF 10000 ROWS
+        """, rebuilt_at=rebuilt_at)
+        metrics.record_summary('agreement', result.consume())
+
+        session.run("""
+            MERGE (s: AgreementState)
+            SET s.rebuilt_at = $rebuilt_at
+        """, rebuilt_at=rebuilt_at).consume()
+
+    return written
+
+
+def update_agreement(settings: Settings, driver: Driver):
+    """Bring the stored count of how often every pair of legislators vote together up to date"""
+    records, _, _ = driver.execute_query("MATCH (s: AgreementState) RETURN s.rebuilt_at AS rebuilt_at")
+
+    start = perf_counter()
+    if settings.agreement_full_rebuild or len(records) == 0:
+        written = rebuild_agreement(driver)
+        logger.info("Rebuilt agreement for %d pairs of legislators in %.1f s", written, perf_counter() - start)
+    else:
+        counted = apply_pending_agreement(driver)
+        logger.info("Added agreement on %d new roll calls in %.1f s", counted, perf_counter() - start)
@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Self, Tuple
+import json
+import logging
+import os
+import zlib
+
+import scraper.models as models
+from .settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Shard of the archive, identified by congress and session
+ShardKey = Tuple[int, int]
+
+
+@dataclass
+class VoteDocument:
+    """Vote XML exactly as it was fetched, before parsing"""
+    chamber: models.Chamber
+    congress: int
+    session: int
+    number: int
+    url: str
+    body: bytes
+
+
+@dataclass
+class _IndexEntry:
+    offset: int
+    length: int
+    url: str
+
+
+class VoteArchive:
+    """
+    Compressed copy of every House and Senate vote document fetched, so votes can be
+    re-ingested without crawling the government sites again.
+
+    Documents are sharded by chamber, congress and session. Each shard is a pair of files:
+
+        {path}/{chamber}/{congress}-{session}.zz   zlib-compressed documents, back to back
+        {path}/{chamber}/{congress}-{session}.idx  one JSON line per document locating it in the .zz file
+
+    Both files are only ever appended to. A document whose index line never made it to disk is
+    ignored, and if a document is stored twice the later copy wins.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = Lock()
+        self._indexes: Dict[Tuple[models.Chamber, ShardKey], Dict[int, _IndexEntry]] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional[Self]:
+        if settings.archive_path is None:
+            return None
+        return cls(settings.archive_path)
+
+    def _shard_path(self, chamber: models.Chamber, shard: ShardKey) -> str:
+        congress, session = shard
+        return os.path.join(self.path, chamber.value, f"{congress}-{session}")
+
+    def _index(self, chamber: models.Chamber, shard: ShardKey) -> Dict[int, _IndexEntry]:
+        index = self._indexes.get((chamber, shard))
+        if index is None:
+            index = {}
+            try:
+                with open(self._shard_path(chamber, shard) + '.idx') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            logger.warning("Skipping damaged index line in %s shard %d-%d", chamber.value, *shard)
+                            continue
+                        index[entry['number']] = _IndexEntry(entry['offset'], entry['length'], entry['url'])
+            except FileNotFoundError:
+                pass
+            self._indexes[(chamber, shard)] = index
+        return index
+
+    def store(self, chamber: models.Chamber, congress: int, session: int, number: int, url: str, body: bytes):
+        compressed = zlib.compress(body)
+        shard = (congress, session)
+        shard_path = self._shard_path(chamber, shard)
+
+        with self._lock:
+            index = self._index(chamber, shard)
+            os.makedirs(os.path.dirname(shard_path), exist_ok=True)
+
+            with open(shard_path + '.zz', 'ab') as data:
+                offset = data.tell()
+                data.write(compressed)
+
+            with open(shard_path + '.idx', 'a') as idx:
+                idx.write(json.dumps({'number': number, 'offset': offset, 'length': len(compressed), 'url': url}) + '\n')
+
+            index[number] = _IndexEntry(offset, len(compressed), url)
+
+    def contains(self, chamber: models.Chamber, congress: int, session: int, number: int) -> bool:
+        with self._lock:
+            return number in self._index(chamber, (congress, session))
+
+    def shards(self, chamber: models.Chamber) -> List[ShardKey]:
+        try:
+            names = os.listdir(os.path.join(self.path, chamber.value))
+        except FileNotFoundError:
+            return []
+
+        shards = []
+        for name in names:
+            stem, extension = os.path.splitext(name)
+            if extension == '.idx':
+                congress, session = stem.split('-')
+                shards.append((int(congress), int(session)))
+        return sorted(shards)
+
+    def replay(self, chamber: models.Chamber, congress: int, session: int, number: int) -> Iterator[VoteDocument]:
+        """
+        Yield every archived document of `chamber` from the given vote onwards, in order,
+        reading each shard front to back.
+        """
+        for shard in self.shards(chamber):
+            if shard < (congress, session):
+                continue
+
+            with self._lock:
+                index = dict(self._index(chamber, shard))
+
+            first = number if shard == (congress, session) else 1
+            entries = sorted(((n, entry) for n, entry in index.items() if n >= first), key=lambda e: e[0])
+            logger.debug("Replaying %d %s votes from shard %d-%d", len(entries), chamber.value, *shard)
+
+            with open(self._shard_path(chamber, shard) + '.zz', 'rb') as data:
+                # Fetches complete slightly out of order, so documents are close to, but not
+                # exactly, in file order. Reads are still mostly sequential.
+                for n, entry in entries:
+                    data.seek(entry.offset)
+                    body = zlib.decompress(data.read(entry.length))
+                    yield VoteDocument(chamber, shard[0], shard[1], n, entry.url, body)
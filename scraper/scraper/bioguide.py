@@ -3,18 +3,28 @@ import glob
 import json
 import os
 import urllib.request
-from pydantic import BaseModel, HttpUrl, ConfigDict
-from typing import List, Optional
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from itertools import batched
+from pydantic import BaseModel, HttpUrl, ConfigDict, Field, TypeAdapter
+from typing import Annotated, Any, Deque, Dict, Iterable, Iterator, List, Optional, Self, Tuple, Union
 from datetime import datetime, date
 from enum import Enum
 from neo4j import Driver, Session, Transaction
 import logging
+import mmap
 import tempfile
 import urllib
 import zipfile
+import zlib
 
 import scraper.models as models
 from .settings import Settings
+from .database import execute_write
+from .writers import ParallelWriter
+from . import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -43,8 +53,8 @@ class Congress(BaseModel):
     name: str
     congressNumber: int
     congressType: str
-    startDate: str
-    endDate: Optional[str] = None
+    startDate: date
+    endDate: Optional[date] = None
 
 class Represents(BaseModel):
     regionType: str
@@ -55,11 +65,13 @@ class Note(BaseModel):
     noteType: str
     content: str
 
-class CongressAffiliation(BaseModel):
+class LeanCongressAffiliation(BaseModel):
     congress: Optional[Congress] = None
     partyAffiliation: List[PartyAffiliation] = []
-    caucusAffiliation: List[PartyAffiliation] = []
     represents: Optional[Represents] = None
+
+class CongressAffiliation(LeanCongressAffiliation):
+    caucusAffiliation: List[PartyAffiliation] = []
     note: List[Note] = []
     departureReason: Optional[str] = None
     electionType: Optional[str] = None
@@ -68,6 +80,9 @@ class Job(BaseModel):
     name: str
     jobType: str
 
+class LeanJobPosition(BaseModel):
+    congressAffiliation: LeanCongressAffiliation
+
 class JobPosition(BaseModel):
     job: Job
     congressAffiliation: CongressAffiliation
@@ -105,7 +120,8 @@ class NameHistory(BaseModel):
     startCirca: Optional[bool] = None
     endCirca: Optional[bool] = None
 
-class PoliticianData(BaseModel):
+class _PoliticianFields(BaseModel):
+    """The parts of a profile, other than its job positions, that are written to the database"""
     usCongressBioId: str
     familyName: str
     middleName: Optional[str] = None
@@ -124,25 +140,40 @@ class PoliticianData(BaseModel):
     deathDateUnknown: Optional[bool] = None
     image: List[Image] = []
     profileText: str
+    relationship: List[Relationship] = []
+
+class LeanPoliticianData(_PoliticianFields):
+    """
+    Only the parts of a profile that are written to the database. Everything else in the
+    profile is skipped over while parsing rather than validated.
+    """
+    jobPositions: List[LeanJobPosition] = []
+
+class PoliticianData(_PoliticianFields):
     asset: List[Asset]
     jobPositions: List[JobPosition]
     creativeWork: List[CreativeWork]
     researchRecord: List[ResearchRecord]
     deleted: bool = False
-    relationship: List[Relationship] = []
     nameHistory: List[NameHistory] = []
 
+class LeanBioguideEntry(BaseModel):
+    data: LeanPoliticianData
+
 class BioguideEntry(BaseModel):
     data: PoliticianData
 
-def insert_bioguide_entry(tx: Transaction, entry: BioguideEntry):
+# Either way of parsing a profile gives everything that's written to the database
+AnyBioguideEntry = Union[BioguideEntry, LeanBioguideEntry]
+
+def _to_legislator(entry: AnyBioguideEntry) -> models.Legislator:
     if len(entry.data.image) != 0 and entry.data.image[0].contentUrl is not None:
         image_path = entry.data.image[0].contentUrl
         image = os.path.basename(image_path)
     else:
         image = None
 
-    legislator = models.Legislator(
+    return models.Legislator(
         bioguide_id=entry.data.usCongressBioId,
         family_name=entry.data.familyName,
         given_name=entry.data.givenName,
@@ -161,11 +192,21 @@ def insert_bioguide_entry(tx: Transaction, entry: BioguideEntry):
         death_date_unknown=entry.data.deathDateUnknown
     )
 
+def _to_congress(congress: Congress) -> models.Congress:
+    return models.Congress(
+        number=congress.congressNumber,
+        start_date=congress.startDate,
+        end_date=congress.endDate
+    )
+
+def insert_bioguide_entry(tx: Transaction, entry: AnyBioguideEntry):
+    legislator = _to_legislator(entry)
+
+    # Replace the legislator's properties, keeping the LIS member id learned from senate votes
     query = """
         MERGE (l: Legislator {bioguide_id: $bioguide_id})
-        ON CREATE SET
-            l = $legislator
-        ON MATCH SET l = $ legislator
+        WITH l, l.lis_member_id AS lis_member_id
+        SET l = $legislator, l.lis_member_id = lis_member_id
     """
 
     tx.run(query, bioguide_id=legislator.bioguide_id, legislator=legislator.model_dump(exclude_none=True))
@@ -187,11 +228,7 @@ def insert_bioguide_entry(tx: Transaction, entry: BioguideEntry):
         is_member_of_congress = models.IsMemberOfCongress(
             parties=[party.party.name for party in job.congressAffiliation.partyAffiliation]
         )
-        congress = models.Congress(
-            number=job.congressAffiliation.congress.congressNumber,
-            start_date=job.congressAffiliation.congress.startDate,
-            end_date=job.congressAffiliation.congress.endDate
-        )
+        congress = _to_congress(job.congressAffiliation.congress)
         query="""
             MATCH (self: Legislator {bioguide_id: $bioguide_id})
             MERGE (congress: Congress {number: $congress.number})
@@ -246,41 +283,543 @@ def insert_bioguide_entry(tx: Transaction, entry: BioguideEntry):
            tx.run(query, bioguide_id=legislator.bioguide_id, party=party.model_dump(exclude_none=True), membership=is_member_of_party.model_dump(exclude_none=True))
 
 
-def insert_bioguide_file(path: str, session: Session):
-    with open(path) as f:
-        data = json.load(f)
+@dataclass
+class LegislatorRecord:
+    """
+    Everything `insert_bioguide_batch` needs to write one profile, already dumped to plain
+    dictionaries so that a chunk of records can be sent to neo4j as UNWIND parameters.
+    """
+    bioguide_id: str
+    legislator: Dict[str, Any]
+    relationships: List[Dict[str, Any]] = field(default_factory=list)
+    congresses: List[Dict[str, Any]] = field(default_factory=list)
+    states: List[Dict[str, Any]] = field(default_factory=list)
+    parties: List[Dict[str, Any]] = field(default_factory=list)
+    profile_name: Optional[str] = None
+    content_hash: Optional[str] = None
+
+
+def to_legislator_record(entry: AnyBioguideEntry) -> LegislatorRecord:
+    legislator = _to_legislator(entry)
+    record = LegislatorRecord(
+        bioguide_id=legislator.bioguide_id,
+        legislator=legislator.model_dump(exclude_none=True),
+    )
+
+    for relation in entry.data.relationship:
+        is_related_to = models.IsRelatedTo(relationship_type=relation.relationshipType)
+        record.relationships.append({
+            'relative_id': relation.relatedTo.usCongressBioId,
+            'is_related_to': is_related_to.model_dump(exclude_none=True),
+        })
+
+    for job in entry.data.jobPositions:
+        if job.congressAffiliation.congress is None:
+            continue
+
+        is_member_of_congress = models.IsMemberOfCongress(
+            parties=[party.party.name for party in job.congressAffiliation.partyAffiliation]
+        )
+        congress = _to_congress(job.congressAffiliation.congress)
+        record.congresses.append({
+            'congress': congress.model_dump(exclude_none=True),
+            'membership': is_member_of_congress.model_dump(exclude_none=True),
+        })
+
+        if job.congressAffiliation.represents is not None:
+            state = models.State(code=job.congressAffiliation.represents.regionCode)
+            record.states.append({
+                'state': state.model_dump(exclude_none=True),
+                'represents': models.Represents().model_dump(exclude_none=True),
+            })
+
+        for party_affiliation in job.congressAffiliation.partyAffiliation:
+            party = models.Party(
+                name=party_affiliation.party.name,
+                abbreviation=models.Party.name_to_abbreviation(party_affiliation.party.name)
+            )
+            record.parties.append({
+                'party': party.model_dump(exclude_none=True),
+                'membership': models.IsMemberOfParty().model_dump(exclude_none=True),
+            })
+
+    return record
+
+
+def insert_bioguide_batch(tx: Transaction, records: List[LegislatorRecord]):
+    """
+    Write a chunk of profiles with one statement per node/relationship type rather than
+    one statement per row. Produces the same graph as calling `insert_bioguide_entry`
+    on each profile.
+    """
+    rows = [asdict(record) for record in records]
+
+    tx.run("""
+        UNWIND $rows AS row
+        MERGE (l: Legislator {bioguide_id: row.bioguide_id})
+        WITH row, l, l.lis_member_id AS lis_member_id
+        SET l = row.legislator, l.lis_member_id = lis_member_id
+    """, rows=rows)
+
+    tx.run("""
+        UNWIND $rows AS row
+        MATCH (self: Legislator {bioguide_id: row.bioguide_id})
+        UNWIND row.relationships AS relation
+        MERGE (relative: Legislator {bioguide_id: relation.relative_id})
+        MERGE (self)-[r: IS_RELATED_TO]->(relative)
+        ON CREATE SET r = relation.is_related_to
+    """, rows=rows)
+
+    tx.run("""
+        UNWIND $rows AS row
+        MATCH (self: Legislator {bioguide_id: row.bioguide_id})
+        UNWIND row.congresses AS membership
+        MERGE (congress: Congress {number: membership.congress.number})
+        ON CREATE
+            SET congress = membership.congress
+        MERGE (self)-[m: IS_MEMBER_OF_CONGRESS]->(congress)
+        ON CREATE
+            SET m = membership.membership
+    """, rows=rows)
+
+    tx.run("""
+        UNWIND $rows AS row
+        MATCH (self: Legislator {bioguide_id: row.bioguide_id})
+        UNWIND row.states AS representation
+        MERGE (state: State {code: representation.state.code})
+        ON CREATE
+            SET state = representation.state
+        MERGE (self)-[r: REPRESENTS]->(state)
+        ON CREATE
+            SET r = representation.represents
+    """, rows=rows)
+
+    tx.run("""
+        UNWIND $rows AS row
+        MATCH (self: Legislator {bioguide_id: row.bioguide_id})
+        UNWIND row.parties AS affiliation
+        MERGE (party: Party {name: affiliation.party.name})
+        ON CREATE
+            SET party = affiliation.party
+        MERGE (self)-[m: IS_MEMBER_OF_PARTY]->(party)
+        ON CREATE
+            SET m = affiliation.membership
+    """, rows=rows)
+
+    record_profile_hashes(tx, [
+        {'name': record.profile_name, 'content_hash': record.content_hash, 'bioguide_id': record.bioguide_id}
+        for record in records
+        if record.profile_name is not None
+    ])
+
+
+def record_profile_hashes(tx: Transaction, profiles: List[Dict[str, Any]]):
+    """
+    Remember the content hash of each profile written so that later syncs can skip it while it
+    is unchanged. Runs in the same transaction as the profile writes, so the manifest never
+    claims a profile that didn't make it into the database.
+    """
+    tx.run("""
+        UNWIND $profiles AS profile
+        MERGE (p: BioguideProfile {name: profile.name})
+        SET p.content_hash = profile.content_hash
+            , p.bioguide_id = profile.bioguide_id
+    """, profiles=profiles)
+
+
+def load_profile_hashes(session: Session) -> Dict[str, str]:
+    result = session.run("""
+        MATCH (p: BioguideProfile)
+        RETURN p.name AS name, p.content_hash AS content_hash
+    """)
+    return {record['name']: record['content_hash'] for record in result}
+
+
+@dataclass
+class SyncReport:
+    added: int = 0
+    changed: int = 0
+    skipped: int = 0
+
+
+class BioguideSource(ABC):
+    """
+    Somewhere bioguide profiles can be read from. Sources only pickle their location, so they
+    can be handed to worker processes which then read and parse profiles themselves.
+    """
+
+    @abstractmethod
+    def names(self) -> Iterator[str]:
+        """Yield the name of every profile in the source, one at a time"""
+
+    @abstractmethod
+    def read(self, name: str) -> bytes:
+        """Return the raw JSON of the profile called `name`"""
+
+    def content_hash(self, name: str) -> str:
+        """
+        Fingerprint of the profile's contents, the CRC-32 and length of its JSON. Zip archives
+        already store both, so profiles in an archive can be fingerprinted without reading them.
+        """
+        raw = self.read(name)
+        return _format_content_hash(zlib.crc32(raw), len(raw))
+
+    def close(self):
+        """Release any files the source holds open"""
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+def _format_content_hash(crc: int, size: int) -> str:
+    return f"{crc:08x}-{size}"
+
+
+def profile_key(name: str) -> str:
+    """Name a profile is recorded under in the manifest, the same whichever source it came from"""
+    return os.path.basename(name)
+
+
+class DirectorySource(BioguideSource):
+    """Profiles extracted to a directory, one json file per legislator"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def names(self) -> Iterator[str]:
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    yield entry.name
+
+    def read(self, name: str) -> bytes:
+        with open(os.path.join(self.path, name), 'rb') as f:
+            return f.read()
+
+
+class GlobSource(BioguideSource):
+    """Profiles matching a glob pattern, e.g. `BioguideProfiles/*.json`"""
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+
+    def names(self) -> Iterator[str]:
+        yield from glob.iglob(self.pattern)
+
+    def read(self, name: str) -> bytes:
+        with open(name, 'rb') as f:
+            return f.read()
+
+
+class _MappedFile:
+    """File-like view of a memory map. `mmap` only gains `seekable`, which zipfile needs, in 3.13"""
+
+    def __init__(self, mapped: mmap.mmap):
+        self._mapped = mapped
+
+    def read(self, size: int = -1) -> bytes:
+        return self._mapped.read(size)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        self._mapped.seek(offset, whence)  # type: ignore[arg-type]
+        return self._mapped.tell()
+
+    def tell(self) -> int:
+        return self._mapped.tell()
+
+    def seekable(self) -> bool:
+        return True
+
+    def close(self):
+        self._mapped.close()
+
+
+class ZipSource(BioguideSource):
+    """
+    Profiles read straight out of `BioguideProfiles.zip` without extracting it. Entries are
+    decompressed one at a time as they are read. When `memory_map` is set the archive is
+    memory-mapped rather than read through a file handle.
+    """
+
+    def __init__(self, path: str, memory_map: bool = True):
+        self.path = path
+        self.memory_map = memory_map
+        self._archive: Optional[zipfile.ZipFile] = None
+        self._mapped: Optional[mmap.mmap] = None
+
+    def __getstate__(self):
+        # Open archives can't be pickled. Each worker process opens its own.
+        return {'path': self.path, 'memory_map': self.memory_map, '_archive': None, '_mapped': None}
+
+    def _open(self) -> zipfile.ZipFile:
+        if self._archive is None:
+            if self.memory_map:
+                with open(self.path, 'rb') as f:
+                    self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._archive = zipfile.ZipFile(_MappedFile(self._mapped))
+            else:
+                self._archive = zipfile.ZipFile(self.path)
+        return self._archive
+
+    def close(self):
+        # ZipFile leaves file objects it was given open, so the mapping is closed separately
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+    def names(self) -> Iterator[str]:
+        for info in self._open().infolist():
+            if not info.is_dir() and info.filename.endswith('.json'):
+                yield info.filename
+
+    def read(self, name: str) -> bytes:
+        return self._open().read(name)
+
+    def content_hash(self, name: str) -> str:
+        info = self._open().getinfo(name)
+        return _format_content_hash(info.CRC, info.file_size)
+
+
+def open_bioguide_source(path: str) -> BioguideSource:
+    """
+    Pick a source for `path`, which may be a zip archive of profiles, a directory of
+    extracted profiles, or a glob pattern matching profile files.
+    """
+    if os.path.isdir(path):
+        return DirectorySource(path)
+    if os.path.isfile(path) and zipfile.is_zipfile(path):
+        return ZipSource(path)
+    return GlobSource(path)
+
+
+def load_bioguide_entry(raw: bytes) -> BioguideEntry:
+    data = json.loads(raw)
 
     if 'data' in data:
-        entry = BioguideEntry(**data)
+        return BioguideEntry(**data)
     else:
-        entry = BioguideEntry(data=PoliticianData(**data))
+        return BioguideEntry(data=PoliticianData(**data))
+
+
+# Profiles are either wrapped in `{"data": ...}` or not
+_LEAN_ENTRY: TypeAdapter[Union[LeanBioguideEntry, LeanPoliticianData]] = TypeAdapter(
+    Annotated[Union[LeanBioguideEntry, LeanPoliticianData], Field(union_mode='left_to_right')]
+)
+
+
+def load_lean_bioguide_entry(raw: bytes) -> LeanBioguideEntry:
+    """
+    Parse only the fields written to the database straight from the profile's JSON, without
+    building or validating the assets, creative works, research records, name history and
+    job details that `load_bioguide_entry` does.
+    """
+    entry = _LEAN_ENTRY.validate_json(raw)
+    if isinstance(entry, LeanPoliticianData):
+        return LeanBioguideEntry.model_construct(data=entry)
+    return entry
+
+
+def parse_bioguide_entry(raw: bytes, strict: bool = False) -> AnyBioguideEntry:
+    """Parse a profile with `load_bioguide_entry` when `strict`, and `load_lean_bioguide_entry` otherwise"""
+    return load_bioguide_entry(raw) if strict else load_lean_bioguide_entry(raw)
+
+
+def load_bioguide_file(path: str) -> BioguideEntry:
+    with open(path, 'rb') as f:
+        return load_bioguide_entry(f.read())
+
+
+def insert_bioguide_file(path: str, session: Session):
+    entry = load_bioguide_file(path)
+    execute_write(session, 'bioguide', insert_bioguide_entry, entry, rows=1)
+    logger.info ("Inserted %s %s into database", entry.data.givenName, entry.data.familyName)
+
+
+def insert_bioguide_profile(source: BioguideSource, name: str, session: Session, content_hash: Optional[str] = None, strict: bool = False):
+    raw = source.read(name)
+    with metrics.timed(metrics.PARSE_SECONDS, source='bioguide'):
+        entry = parse_bioguide_entry(raw, strict)
+    metrics.record_document('bioguide', len(raw))
+
+    def insert(tx: Transaction):
+        insert_bioguide_entry(tx, entry)
+        if content_hash is not None:
+            record_profile_hashes(tx, [{
+                'name': profile_key(name),
+                'content_hash': content_hash,
+                'bioguide_id': entry.data.usCongressBioId,
+            }])
 
-    session.execute_write(insert_bioguide_entry, entry)
+    execute_write(session, 'bioguide', insert, rows=1)
     logger.info ("Inserted %s %s into database", entry.data.givenName, entry.data.familyName)
-    
-def insert_all_legislators(glob_pattern: str, driver: Driver):
-    files = glob.glob(glob_pattern)
-    logger.debug("Found %d legislators to insert", len(files))
-    with driver.session() as session:
-        session.run("""CREATE CONSTRAINT legislator_bioguide_id_unique IF NOT EXISTS
-                    FOR (l: Legislator)
-                    REQUIRE l.bioguide_id IS UNIQUE
-        """)
-        session.run("""CREATE CONSTRAINT congress_number_unique IF NOT EXISTS
-                    FOR (c: Congress)
-                    REQUIRE c.number IS UNIQUE
-        """)
-        session.run("""CREATE CONSTRAINT party_name_unique IF NOT EXISTS
-                    FOR (p: Party)
-                    REQUIRE p.name IS UNIQUE
-        """)
-        session.run("""CREATE CONSTRAINT state_code_unique IF NOT EXISTS
-                    FOR (s: State)
-                    REQUIRE s.code IS UNIQUE
-        """)
-
-        for file in files:
-            insert_bioguide_file(file, session)
-
-
-    
\ No newline at end of file
+
+
+def parse_bioguide_profile(source: BioguideSource, name: str, content_hash: Optional[str] = None, strict: bool = False) -> LegislatorRecord:
+    # When called in a pool worker these metrics stay in the worker, so parse times are only
+    # reported for profiles parsed in this process
+    raw = source.read(name)
+    with metrics.timed(metrics.PARSE_SECONDS, source='bioguide'):
+        entry = parse_bioguide_entry(raw, strict)
+    with metrics.timed(metrics.MODEL_SECONDS, source='bioguide'):
+        record = to_legislator_record(entry)
+    metrics.record_document('bioguide', len(raw))
+    if content_hash is not None:
+        record.profile_name = profile_key(name)
+        record.content_hash = content_hash
+    return record
+
+
+# Source the profiles of a pool worker are read from, unpickled once when the worker starts
+_worker_source: Optional[BioguideSource] = None
+
+
+def _init_parse_worker(source: BioguideSource):
+    global _worker_source
+    _worker_source = source
+
+
+def _parse_in_worker(name: str, content_hash: Optional[str], strict: bool) -> LegislatorRecord:
+    assert _worker_source is not None, "called outside a worker started by parse_bioguide_profiles_in_pool"
+    return parse_bioguide_profile(_worker_source, name, content_hash, strict)
+
+
+def parse_bioguide_profiles_in_pool(source: BioguideSource, profiles: Iterable[Tuple[str, Optional[str]]], workers: int, queue_depth: int, strict: bool = False) -> Iterator[LegislatorRecord]:
+    """
+    Parse and validate `(name, content_hash)` profiles in `workers` processes, yielding records in
+    the order given.
+
+    At most `queue_depth` profiles are parsing or parsed but not yet consumed, so a slow database
+    writer applies backpressure to the pool instead of letting records pile up in memory.
+
+    Each worker is given `source` once, when it starts, and keeps it open for every profile it
+    parses, so a zip archive is opened and its directory read once per worker. Tasks only carry
+    the profile's name.
+    """
+    queue_depth = max(queue_depth, 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker, initargs=(source,)) as pool:
+        pending: Deque[Future[LegislatorRecord]] = deque()
+        for name, content_hash in profiles:
+            if len(pending) >= queue_depth:
+                yield pending.popleft().result()
+            pending.append(pool.submit(_parse_in_worker, name, content_hash, strict))
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def insert_legislator_records(records: Iterable[LegislatorRecord], session: Session, batch_size: int):
+    for chunk in batched(records, max(batch_size, 1)):
+        execute_write(session, 'bioguide', insert_bioguide_batch, list(chunk), rows=len(chunk))
+        logger.info("Inserted batch of %d legislators into database", len(chunk))
+
+
+def insert_legislator_records_in_parallel(records: Iterable[LegislatorRecord], driver: Driver, batch_size: int, writers: int, queue_depth: int = 16):
+    """
+    Write records on `writers` sessions at once, partitioned by bioguide ID, so each legislator
+    is always written by the same writer. Each writer's batches are written in bioguide ID order,
+    so concurrent batches lock the relatives they share in the same order rather than deadlocking.
+    """
+    batch_size = max(batch_size, 1)
+    with ParallelWriter(driver, 'bioguide', writers, queue_depth) as writer:
+        batches: List[List[LegislatorRecord]] = [[] for _ in range(writer.writers)]
+        pending: Deque[Future] = deque()
+
+        def submit(batch: List[LegislatorRecord]):
+            batch.sort(key=lambda record: record.bioguide_id)
+            pending.append(writer.submit(batch[0].bioguide_id, insert_bioguide_batch, batch, rows=len(batch)))
+            # Surface failures as they happen rather than once everything has been submitted
+            while pending and pending[0].done():
+                pending.popleft().result()
+
+        for record in records:
+            partition = writer.partition(record.bioguide_id)
+            batches[partition].append(record)
+            if len(batches[partition]) >= batch_size:
+                submit(batches[partition])
+                batches[partition] = []
+
+        for batch in batches:
+            if len(batch) != 0:
+                submit(batch)
+        for future in pending:
+            future.result()
+    logger.info("Inserted legislators with %d writers", writers)
+
+
+def insert_bioguide_profiles_batched(source: BioguideSource, names: Iterable[str], session: Session, batch_size: int, strict: bool = False):
+    records = (parse_bioguide_profile(source, name, strict=strict) for name in names)
+    insert_legislator_records(records, session, batch_size)
+
+
+def changed_profiles(source: BioguideSource, known_hashes: Dict[str, str], report: SyncReport) -> Iterator[Tuple[str, str]]:
+    """
+    Yield `(name, content_hash)` for each profile in `source` whose hash differs from
+    `known_hashes`, counting what was added, changed and skipped in `report`.
+    """
+    for name in source.names():
+        content_hash = source.content_hash(name)
+        known_hash = known_hashes.get(profile_key(name))
+        if known_hash == content_hash:
+            report.skipped += 1
+            continue
+
+        if known_hash is None:
+            report.added += 1
+        else:
+            report.changed += 1
+        yield name, content_hash
+
+
+def insert_all_legislators(path: str, driver: Driver, batch_size: int = 0, parse_workers: int = 0, queue_depth: int = 1000, full_refresh: bool = False, strict: bool = False, writers: int = 1, writer_queue_depth: int = 16) -> SyncReport:
+    """
+    Insert every bioguide profile found at `path` that is new or has changed since the last sync.
+
+    Args:
+        path (str): `BioguideProfiles.zip`, a directory it was extracted to, or a glob pattern
+            matching profile json files.
+        driver (Driver): Database to insert into.
+        batch_size (int): Number of profiles written per transaction. When zero, each profile is
+            written with its own transaction and a statement per row.
+        parse_workers (int): Number of processes parsing profiles while this process writes to the
+            database. When zero, profiles are parsed in this process.
+        queue_depth (int): Maximum number of profiles parsed ahead of the database writer when
+            `parse_workers` is set.
+        full_refresh (bool): Re-insert every profile, even those whose contents haven't changed.
+        strict (bool): Validate every field of each profile, rather than only reading the fields
+            written to the database.
+        writers (int): Number of sessions writing profiles at once. With more than one, profiles
+            are always written in batches, of at least one profile.
+        writer_queue_depth (int): Maximum number of batches waiting for each writer when
+            `writers` is more than one. Once a writer's queue is full, parsing waits.
+
+    Returns:
+        SyncReport: How many profiles were added, changed or skipped.
+    """
+    source = open_bioguide_source(path)
+    logger.debug("Reading legislators from %s using %s", path, type(source).__name__)
+    with source, driver.session() as session:
+        known_hashes = {} if full_refresh else load_profile_hashes(session)
+        report = SyncReport()
+        profiles = changed_profiles(source, known_hashes, report)
+
+        if parse_workers > 0:
+            records = parse_bioguide_profiles_in_pool(source, profiles, parse_workers, queue_depth, strict)
+        else:
+            records = (parse_bioguide_profile(source, name, content_hash, strict) for name, content_hash in profiles)
+
+        if writers > 1:
+            insert_legislator_records_in_parallel(records, driver, batch_size, writers, writer_queue_depth)
+        elif parse_workers > 0 or batch_size > 0:
+            insert_legislator_records(records, session, batch_size)
+        else:
+            for name, content_hash in profiles:
+                insert_bioguide_profile(source, name, session, content_hash, strict)
+
+    logger.info("Synced bioguide profiles: %d added, %d changed, %d skipped", report.added, report.changed, report.skipped)
+    return report
@@ -0,0 +1,518 @@
+"""
+Build an empty database in bulk rather than a MERGE at a time.
+
+`write` parses every bioguide profile and every House and Senate roll call, from the network or
+from the archive when `VOTE_SCRAPER_REPLAY_ARCHIVE` is set, into node and relationship CSV files
+in the format `neo4j-admin database import full` reads, and prints the command importing them.
+`load` is the fallback for a database that is already running: it creates the same graph from
+those files with batched `LOAD CSV`, and must only be run against an empty database.
+
+Either way the graph is the one the scraper would have written, scrape cursors and bioguide
+profile hashes included, so later runs of `python -m scraper` carry on from where the files end.
+Constraints and indexes are left to the migrations the scraper applies at startup.
+
+Usage:
+    python -m scraper.bootstrap write OUTPUT [--database neo4j]
+    python -m scraper.bootstrap load OUTPUT --url file:///bootstrap [--batch-size 10000]
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from enum import Enum
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+import argparse
+import csv
+import logging
+import os
+import re
+import shlex
+
+from neo4j import Driver
+
+import scraper.models as models
+from .settings import Settings
+from .database import POSITIONS_RECORDED, connect
+from .schema import migrate
+from .archive import VoteArchive, VoteDocument
+from .pipeline import Pipeline
+from .bioguide import LegislatorRecord, open_bioguide_source, parse_bioguide_profile, parse_bioguide_profiles_in_pool
+from .senate.resolver import SenatorResolver
+from . import house, senate, metrics
+
+logger = logging.getLogger(__name__)
+
+# Separates the values of list properties, e.g. the parties of a congress membership
+ARRAY_DELIMITER = ';'
+# Separates the chamber, congress, session and number making up a roll call's ID
+KEY_SEPARATOR = '|'
+
+DEFAULT_LOAD_CSV_BATCH_SIZE = 10000
+
+
+@dataclass(frozen=True)
+class BulkFile:
+    """A node file, given the labels of its nodes, or a relationship file, given their type"""
+    name: str
+    labels: Tuple[str, ...] = ()
+    relationship_type: Optional[str] = None
+
+
+LEGISLATORS = BulkFile('legislators.csv', ('Legislator',))
+# Relatives without a profile of their own, the bare nodes MERGE would leave for them
+RELATIVES = BulkFile('relatives.csv', ('Legislator',))
+CONGRESSES = BulkFile('congresses.csv', ('Congress',))
+STATES = BulkFile('states.csv', ('State',))
+PARTIES = BulkFile('parties.csv', ('Party',))
+BIOGUIDE_PROFILES = BulkFile('bioguide_profiles.csv', ('BioguideProfile',))
+# Left for the agreement update to count, as roll calls the scraper writes are
+ROLL_CALLS = BulkFile('roll_calls.csv', ('RollCall', 'AgreementPending'))
+SCRAPE_CURSORS = BulkFile('scrape_cursors.csv', ('ScrapeCursor',))
+
+IS_RELATED_TO = BulkFile('is_related_to.csv', relationship_type='IS_RELATED_TO')
+IS_MEMBER_OF_CONGRESS = BulkFile('is_member_of_congress.csv', relationship_type='IS_MEMBER_OF_CONGRESS')
+REPRESENTS = BulkFile('represents.csv', relationship_type='REPRESENTS')
+IS_MEMBER_OF_PARTY = BulkFile('is_member_of_party.csv', relationship_type='IS_MEMBER_OF_PARTY')
+DURING_CONGRESS = BulkFile('during_congress.csv', relationship_type='DURING_CONGRESS')
+VOTED_ON = BulkFile('voted_on.csv', relationship_type='VOTED_ON')
+CURRENTLY_REPRESENTS = BulkFile('currently_represents.csv', relationship_type='CURRENTLY_REPRESENTS')
+CURRENTLY_MEMBER_OF = BulkFile('currently_member_of.csv', relationship_type='CURRENTLY_MEMBER_OF')
+
+# In the order `load` reads them, every node before the relationships between them
+NODE_FILES = (LEGISLATORS, RELATIVES, CONGRESSES, STATES, PARTIES, BIOGUIDE_PROFILES, ROLL_CALLS, SCRAPE_CURSORS)
+RELATIONSHIP_FILES = (
+    IS_RELATED_TO, IS_MEMBER_OF_CONGRESS, REPRESENTS, IS_MEMBER_OF_PARTY,
+    DURING_CONGRESS, VOTED_ON, CURRENTLY_REPRESENTS, CURRENTLY_MEMBER_OF,
+)
+
+# The properties `LOAD CSV` matches the node with ID `$id` in each ID space by. They are the keys
+# the schema's constraints are on, so each match is an index lookup.
+ID_PROPERTIES = {
+    'Legislator': "{bioguide_id: $id}",
+    'Congress': "{number: toInteger($id)}",
+    'State': "{code: $id}",
+    'Party': "{name: $id}",
+    'RollCall': (
+        f"{{chamber: split($id, '{KEY_SEPARATOR}')[0], congress: toInteger(split($id, '{KEY_SEPARATOR}')[1]), "
+        f"session: toInteger(split($id, '{KEY_SEPARATOR}')[2]), number: toInteger(split($id, '{KEY_SEPARATOR}')[3])}}"
+    ),
+}
+
+# How `LOAD CSV` converts `$value`, the text of a column, to each neo4j-admin type
+CONVERSIONS = {
+    'string': "$value",
+    'int': "toInteger($value)",
+    'boolean': "toBoolean($value)",
+    'date': "date($value)",
+    'localdatetime': "localdatetime($value)",
+    'datetime': "datetime($value)",
+    'string[]': f"split($value, '{ARRAY_DELIMITER}')",
+}
+
+LEGISLATOR_PROPERTIES = list(models.Legislator.model_fields)
+LEGISLATOR_COLUMNS = [':ID(Legislator)'] + [
+    f'{name}:boolean' if models.Legislator.model_fields[name].annotation == Optional[bool] else name
+    for name in LEGISLATOR_PROPERTIES
+] + ['lis_member_id']
+
+ROLL_CALL_PROPERTIES = ['chamber', 'congress', 'session', 'number', 'when', 'question', POSITIONS_RECORDED]
+ROLL_CALL_COLUMNS = [':ID(RollCall)', 'chamber', 'congress:int', 'session:int', 'number:int', 'when:localdatetime', 'question', f'{POSITIONS_RECORDED}:boolean']
+# Followed by these for each party, see `database.party_positions`
+PARTY_POSITION_PROPERTIES = ('party_votes_{}', 'party_majority_{}', 'party_majority_votes_{}')
+PARTY_POSITION_COLUMNS = ('party_votes_{}:int', 'party_majority_{}', 'party_majority_votes_{}:int')
+
+# `name:type` for a property, or `:ID(space)`, `:START_ID(space)` or `:END_ID(space)`
+_HEADER = re.compile(r'^(?P<name>[^:]*)(?::(?P<id_type>[A-Z_]+)\((?P<space>\w+)\)|:(?P<type>[\w\[\]]+))?$')
+
+
+def roll_call_id(rc: Dict[str, Any]) -> str:
+    return KEY_SEPARATOR.join(str(_format(rc[key])) for key in ('chamber', 'congress', 'session', 'number'))
+
+
+def _format(value: Any) -> Any:
+    """Format a property value the way neo4j-admin and `LOAD CSV` read it back"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return ARRAY_DELIMITER.join(str(item) for item in value)
+    return value
+
+
+class _CsvWriter:
+    """
+    Writes one bulk file. Strings are always quoted, so an empty string is kept as one while a
+    missing value, written as an empty unquoted field, leaves the property unset.
+    """
+
+    def __init__(self, directory: str, bulk_file: BulkFile, columns: Sequence[str]):
+        self.rows = 0
+        self._file = open(os.path.join(directory, bulk_file.name), 'w', newline='', encoding='utf-8')
+        self._file.write(','.join(columns) + '\n')
+        self._writer = csv.writer(self._file, quoting=csv.QUOTE_STRINGS, lineterminator='\n')
+
+    def write(self, row: Sequence[Any]):
+        self._writer.writerow([_format(value) for value in row])
+        self.rows += 1
+
+    def close(self):
+        self._file.close()
+
+
+def _write_file(directory: str, bulk_file: BulkFile, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+    writer = _CsvWriter(directory, bulk_file, columns)
+    try:
+        for row in rows:
+            writer.write(row)
+    finally:
+        writer.close()
+    return writer.rows
+
+
+class BulkGraph:
+    """
+    The graph the scraper would write, built up in the order it would write it. Nodes, and
+    relationships between the same two nodes, are deduplicated the way MERGE would, the first
+    written being kept.
+
+    Recorded votes, by far the most numerous, are streamed to `VOTED_ON` as they are added.
+    Everything else is held until `close`, since e.g. the LIS member ID of a senator is only
+    known once their votes have been read.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.legislators: Dict[str, Dict[str, Any]] = {}
+        self.relatives: Set[str] = set()
+        self.congresses: Dict[int, Dict[str, Any]] = {}
+        self.states: Set[str] = set()
+        self.parties: Dict[str, Optional[str]] = {}
+        self.profiles: List[Tuple[str, str, str]] = []
+        self.relationships: Dict[BulkFile, Dict[Tuple[Any, Any], Tuple[Any, ...]]] = {}
+        self.roll_calls: Dict[str, Dict[str, Any]] = {}
+        # State and party each legislator last voted as, where one exists to point at
+        self.current_state: Dict[str, str] = {}
+        self.current_party: Dict[str, str] = {}
+        self.cursors: Dict[models.Chamber, Dict[str, int]] = {}
+        self._voted_on = _CsvWriter(directory, VOTED_ON, [':START_ID(Legislator)', ':END_ID(RollCall)', 'vote'])
+
+    def _relate(self, bulk_file: BulkFile, start: Any, end: Any, *properties: Any):
+        self.relationships.setdefault(bulk_file, {}).setdefault((start, end), properties)
+
+    def add_legislator(self, record: LegislatorRecord):
+        """Add a profile as `insert_bioguide_batch` would write it"""
+        self.legislators.setdefault(record.bioguide_id, record.legislator)
+        if record.profile_name is not None and record.content_hash is not None:
+            self.profiles.append((record.profile_name, record.content_hash, record.bioguide_id))
+
+        for relation in record.relationships:
+            self.relatives.add(relation['relative_id'])
+            self._relate(IS_RELATED_TO, record.bioguide_id, relation['relative_id'], relation['is_related_to']['relationship_type'])
+        for membership in record.congresses:
+            congress = membership['congress']
+            self.congresses.setdefault(congress['number'], congress)
+            self._relate(IS_MEMBER_OF_CONGRESS, record.bioguide_id, congress['number'], membership['membership']['parties'])
+        for representation in record.states:
+            self.states.add(representation['state']['code'])
+            self._relate(REPRESENTS, record.bioguide_id, representation['state']['code'])
+        for affiliation in record.parties:
+            party = affiliation['party']
+            self.parties.setdefault(party['name'], party.get('abbreviation'))
+            self._relate(IS_MEMBER_OF_PARTY, record.bioguide_id, party['name'])
+
+    def members_of_congress(self, congress: int) -> Iterator[Tuple[str, str, str, str]]:
+        """Members of `congress` as `SenatorResolver.index_congress` takes them, found as its own query would"""
+        members = {start for start, end in self.relationships.get(IS_MEMBER_OF_CONGRESS, {}) if end == congress}
+        states: Dict[str, List[str]] = {}
+        for start, end in self.relationships.get(REPRESENTS, {}):
+            if start in members:
+                states.setdefault(start, []).append(end)
+        for start, end in self.relationships.get(IS_MEMBER_OF_PARTY, {}):
+            abbreviation = self.parties[end]
+            if start in members and abbreviation is not None:
+                family_name = self.legislators[start]['unaccented_family_name']
+                for state in states.get(start, []):
+                    yield start, family_name, state, abbreviation
+
+    def add_roll_call(self, rc: Dict[str, Any], votes: Iterable[Dict[str, Any]], position: Dict[str, int]):
+        """Add a roll call as `INSERT_ROLL_CALL_QUERY` would write it, and advance its chamber's cursor"""
+        key = roll_call_id(rc)
+        if key not in self.roll_calls:
+            self.roll_calls[key] = rc
+            self.congresses.setdefault(rc['congress'], {'number': rc['congress']})
+            self._relate(DURING_CONGRESS, key, rc['congress'])
+
+            abbreviations = set(self.parties.values())
+            voted: Set[str] = set()
+            for vote in votes:
+                bioguide_id = vote['bioguide_id']
+                if bioguide_id in voted or (bioguide_id not in self.legislators and bioguide_id not in self.relatives):
+                    continue
+                voted.add(bioguide_id)
+                self._voted_on.write((bioguide_id, key, vote['voted_on']['vote']))
+                if vote['state'] in self.states:
+                    self.current_state[bioguide_id] = vote['state']
+                if vote['party'] in abbreviations:
+                    self.current_party[bioguide_id] = vote['party']
+
+        self.cursors[rc['chamber']] = position
+
+    def add_house_vote(self, rc_vote: house.RollCallVote):
+        rc, votes = house.roll_call_parameters(rc_vote)
+        self.add_roll_call(rc, votes, house.cursor_position(rc_vote))
+
+    def add_senate_vote(self, vote: senate.RollCallVote, resolver: SenatorResolver):
+        if not resolver.is_indexed(vote.congress):
+            resolver.index_congress(vote.congress, self.members_of_congress(vote.congress))
+        self.add_roll_call(senate.roll_call_properties(vote), senate.resolve_vote_casts(vote, resolver), senate.cursor_position(vote))
+
+    def close(self, lis_member_ids: Dict[str, str]) -> Dict[BulkFile, int]:
+        """
+        Write out everything held in memory.
+
+        Args:
+            lis_member_ids: LIS member ID of each senator resolved, by bioguide ID
+
+        Returns:
+            Number of rows written to each file
+        """
+        self._voted_on.close()
+        counts = {VOTED_ON: self._voted_on.rows}
+
+        def write(bulk_file: BulkFile, columns: Sequence[str], rows: Iterable[Sequence[Any]]):
+            counts[bulk_file] = _write_file(self.directory, bulk_file, columns, rows)
+
+        def relationships(bulk_file: BulkFile) -> Iterator[Tuple[Any, ...]]:
+            for (start, end), properties in self.relationships.get(bulk_file, {}).items():
+                yield start, end, *properties
+
+        write(LEGISLATORS, LEGISLATOR_COLUMNS, (
+            [bioguide_id] + [legislator.get(name) for name in LEGISLATOR_PROPERTIES] + [lis_member_ids.get(bioguide_id)]
+            for bioguide_id, legislator in self.legislators.items()
+        ))
+        write(RELATIVES, [':ID(Legislator)', 'bioguide_id'], (
+            (bioguide_id, bioguide_id) for bioguide_id in sorted(self.relatives - self.legislators.keys())
+        ))
+        write(CONGRESSES, [':ID(Congress)', 'number:int', 'start_date:date', 'end_date:date'], (
+            (number, number, congress.get('start_date'), congress.get('end_date')) for number, congress in self.congresses.items()
+        ))
+        write(STATES, [':ID(State)', 'code'], ((code, code) for code in sorted(self.states)))
+        write(PARTIES, [':ID(Party)', 'name', 'abbreviation'], ((name, name, abbreviation) for name, abbreviation in self.parties.items()))
+        write(BIOGUIDE_PROFILES, ['name', 'content_hash', 'bioguide_id'], self.profiles)
+
+        prefix = PARTY_POSITION_PROPERTIES[0].format('')
+        parties = sorted({name[len(prefix):] for rc in self.roll_calls.values() for name in rc if name.startswith(prefix)})
+        position_properties = [name.format(party) for party in parties for name in PARTY_POSITION_PROPERTIES]
+        write(ROLL_CALLS, ROLL_CALL_COLUMNS + [column.format(party) for party in parties for column in PARTY_POSITION_COLUMNS], (
+            [key] + [rc.get(name) for name in ROLL_CALL_PROPERTIES + position_properties]
+            for key, rc in self.roll_calls.items()
+        ))
+
+        updated_at = datetime.now(timezone.utc)
+        write(SCRAPE_CURSORS, ['chamber', 'year:int', 'congress:int', 'session:int', 'number:int', 'updated_at:datetime'], (
+            (chamber, position.get('year'), position.get('congress'), position.get('session'), position.get('number'), updated_at)
+            for chamber, position in self.cursors.items()
+        ))
+
+        write(IS_RELATED_TO, [':START_ID(Legislator)', ':END_ID(Legislator)', 'relationship_type'], relationships(IS_RELATED_TO))
+        write(IS_MEMBER_OF_CONGRESS, [':START_ID(Legislator)', ':END_ID(Congress)', 'parties:string[]'], relationships(IS_MEMBER_OF_CONGRESS))
+        write(REPRESENTS, [':START_ID(Legislator)', ':END_ID(State)'], relationships(REPRESENTS))
+        write(IS_MEMBER_OF_PARTY, [':START_ID(Legislator)', ':END_ID(Party)'], relationships(IS_MEMBER_OF_PARTY))
+        write(DURING_CONGRESS, [':START_ID(RollCall)', ':END_ID(Congress)'], relationships(DURING_CONGRESS))
+        write(CURRENTLY_REPRESENTS, [':START_ID(Legislator)', ':END_ID(State)'], self.current_state.items())
+        write(CURRENTLY_MEMBER_OF, [':START_ID(Legislator)', ':END_ID(Party)'], (
+            (bioguide_id, name)
+            for bioguide_id, abbreviation in self.current_party.items()
+            for name, party_abbreviation in self.parties.items() if party_abbreviation == abbreviation
+        ))
+        return counts
+
+
+def _house_documents(settings: Settings, replay: Optional[VoteArchive]) -> Iterator[VoteDocument]:
+    """Every House roll call from the resume year on, read from `replay` or otherwise fetched"""
+    if replay is not None:
+        return house.replay_house_starting_at(replay, settings.resume_year, 1)
+    return house.fetch_house_starting_at(settings, settings.resume_year, 1)
+
+
+def _senate_documents(settings: Settings, replay: Optional[VoteArchive]) -> Iterator[VoteDocument]:
+    """Every Senate roll call from the resume congress on, read from `replay` or otherwise fetched"""
+    if replay is not None:
+        return senate.replay_senate_starting_at(replay, settings.resume_congress, 1, 1)
+    return senate.fetch_senate_starting_at(settings, settings.resume_congress, 1, 1)
+
+
+def _add_all(add: Callable[[Any], None], items: Iterator[Any]) -> int:
+    added = 0
+    for item in items:
+        add(item)
+        added += 1
+    return added
+
+
+def write_bulk_files(settings: Settings, directory: str) -> Dict[BulkFile, int]:
+    """
+    Parse every profile, and every roll call from `VOTE_SCRAPER_RESUME_YEAR` and
+    `VOTE_SCRAPER_RESUME_CONGRESS` on, into bulk files in `directory`.
+
+    Returns:
+        Number of rows written to each file
+    """
+    archive = VoteArchive.from_settings(settings)
+    if settings.replay_archive and archive is None:
+        raise ValueError("Replaying votes requires VOTE_SCRAPER_ARCHIVE_PATH to be set")
+    graph = BulkGraph(directory)
+
+    with open_bioguide_source(settings.bioguide_path) as source:
+        profiles = ((name, source.content_hash(name)) for name in source.names())
+        if settings.bioguide_parse_workers > 0:
+            records = parse_bioguide_profiles_in_pool(source, profiles, settings.bioguide_parse_workers, settings.bioguide_queue_depth, settings.bioguide_strict)
+        else:
+            records = (parse_bioguide_profile(source, name, content_hash, settings.bioguide_strict) for name, content_hash in profiles)
+        logger.info("Read %d bioguide profiles", _add_all(graph.add_legislator, records))
+
+    # Fetched documents are archived as they are parsed, as the scraper would
+    replay_archive = archive if settings.replay_archive else None
+    parse_archive = None if settings.replay_archive else archive
+    Pipeline('house', settings.pipeline_queue_depth).run(
+        ('fetch', _house_documents(settings, replay_archive)),
+        [('parse', partial(house.parse_house_document, archive=parse_archive))],
+        ('write', partial(_add_all, graph.add_house_vote)),
+    )
+
+    # Senators are matched against the profiles just read rather than the graph
+    resolver = senate.create_senator_resolver(settings, None)
+    Pipeline('senate', settings.pipeline_queue_depth).run(
+        ('fetch', _senate_documents(settings, replay_archive)),
+        [('parse', partial(senate.parse_senate_document, archive=parse_archive))],
+        ('write', partial(_add_all, partial(graph.add_senate_vote, resolver=resolver))),
+    )
+
+    lis_member_ids = {bioguide_id: lis_member_id for lis_member_id, bioguide_id in resolver.learned_lis_member_ids.items()}
+    counts = graph.close(lis_member_ids)
+    for bulk_file, rows in counts.items():
+        logger.info("Wrote %d rows to %s", rows, bulk_file.name)
+    return counts
+
+
+def import_command(directory: str, database: str = 'neo4j') -> List[str]:
+    """The `neo4j-admin` command importing the bulk files in `directory` into an empty `database`"""
+    directory = os.path.abspath(directory)
+    command = [
+        'neo4j-admin', 'database', 'import', 'full', database,
+        f'--array-delimiter={ARRAY_DELIMITER}',
+        '--multiline-fields=true',
+    ]
+    for bulk_file in NODE_FILES:
+        command.append(f"--nodes={':'.join(bulk_file.labels)}={os.path.join(directory, bulk_file.name)}")
+    for bulk_file in RELATIONSHIP_FILES:
+        command.append(f"--relationships={bulk_file.relationship_type}={os.path.join(directory, bulk_file.name)}")
+    return command
+
+
+def _read_header(path: str) -> List[str]:
+    with open(path, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f))
+
+
+def _column(header: str) -> str:
+    return f"row.`{header}`"
+
+
+def _properties(headers: Sequence[str]) -> str:
+    properties = []
+    for header in headers:
+        match = _HEADER.match(header)
+        if match is None or match['id_type'] is not None:
+            continue
+        conversion = CONVERSIONS[match['type'] or 'string']
+        properties.append(f"`{match['name']}`: {conversion.replace('$value', _column(header))}")
+    return '{' + ', '.join(properties) + '}'
+
+
+def _match_node(variable: str, headers: Sequence[str], id_type: str) -> str:
+    for header in headers:
+        match = _HEADER.match(header)
+        if match is not None and match['id_type'] == id_type:
+            space = match['space']
+            return f"MATCH ({variable}: {space} {ID_PROPERTIES[space].replace('$id', _column(header))})"
+    raise ValueError(f"No {id_type} column in {headers}")
+
+
+def load_csv_query(bulk_file: BulkFile, headers: Sequence[str], batch_size: int = DEFAULT_LOAD_CSV_BATCH_SIZE) -> str:
+    """
+    `LOAD CSV` query creating what a bulk file with `headers` holds, read from `$url`.
+    Relationships are created between nodes already loaded, found by their ID.
+    """
+    if bulk_file.relationship_type is None:
+        write = f"""
+            CREATE (n: {':'.join(bulk_file.labels)} {_properties(headers)})"""
+    else:
+        write = f"""
+            {_match_node('start', headers, 'START_ID')}
+            {_match_node('end', headers, 'END_ID')}
+            CREATE (start)-[: {bulk_file.relationship_type} {_properties(headers)}]->(end)"""
+
+    return f"""
+        LOAD CSV WITH HEADERS FROM $url AS row
+        CALL {{
+            WITH row{write}
+        }} IN TRANSACTIONS OF {batch_size} ROWS
+    """
+
+
+def load_bulk_files(driver: Driver, directory: str, url: str, batch_size: int = DEFAULT_LOAD_CSV_BATCH_SIZE):
+    """
+    Create the graph held by the bulk files in `directory` in an empty, running database.
+
+    Args:
+        directory: Where the files were written, to read their headers from
+        url: Where the database reads the same files from, e.g. `file:///bootstrap` for files
+            copied to `bootstrap` in its import directory
+        batch_size: Number of rows committed per transaction
+    """
+    # Constraints first, so relationships find their nodes through an index
+    migrate(driver)
+    with driver.session() as session:
+        for bulk_file in NODE_FILES + RELATIONSHIP_FILES:
+            query = load_csv_query(bulk_file, _read_header(os.path.join(directory, bulk_file.name)), batch_size)
+            with metrics.timed(metrics.TRANSACTION_SECONDS, stage='bootstrap'):
+                summary = session.run(query, url=f"{url.rstrip('/')}/{bulk_file.name}").consume()
+            metrics.record_summary('bootstrap', summary)
+            logger.info("Loaded %s: %s", bulk_file.name, summary.counters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    write = commands.add_parser("write", help="Parse profiles and roll calls into bulk files")
+    write.add_argument("output", help="Directory to write the files to")
+    write.add_argument("--database", default="neo4j", help="Database named in the printed neo4j-admin command")
+    load = commands.add_parser("load", help="Load bulk files into a running, empty database with LOAD CSV")
+    load.add_argument("output", help="Directory the files were written to")
+    load.add_argument("--url", required=True, help="URL the database reads that directory from, e.g. file:///bootstrap")
+    load.add_argument("--batch-size", type=int, default=DEFAULT_LOAD_CSV_BATCH_SIZE, help="Rows committed per transaction")
+    args = parser.parse_args()
+
+    settings = Settings.from_environs()
+    logging.basicConfig(level=settings.log_level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    try:
+        if args.command == "write":
+            write_bulk_files(settings, args.output)
+            print(shlex.join(import_command(args.output, args.database)))
+        else:
+            driver = connect(settings)
+            try:
+                load_bulk_files(driver, args.output, args.url, args.batch_size)
+            finally:
+                driver.close()
+    finally:
+        metrics.export(settings.metrics_textfile)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from typing import Any, Dict, Optional
+
+from neo4j import Driver, Transaction
+
+import scraper.models as models
+
+# One ScrapeCursor node per chamber holds the position of the last roll call written, such that
+# every roll call before it is written too, so resuming only needs a lookup on the chamber.
+#
+# With a single writer the cursor is advanced by the same transaction that writes the roll calls.
+# With several, chunks of roll calls commit in any order, and `RollCallWriter` advances the cursor
+# in a later transaction of its own, once a chunk and every chunk before it have committed. The
+# cursor is then never ahead of the votes in the graph, but may be behind them: roll calls
+# committed after it are written again on resuming, which MERGE makes harmless.
+
+
+def advance_cursor(tx: Transaction, chamber: models.Chamber, position: Dict[str, int]):
+    """
+    Record `position` as the last roll call written for `chamber`. Call from the transaction
+    writing that roll call, or one committed after it.
+
+    The cursor only ever moves forward, comparing positions key by key in the order given, so
+    roll calls written out of order can't move it back.
+    """
+    tx.run("""
+        MERGE (c: ScrapeCursor {chamber: $chamber})
+        WITH c
+        WHERE reduce(comparison = 0, key IN $keys |
+            CASE
+                WHEN comparison <> 0 OR c[key] IS NULL THEN comparison
+                WHEN c[key] < $position[key] THEN -1
+                WHEN c[key] > $position[key] THEN 1
+                ELSE 0
+            END) <= 0
+        SET c += $position
+            , c.updated_at = datetime()
+    """, chamber=chamber.value, position=position, keys=list(position))
+
+
+def read_cursor(driver: Driver, chamber: models.Chamber) -> Optional[Dict[str, Any]]:
+    """Position of the last roll call written for `chamber`, or `None` if nothing has been written"""
+    records, _, _ = driver.execute_query("""
+        MATCH (c: ScrapeCursor {chamber: $chamber})
+        RETURN c
+    """, chamber=chamber.value)
+
+    if len(records) == 0:
+        return None
+    return dict(records[0]['c'])
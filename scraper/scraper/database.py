@@ -1,12 +1,198 @@
-from typing import Iterator
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
 from datetime import datetime
 from dataclasses import asdict
-from .settings import Settings
-from neo4j import GraphDatabase, Driver
+from random import uniform
+from time import monotonic, perf_counter, sleep
+from .settings import DEFAULT_WRITE_RETRY_SECONDS, Settings
+from neo4j import GraphDatabase, Driver, Result, Session, Transaction
+from neo4j.exceptions import DriverError, Neo4jError, TransientError
+from .models import NOT_VOTING
+from . import metrics
 import logging
 
 logger = logging.getLogger(__name__)
 
+DEADLOCK_DETECTED = 'Neo.TransientError.Transaction.DeadlockDetected'
+
+# Backoff between attempts of a write transaction, as the driver's own retries back off
+INITIAL_RETRY_DELAY = 1.0
+RETRY_DELAY_MULTIPLIER = 2.0
+RETRY_DELAY_JITTER = 0.2
+
+# How long `execute_write` retries a transaction for, set from the settings by `connect`
+write_retry_seconds = DEFAULT_WRITE_RETRY_SECONDS
+
+# Writes a roll call from either chamber along with every recorded vote on it. Expects `$rc` to
+# be a dumped `models.RollCall`, with `party_positions` added, and `$votes` a list of
+# `{bioguide_id, state, party, voted_on}`.
+# New roll calls are labelled `AgreementPending` until their votes are added to the agreement counts.
+INSERT_ROLL_CALL_VOTES_QUERY = """
+    MERGE (rc: RollCall {
+        chamber: $rc.chamber,
+        congress: $rc.congress,
+        session: $rc.session,
+        number: $rc.number
+    })
+    ON CREATE SET rc = $rc, rc:AgreementPending
+    MERGE (c: Congress {number: $rc.congress})
+    MERGE (rc)-[:DURING_CONGRESS]->(c)
+    WITH rc
+    UNWIND $votes AS vote
+    MATCH (l: Legislator {bioguide_id: vote.bioguide_id})
+    MERGE (l)-[voted: VOTED_ON]->(rc)
+    ON CREATE SET voted = vote.voted_on
+"""
+
+# Moves each legislator `l` to the state and party of `vote`
+_UPDATE_CURRENT_MEMBERSHIP = """
+    WITH l, vote
+    CALL {
+        // update state
+        WITH l, vote
+        MATCH (new_state: State { code: vote.state })
+        MERGE (l)-[:CURRENTLY_REPRESENTS]->(new_state)
+        WITH l, new_state
+        MATCH (l)-[old_rep: CURRENTLY_REPRESENTS]->(old_state: State)
+        WHERE old_state.code <> new_state.code
+        DELETE old_rep
+    }
+    CALL {
+        // update party
+        WITH l, vote
+        MATCH (new_party: Party { abbreviation: vote.party })
+        MERGE (l)-[:CURRENTLY_MEMBER_OF]->(new_party)
+        WITH l, new_party
+        MATCH (l)-[old_membership: CURRENTLY_MEMBER_OF]->(old_party: Party)
+        WHERE old_party.abbreviation <> new_party.abbreviation
+        DELETE old_membership
+    }
+"""
+
+# As `INSERT_ROLL_CALL_VOTES_QUERY`, also updating each voter's current state and party, so roll
+# calls must be written in order
+INSERT_ROLL_CALL_QUERY = INSERT_ROLL_CALL_VOTES_QUERY + _UPDATE_CURRENT_MEMBERSHIP
+
+# Updates the current state and party of each of `$legislators`, a list of `{bioguide_id, state, party}`
+UPDATE_CURRENT_MEMBERSHIPS_QUERY = """
+    UNWIND $legislators AS vote
+    MATCH (l: Legislator {bioguide_id: vote.bioguide_id})
+""" + _UPDATE_CURRENT_MEMBERSHIP
+
+
+def insert_roll_call_votes(tx: Transaction, roll_calls: Sequence[Tuple[Dict[str, Any], List[Dict[str, Any]]]]):
+    """
+    Write the `$rc` and `$votes` of each roll call with `INSERT_ROLL_CALL_VOTES_QUERY`, leaving
+    the voters' current state and party for `update_current_memberships`. Roll calls written
+    this way can be committed in any order.
+    """
+    for rc, votes in roll_calls:
+        tx.run(INSERT_ROLL_CALL_VOTES_QUERY, rc=rc, votes=votes)
+
+
+def update_current_memberships(tx: Transaction, legislators: List[Dict[str, Any]]):
+    tx.run(UPDATE_CURRENT_MEMBERSHIPS_QUERY, legislators=legislators)
+
+
+# Set on every roll call whose party positions have been stored, even if no party had one
+POSITIONS_RECORDED = 'party_positions_recorded'
+
+
+def party_positions(votes: Iterable[Tuple[Optional[str], str]]) -> Dict[str, Any]:
+    """
+    Summarise how each party voted on a roll call, as properties to store on the `RollCall`.
+
+    For each party abbreviation `P` this gives `party_votes_P`, the number of members that voted,
+    and `party_majority_P` and `party_majority_votes_P`, the most common vote and how many cast
+    it. Members not voting are left out. A party split evenly has no majority. `POSITIONS_RECORDED`
+    is always set, so roll calls without any party positions aren't backfilled again.
+
+    Args:
+        votes: Party abbreviation, if any, and vote of every member recorded on the roll call
+    """
+    tallies: Dict[str, Counter[str]] = {}
+    for party, vote in votes:
+        if vote == NOT_VOTING or party is None:
+            continue
+        tallies.setdefault(party, Counter())[vote] += 1
+
+    properties: Dict[str, Any] = {POSITIONS_RECORDED: True}
+    for party, tally in tallies.items():
+        properties[f'party_votes_{party}'] = tally.total()
+        most_common = tally.most_common(2)
+        if len(most_common) == 1 or most_common[0][1] != most_common[1][1]:
+            properties[f'party_majority_{party}'], properties[f'party_majority_votes_{party}'] = most_common[0]
+    return properties
+
+
+T = TypeVar('T')
+
+
+class _SummarisingTransaction:
+    """Passes everything through to `tx`, keeping each statement's result so its summary can be read once the work is done"""
+
+    def __init__(self, tx: Transaction):
+        self._tx = tx
+        self.results: List[Result] = []
+
+    def run(self, query, parameters=None, **kwargs) -> Result:
+        result = self._tx.run(query, parameters, **kwargs)
+        self.results.append(result)
+        return result
+
+    def __getattr__(self, name: str):
+        return getattr(self._tx, name)
+
+
+def execute_write(session: Session, stage: str, work: Callable[..., T], *args, rows: Optional[int] = None) -> T:
+    """
+    Run `work(tx, *args)` in a write transaction on `session` and commit it, recording the
+    transaction's latency, any retries and the updates neo4j reports against `stage` in `metrics`.
+
+    Transient errors, such as a deadlock with another writer, are retried with exponential
+    backoff and jitter for up to `VOTE_SCRAPER_WRITE_RETRY_SECONDS`, as `session.execute_write`
+    would. The retries are made here rather than by the driver so that deadlocks are counted
+    wherever they surface, including on commit, where the driver's retries can't be seen.
+
+    Args:
+        rows: Number of rows the transaction writes, e.g. roll calls or legislators, when meaningful
+    """
+    delay = INITIAL_RETRY_DELAY
+    first_failure: Optional[float] = None
+    start = perf_counter()
+    while True:
+        try:
+            with session.begin_transaction() as tx:
+                summarising = _SummarisingTransaction(tx)
+                result = work(summarising, *args)
+                # Only the attempt that commits is counted, so the summaries are taken out with its result
+                summaries = [statement.consume() for statement in summarising.results]
+                tx.commit()
+            break
+        except (DriverError, Neo4jError) as e:
+            if isinstance(e, TransientError) and e.code == DEADLOCK_DETECTED:
+                metrics.inc(metrics.TRANSACTION_DEADLOCKS, stage=stage)
+            if not e.is_retryable():
+                raise
+
+            now = monotonic()
+            if first_failure is None:
+                first_failure = now
+            if now - first_failure > write_retry_seconds:
+                raise
+            logger.debug("Retrying %s transaction in %.1f s after %s", stage, delay, repr(e))
+            sleep(delay * uniform(1 - RETRY_DELAY_JITTER, 1 + RETRY_DELAY_JITTER))
+            delay *= RETRY_DELAY_MULTIPLIER
+            metrics.inc(metrics.TRANSACTION_RETRIES, stage=stage)
+
+    metrics.observe(metrics.TRANSACTION_SECONDS, perf_counter() - start, stage=stage)
+    metrics.inc(metrics.TRANSACTIONS, stage=stage)
+    if rows is not None:
+        metrics.inc(metrics.ROWS_WRITTEN, rows, stage=stage)
+    for summary in summaries:
+        metrics.record_summary(stage, summary)
+    return result
+
 
 def connect(settings: Settings) -> Driver:
     """
@@ -24,9 +210,14 @@ def connect(settings: Settings) -> Driver:
         logger.error("No password provided to database. Please set VOTE_SCRAPER_NEO4J_PASSWORD enviroment variable")
         raise ValueError("No database password set")
 
+    global write_retry_seconds
+    write_retry_seconds = settings.write_retry_seconds
+
     try:
         driver = GraphDatabase.driver(
-            settings.neo4j_uri, auth=(settings.neo4j_username, settings.neo4j_password)
+            settings.neo4j_uri,
+            auth=(settings.neo4j_username, settings.neo4j_password),
+            max_transaction_retry_time=settings.write_retry_seconds,
         )
         logger.info("Connected to database")
         return driver
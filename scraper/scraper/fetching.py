@@ -0,0 +1,103 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from threading import Lock
+from time import monotonic, sleep
+from typing import Callable, Deque, Generator, Optional, Self, Tuple, TypeVar
+import logging
+
+from .settings import Settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class TokenBucket:
+    """
+    Rate limiter shared between threads. Allows `rate` acquisitions per second on average,
+    with at most `capacity` in a burst.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = monotonic()
+        self._lock = Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional[Self]:
+        if settings.crawl_delay_seconds <= 0:
+            return None
+        return cls(rate=1 / settings.crawl_delay_seconds)
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+            sleep(wait)
+
+
+class OrderedFetcher:
+    """
+    Fetches numbered documents on a pool of threads, keeping up to `concurrency` requests in
+    flight while handing results back in order. Every request first takes a token from
+    `limiter`, so the pool as a whole stays within the crawl rate.
+    """
+
+    def __init__(self, concurrency: int, limiter: Optional[TokenBucket]):
+        self.concurrency = max(concurrency, 1)
+        self.limiter = limiter
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='fetch')
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Self:
+        return cls(settings.fetch_concurrency, TokenBucket.from_settings(settings))
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def _rate_limited(self, fetch: Callable[[int], T], number: int) -> T:
+        if self.limiter is not None:
+            self.limiter.acquire()
+        return fetch(number)
+
+    def _fetch_run(self, fetch: Callable[[int], T], start: int, stop: Optional[int]) -> Generator[Tuple[int, Future[T]], None, None]:
+        pending: Deque[Tuple[int, Future[T]]] = deque()
+        number = start
+        try:
+            while True:
+                while len(pending) < self.concurrency and (stop is None or number < stop):
+                    pending.append((number, self._pool.submit(self._rate_limited, fetch, number)))
+                    number += 1
+                if len(pending) == 0:
+                    return
+                yield pending.popleft()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def fetch_run(self, fetch: Callable[[int], T], start: int, stop: Optional[int] = None) -> closing[Generator[Tuple[int, Future[T]], None, None]]:
+        """
+        Fetch `start`, `start + 1`, ... speculatively, yielding `(number, future)` in order.
+        The run goes on up to but not including `stop`, or when not given until the caller stops
+        iterating, e.g. on the first missing document, at which point requests that haven't
+        started are cancelled. Use in a `with` statement so that happens as soon as the caller stops.
+        """
+        return closing(self._fetch_run(fetch, start, stop))
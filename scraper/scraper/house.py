@@ -1,34 +1,32 @@
 import logging
+import re
 import xml.etree.ElementTree as ET
 import datetime
 from dataclasses import dataclass, field
-from time import sleep
-from typing import Iterator, List, Optional, Dict, Tuple, no_type_check
-from urllib.request import urlopen
+from functools import partial
+from itertools import batched
+from time import perf_counter
+from typing import Any, Iterable, Iterator, List, Optional, Dict, Sequence, Tuple, no_type_check
 from urllib.error import HTTPError
 
 from neo4j import Driver, Transaction
 
 from .settings import Settings
+from .database import INSERT_ROLL_CALL_QUERY, execute_write, insert_roll_call_votes, party_positions
+from .fetching import OrderedFetcher, TokenBucket
+from .ranges import RollCallRange, last_present
+from .http_client import HttpClient
+from .archive import VoteArchive, VoteDocument
+from .pipeline import Pipeline
+from .recorded_votes import RecordedVotes
+from .checkpoint import advance_cursor, read_cursor
+from .writers import RollCallWriter
+from . import metrics
 import scraper.models as models
 
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class Legislator:
-    name_id: str
-    sort_field: str
-    unaccented_name: str
-    party: str
-    state: str
-    role: str
-
-@dataclass
-class RecordedVote:
-    legislator: Legislator
-    vote: str
-
 def _parse_session(session: str) -> int:
     match session:
         case '1st': return 1
@@ -53,12 +51,12 @@ class VoteMetadata:
 @dataclass
 class RollCallVote:
     vote_metadata: VoteMetadata
-    vote_data: List[RecordedVote] = field(default_factory=list)
+    vote_data: RecordedVotes = field(default_factory=RecordedVotes)
     source_url: Optional[str] = field(default=None)
 
 
 @no_type_check  # not going to try and typecheck chat-gpt generated code. It's probably fine
-def parse_rollcall_vote(xml_doc: str) -> RollCallVote:
+def parse_rollcall_vote(xml_doc: bytes | str) -> RollCallVote:
     root = ET.fromstring(xml_doc)
 
     # Parse vote-metadata
@@ -84,19 +82,16 @@ def parse_rollcall_vote(xml_doc: str) -> RollCallVote:
     )
 
     # Parse vote-data
-    vote_data = []
+    vote_data = RecordedVotes()
     for recorded_vote_elem in root.find("vote-data").findall("recorded-vote"):
         legislator_elem = recorded_vote_elem.find("legislator")
-        legislator = Legislator(
-            name_id=legislator_elem.attrib.get("name-id"),
-            sort_field=legislator_elem.attrib.get("sort-field"),
-            unaccented_name=legislator_elem.attrib.get("unaccented-name"),
+        vote_data.append(
+            id=legislator_elem.attrib.get("name-id"),
+            name=legislator_elem.attrib.get("unaccented-name"),
             party=legislator_elem.attrib.get("party"),
             state=legislator_elem.attrib.get("state"),
-            role=legislator_elem.attrib.get("role"),
+            vote=recorded_vote_elem.findtext("vote"),
         )
-        vote = recorded_vote_elem.findtext("vote")
-        vote_data.append(RecordedVote(legislator=legislator, vote=vote))
 
     # Combine all components into the main RollCallVote data class
     return RollCallVote(vote_metadata=vote_metadata, vote_data=vote_data)
@@ -105,6 +100,10 @@ def parse_rollcall_vote(xml_doc: str) -> RollCallVote:
 def parse_action_datetime(metadata_elem) -> datetime.datetime:
     action_date_str = metadata_elem.findtext("action-date")
     action_time_str = metadata_elem.find("action-time").attrib.get("time-etz")
+    return _parse_action_datetime(action_date_str, action_time_str)
+
+
+def _parse_action_datetime(action_date_str: Optional[str], action_time_str: Optional[str]) -> datetime.datetime:
     action_datetime = None
 
     try:
@@ -118,35 +117,206 @@ def parse_action_datetime(metadata_elem) -> datetime.datetime:
     return action_datetime
 
 
-def parse_roll_call_vote_from_url(url: str) -> RollCallVote:
+def parse_house_document(document: VoteDocument, archive: Optional[VoteArchive] = None) -> RollCallVote:
+    """Parse a fetched roll call, archiving the document once it is known to be a valid vote"""
+    with metrics.timed(metrics.PARSE_SECONDS, source='house'):
+        roll_call = parse_rollcall_vote(document.body)
+    metrics.record_document('house', len(document.body))
+    roll_call.source_url = document.url
+    logger.debug(
+        'Parsed roll call. chamber="%s" congress=%d session="%s" rollcall_num=%d action_datetime=%s',
+        roll_call.vote_metadata.chamber,
+        roll_call.vote_metadata.congress,
+        roll_call.vote_metadata.session,
+        roll_call.vote_metadata.rollcall_num,
+        roll_call.vote_metadata.action_datetime,
+    )
+
+    if archive is not None:
+        congress = roll_call.vote_metadata.congress
+        session = _parse_session(roll_call.vote_metadata.session)
+        number = roll_call.vote_metadata.rollcall_num
+        if not archive.contains(models.Chamber.HOUSE_OF_REPS, congress, session, number):
+            archive.store(models.Chamber.HOUSE_OF_REPS, congress, session, number, document.url, document.body)
+
+    return roll_call
+
+
+def parse_roll_call_vote_from_url(url: str, client: Optional[HttpClient] = None) -> RollCallVote:
     logger.debug("Fetching roll call vote from %s", url)
-    with urlopen(url) as response:
-        logger.debug("%s returned %d %s", url, response.status, response.reason)
-        roll_call = parse_rollcall_vote(response.read())
-        roll_call.source_url = url
-        logger.debug(
-            'Parsed roll call. chamber="%s" congress=%d session="%s" rollcall_num=%d action_datetime=%s',
-            roll_call.vote_metadata.chamber,
-            roll_call.vote_metadata.congress,
-            roll_call.vote_metadata.session,
-            roll_call.vote_metadata.rollcall_num,
-            roll_call.vote_metadata.action_datetime,
-        )
-        return roll_call
+    response = (client or HttpClient()).get(url)
+    roll_call = parse_rollcall_vote(response.body)
+    roll_call.source_url = url
+    return roll_call
 
 
 def create_house_url(base_url: str, year: int, roll_call_number: int):
     return f"{base_url}/{year}/roll{roll_call_number:03}.xml"
 
 
-def scrape_single(settings: Settings, year: int, roll_call_number: int) -> RollCallVote:
+def congress_and_session_for_year(year: int) -> Tuple[int, int]:
+    """Congresses start in odd years, and their second session falls in the following even year"""
+    return (year - 1789) // 2 + 1, 2 - year % 2
+
+
+def fetch_single(settings: Settings, year: int, roll_call_number: int, client: Optional[HttpClient] = None) -> VoteDocument:
     url = create_house_url(settings.house_url, year, roll_call_number)
-    return parse_roll_call_vote_from_url(url)
+    logger.debug("Fetching roll call vote from %s", url)
+    body = (client or HttpClient()).get(url).body
+    congress, session = congress_and_session_for_year(year)
+    return VoteDocument(models.Chamber.HOUSE_OF_REPS, congress, session, roll_call_number, url, body)
+
+
+def year_for_congress_and_session(congress: int, session: int) -> int:
+    """Inverse of `congress_and_session_for_year`"""
+    return 1787 + 2 * congress + session - 1
+
+
+# Roll calls already fetched while looking for the end of a year, by year and number
+ProbedDocuments = Dict[Tuple[int, int], VoteDocument]
+
+_ROLL_CALL_GROUP_PAGE = re.compile(rb'ROLL_(\d+)\.asp', re.IGNORECASE)
+_ROLL_CALL_NUMBER = re.compile(rb'rollnumber=(\d+)', re.IGNORECASE)
 
 
-def scrape_house_starting_at(
-    settings: Settings, year: int, roll_call_number: int
-) -> Iterator[RollCallVote]:
+def _construct_roll_call_index_url(base_url: str, year: int) -> str:
+    return f"{base_url}/{year}/index.asp"
+
+
+def parse_roll_call_index(html: bytes) -> Optional[str]:
+    """
+    Number of the page listing the highest numbered roll calls of a year, as it's written in
+    the page's name, e.g. `"700"` for `ROLL_700.asp`, or `None` if the index links to none
+    """
+    groups = _ROLL_CALL_GROUP_PAGE.findall(html)
+    if not groups:
+        return None
+    return max(groups, key=int).decode()
+
+
+def parse_roll_call_group(html: bytes) -> int:
+    """Number of the last roll call linked from one of a year's pages of roll calls, or 0 if it links to none"""
+    return max((int(number) for number in _ROLL_CALL_NUMBER.findall(html)), default=0)
+
+
+def fetch_last_roll_call_number(settings: Settings, year: int, client: Optional[HttpClient] = None, limiter: Optional[TokenBucket] = None) -> Optional[int]:
+    """
+    Number of the last roll call of a year according to the clerk's index, or `None` if there's
+    no index to go by. The index of a year links to a page for each hundred roll calls, so this
+    takes two requests: the index, and the page of its highest numbered roll calls.
+    """
+    client = client or HttpClient()
+    url = _construct_roll_call_index_url(settings.house_url, year)
+    try:
+        if limiter is not None:
+            limiter.acquire()
+        group = parse_roll_call_index(client.get(url).body)
+        if group is None:
+            return 0
+
+        if limiter is not None:
+            limiter.acquire()
+        return parse_roll_call_group(client.get(f"{settings.house_url}/{year}/ROLL_{group}.asp").body)
+    except OSError as e:
+        # Including `URLError`s. The index is only a shortcut, so any failure falls back to probing
+        logger.debug("Unable to fetch the roll call index of %d: %s", year, repr(e))
+        return None
+
+
+def house_roll_call_exists(settings: Settings, year: int, roll_call_number: int, client: Optional[HttpClient] = None, probed: Optional[ProbedDocuments] = None) -> bool:
+    """
+    Whether a roll call exists. Finding out takes fetching it, so the roll call is kept in
+    `probed`, if given, to spare fetching it again.
+    """
+    try:
+        document = fetch_single(settings, year, roll_call_number, client)
+    except HTTPError as e:
+        if e.status == 404:
+            return False
+        raise
+    if probed is not None:
+        probed[year, roll_call_number] = document
+    return True
+
+
+def discover_house_ranges(settings: Settings, year: int, roll_call_number: int, probed: Optional[ProbedDocuments] = None) -> Iterator[RollCallRange]:
+    """
+    Find the roll calls of each year from `roll_call_number` of `year` on, ending with the first
+    year that has none. The last roll call of each year is read from the clerk's index of the
+    year, or found with `last_present` where there's no index, keeping the roll calls fetched
+    along the way in `probed`.
+
+    Ranges are found a year at a time, so each can be fetched before the next is looked for.
+    """
+    client = HttpClient.from_settings(settings)
+    limiter = TokenBucket.from_settings(settings)
+    while True:
+        last = fetch_last_roll_call_number(settings, year, client, limiter)
+        if last is None:
+            exists = partial(house_roll_call_exists, settings, year, client=client, probed=probed)
+            last = last_present(exists, roll_call_number - 1, limiter)
+
+        if last >= roll_call_number:
+            congress, session = congress_and_session_for_year(year)
+            logger.info("Found %d house roll calls to fetch in %d", last - roll_call_number + 1, year)
+            yield RollCallRange(models.Chamber.HOUSE_OF_REPS, congress, session, roll_call_number, last, year=year)
+        elif roll_call_number == 1:
+            logger.debug("Year %d did not have a first vote. Assuming this is the end of the data.", year)
+            return
+
+        year += 1
+        roll_call_number = 1
+
+
+def _fetch_unless_probed(settings: Settings, year: int, roll_call_number: int, client: HttpClient, probed: ProbedDocuments) -> VoteDocument:
+    document = probed.pop((year, roll_call_number), None)
+    if document is None:
+        document = fetch_single(settings, year, roll_call_number, client)
+    return document
+
+
+def fetch_house_ranges(settings: Settings, ranges: Iterable[RollCallRange], probed: Optional[ProbedDocuments] = None) -> Iterator[VoteDocument]:
+    """
+    Fetch every roll call in `ranges`, known to exist, so no request is spent looking for the end
+    of a year. Roll calls in `probed` were already fetched while finding the ranges, and are
+    taken from there instead.
+    """
+    client = HttpClient.from_settings(settings)
+    probed = probed if probed is not None else {}
+    with OrderedFetcher.from_settings(settings) as fetcher:
+        for r in ranges:
+            year = r.year if r.year is not None else year_for_congress_and_session(r.congress, r.session)
+            roll_call_number = r.first
+            while roll_call_number <= r.last:
+                with fetcher.fetch_run(partial(_fetch_unless_probed, settings, year, client=client, probed=probed), roll_call_number, r.last + 1) as run:
+                    for roll_call_number, result in run:
+                        try:
+                            yield result.result()
+                        except HTTPError as e:
+                            if e.status == 404:
+                                logger.warning("House %d-%d is missing, skipping it", year, roll_call_number)
+                                continue
+                            logger.error(
+                                "Unexpected response %d %s when trying to fetch house %d-%d",
+                                e.status,
+                                e.reason,
+                                year,
+                                roll_call_number,
+                            )
+                            # Start the run again from this vote
+                            metrics.inc(metrics.FETCH_RESTARTS, source='house')
+                            break
+                    else:
+                        roll_call_number = r.last + 1
+            logger.info("Fetched %s", r)
+
+
+def fetch_house_starting_at(settings: Settings, year: int, roll_call_number: int) -> Iterator[VoteDocument]:
+    if settings.discover_ranges:
+        # Each year is fetched as soon as its end is found, rather than after finding them all
+        probed: ProbedDocuments = {}
+        yield from fetch_house_ranges(settings, discover_house_ranges(settings, year, roll_call_number, probed), probed)
+        return
 
     # just used for logging
     num_votes_scraped = 0
@@ -155,43 +325,56 @@ def scrape_house_starting_at(
     # It prevents trying years beyond one plus the present year
     error_indicates_empty_year = True
 
-    while True:
-        try:
-            # Get vote
-            vote = scrape_single(settings, year, roll_call_number)
-            yield vote
-
-            # Reset if there is at least one vote in a year
-            error_indicates_empty_year = False
-
-            # Be polite
-            sleep(settings.crawl_delay_seconds)
-
-            # Increment counts
-            roll_call_number += 1
-            num_votes_scraped += 1
-        except HTTPError as e:
-            if e.status == 404:
-                logger.info("Reached end of %d with a total of %d votes", year, num_votes_scraped)
-                if error_indicates_empty_year:
-                    logger.debug("Year %d did not have a first vote. Assuming this is the end of the data.", year)
-                    break
-                else:
-                    year += 1
-                    roll_call_number = 1
-                    num_votes_scraped = 0
-                    error_indicates_empty_year = True
-                    logger.debug("Will now scrape %d for first vote", year)
-            else:
-                logger.error(
-                    "Unexpected response %d %s when trying to fetch house %d-%d",
-                    e.status,
-                    e.reason,
-                    year,
-                    roll_call_number,
-                )
+    client = HttpClient.from_settings(settings)
+    with OrderedFetcher.from_settings(settings) as fetcher:
+        while True:
+            with fetcher.fetch_run(partial(fetch_single, settings, year, client=client), roll_call_number) as run:
+                for roll_call_number, result in run:
+                    try:
+                        # Get vote
+                        document = result.result()
+                    except HTTPError as e:
+                        if e.status != 404:
+                            logger.error(
+                                "Unexpected response %d %s when trying to fetch house %d-%d",
+                                e.status,
+                                e.reason,
+                                year,
+                                roll_call_number,
+                            )
+                            # Start the run again from this vote
+                            metrics.inc(metrics.FETCH_RESTARTS, source='house')
+                            break
+
+                        logger.info("Reached end of %d with a total of %d votes", year, num_votes_scraped)
+                        if error_indicates_empty_year:
+                            logger.debug("Year %d did not have a first vote. Assuming this is the end of the data.", year)
+                            return
+
+                        year += 1
+                        roll_call_number = 1
+                        num_votes_scraped = 0
+                        error_indicates_empty_year = True
+                        logger.debug("Will now scrape %d for first vote", year)
+                        break
+
+                    yield document
+
+                    # Reset if there is at least one vote in a year
+                    error_indicates_empty_year = False
+                    num_votes_scraped += 1
+
+def replay_house_starting_at(archive: VoteArchive, year: int, roll_call_number: int) -> Iterator[VoteDocument]:
+    """Read votes back out of the archive instead of fetching them"""
+    congress, session = congress_and_session_for_year(year)
+    return archive.replay(models.Chamber.HOUSE_OF_REPS, congress, session, roll_call_number)
 
 def find_resume_point_for_house(settings: Settings, driver: Driver) -> Tuple[int,int]:
+    cursor = read_cursor(driver, models.Chamber.HOUSE_OF_REPS)
+    if cursor is not None:
+        return cursor['year'], cursor['number'] + 1
+
+    # Databases written before the scrape cursor existed need one scan to find where they got to
     records, summary, keys = driver.execute_query("""
         MATCH (rc:RollCall)
         WHERE rc.chamber = 'house'
@@ -208,7 +391,8 @@ def find_resume_point_for_house(settings: Settings, driver: Driver) -> Tuple[int
     last_vote = records[0].data()['rc']
     return last_vote['when'].year, last_vote['number'] + 1
 
-def insert_single_vote(tx: Transaction, rc_vote: RollCallVote):
+def roll_call_parameters(rc_vote: RollCallVote) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """The `$rc` and `$votes` parameters `INSERT_ROLL_CALL_QUERY` writes `rc_vote` with"""
     roll_call_vote = models.RollCall(
         chamber=models.Chamber.HOUSE_OF_REPS,
         congress=rc_vote.vote_metadata.congress,
@@ -217,61 +401,104 @@ def insert_single_vote(tx: Transaction, rc_vote: RollCallVote):
         when=rc_vote.vote_metadata.action_datetime,
         question=rc_vote.vote_metadata.vote_question
     )
-    
-    query = """
-        MERGE (rc: RollCall {
-            chamber: $rc.chamber,
-            congress: $rc.congress,
-            session: $rc.session,
-            number: $rc.number
-        })
-        ON CREATE SET rc = $rc
-        MERGE (c: Congress {number: $rc.congress})
-        MERGE (rc)-[:DURING_CONGRESS]->(c)
-        """
-    tx.run(query, rc=roll_call_vote.model_dump(exclude_none=True))
-
-    for vote in rc_vote.vote_data:
-        voted_on = models.VotedOn(vote=vote.vote)
-        query = """
-            MATCH (leg: Legislator {bioguide_id: $bioguide_id})
-                , (rc: RollCall {chamber: $rc.chamber, congress: $rc.congress, session: $rc.session, number: $rc.number})
-            MERGE (leg)-[vote: VOTED_ON]->(rc)
-            ON CREATE SET vote = $vote
-        """
-        tx.run(query, bioguide_id = vote.legislator.name_id, rc = roll_call_vote.model_dump(exclude_none=True), vote=voted_on.model_dump(exclude_none=True))
-
-        # update state
-        query = """
-            MATCH (l: Legislator { bioguide_id: $bioguide_id})
-            MATCH (new_state: State { code: $state })
-            MERGE (l)-[:CURRENTLY_REPRESENTS]->(new_state)
-            WITH l, new_state
-            MATCH (l)-[old_rep: CURRENTLY_REPRESENTS]->(old_state: State)
-            WHERE old_state.code <> new_state.code
-            DELETE old_rep
-        """
-        tx.run(query, bioguide_id = vote.legislator.name_id, state=vote.legislator.state)
-
-
-        # update party
-        query = """
-            MATCH (l: Legislator { bioguide_id: $bioguide_id})
-            MATCH (new_party: Party { abbreviation: $party })
-            MERGE (l)-[:CURRENTLY_MEMBER_OF]->(new_party)
-            WITH l, new_party
-            MATCH (l)-[old_membership: CURRENTLY_MEMBER_OF]->(old_party: State)
-            WHERE old_party.abbreviation <> new_party.abbreviation
-            DELETE old_membership
-        """
-        tx.run(query, bioguide_id = vote.legislator.name_id, party=vote.legislator.party)
-
-def insert_house_votes(driver: Driver, votes: Iterator[RollCallVote]):
+
+    voted_on = {vote: models.VotedOn(vote=vote).model_dump(exclude_none=True) for vote in rc_vote.vote_data.distinct_votes()}
+    votes = [
+        {
+            'bioguide_id': vote.id,
+            'state': vote.state,
+            'party': vote.party,
+            'voted_on': voted_on[vote.vote],
+        }
+        for vote in rc_vote.vote_data
+    ]
+
+    rc = roll_call_vote.model_dump(exclude_none=True)
+    rc.update(party_positions(rc_vote.vote_data.party_votes()))
+    return rc, votes
+
+def insert_single_vote(tx: Transaction, rc_vote: RollCallVote):
+    """
+    Write a roll call and every recorded vote on it with a single statement, updating each
+    voter's current state and party along the way.
+    """
+    rc, votes = roll_call_parameters(rc_vote)
+    tx.run(INSERT_ROLL_CALL_QUERY, rc=rc, votes=votes)
+
+def insert_votes(tx: Transaction, rc_votes: Sequence[RollCallVote]):
+    for rc_vote in rc_votes:
+        insert_single_vote(tx, rc_vote)
+
+def cursor_position(rc_vote: RollCallVote) -> Dict[str, int]:
+    return {'year': rc_vote.vote_metadata.action_datetime.year, 'number': rc_vote.vote_metadata.rollcall_num}
+
+def insert_votes_and_advance_cursor(tx: Transaction, rc_votes: Sequence[RollCallVote]):
+    """Insert roll calls and move the house scrape cursor to the last of them in one transaction"""
+    insert_votes(tx, rc_votes)
+    advance_cursor(tx, models.Chamber.HOUSE_OF_REPS, cursor_position(rc_votes[-1]))
+
+def insert_house_votes_in_parallel(driver: Driver, votes: Iterator[RollCallVote], votes_per_transaction: int, writers: int, queue_depth: int = 16):
+    """
+    Insert roll calls as they are scraped on `writers` sessions at once, committing
+    `votes_per_transaction` roll calls at a time. See `RollCallWriter`.
+    """
+    total_votes = 0
+    start = perf_counter()
+    with RollCallWriter(driver, 'house', models.Chamber.HOUSE_OF_REPS, writers, queue_depth) as writer:
+        for chunk in batched(votes, max(votes_per_transaction, 1)):
+            writer.write(insert_roll_call_votes, [roll_call_parameters(rc_vote) for rc_vote in chunk], cursor_position(chunk[-1]))
+            total_votes += len(chunk)
+    elapsed = perf_counter() - start
+
+    if total_votes > 0:
+        logger.info("Inserted %d house roll calls with %d writers, %.1f roll calls per second", total_votes, writers, total_votes / elapsed)
+
+def insert_house_votes(driver: Driver, votes: Iterator[RollCallVote], votes_per_transaction: int = 1, writers: int = 1, queue_depth: int = 16):
+    """
+    Insert roll calls as they are scraped, committing `votes_per_transaction` roll calls at a time.
+    With more than one writer, see `insert_house_votes_in_parallel`.
+    """
+    if writers > 1:
+        insert_house_votes_in_parallel(driver, votes, votes_per_transaction, writers, queue_depth)
+        return
+
+    total_votes = 0
+    total_seconds = 0.0
     with driver.session() as session:
-        for rc_vote in votes:
-            session.execute_write(insert_single_vote, rc_vote)
+        for chunk in batched(votes, max(votes_per_transaction, 1)):
+            start = perf_counter()
+            execute_write(session, 'house', insert_votes_and_advance_cursor, chunk, rows=len(chunk))
+            elapsed = perf_counter() - start
+
+            total_votes += len(chunk)
+            total_seconds += elapsed
+            logger.debug("Inserted %d house roll calls in %.1f ms (%.1f ms per roll call)", len(chunk), elapsed * 1000, elapsed * 1000 / len(chunk))
+
+    if total_votes > 0:
+        logger.info("Inserted %d house roll calls, averaging %.1f ms per roll call", total_votes, total_seconds * 1000 / total_votes)
 
 def scrape_house(settings: Settings, driver: Driver):
+    archive = VoteArchive.from_settings(settings)
     year, vote_number = find_resume_point_for_house(settings, driver)
-    votes = scrape_house_starting_at(settings, year, vote_number)
-    insert_house_votes(driver, votes)
+
+    if settings.replay_archive:
+        if archive is None:
+            raise ValueError("Replaying votes requires VOTE_SCRAPER_ARCHIVE_PATH to be set")
+        logger.info("Replaying house votes from %s", archive.path)
+        documents = replay_house_starting_at(archive, year, vote_number)
+        # Already archived
+        archive = None
+    else:
+        documents = fetch_house_starting_at(settings, year, vote_number)
+
+    Pipeline('house', settings.pipeline_queue_depth).run(
+        ('fetch', documents),
+        [('parse', partial(parse_house_document, archive=archive))],
+        ('write', partial(
+            insert_house_votes,
+            driver,
+            votes_per_transaction=settings.votes_per_transaction,
+            writers=settings.database_writers,
+            queue_depth=settings.pipeline_queue_depth,
+        )),
+    )
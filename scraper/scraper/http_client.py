@@ -0,0 +1,190 @@
+from dataclasses import dataclass, field
+from email.message import Message
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from typing import Dict, Optional, Self, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin, urlsplit, urlunsplit
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+from time import perf_counter
+
+from .settings import Settings
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "votes-like-my-fave-scraper/0.1"
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+@dataclass
+class HttpResponse:
+    url: str
+    status: int
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    # True when the server answered 304 and `body` came from the cache
+    not_modified: bool = False
+
+
+@dataclass
+class CachedDocument:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: bytes
+
+
+class HttpCache:
+    """
+    Validators (`ETag`/`Last-Modified`) and bodies of fetched documents, kept in a directory
+    with one pair of files per URL so that concurrent fetches never write the same file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _files(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return os.path.join(self.path, f"{key}.json"), os.path.join(self.path, f"{key}.gz")
+
+    def get(self, url: str) -> Optional[CachedDocument]:
+        meta_path, body_path = self._files(url)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with gzip.open(body_path, 'rb') as body:
+                return CachedDocument(meta.get('etag'), meta.get('last_modified'), body.read())
+        except (OSError, ValueError):
+            return None
+
+    def store(self, url: str, etag: Optional[str], last_modified: Optional[str], body: bytes):
+        if etag is None and last_modified is None:
+            return
+
+        meta_path, body_path = self._files(url)
+        # Write the body first and replace atomically, so metadata never points at a partial body
+        _write_atomically(body_path, gzip.compress(body))
+        _write_atomically(meta_path, json.dumps({'url': url, 'etag': etag, 'last_modified': last_modified}).encode())
+
+
+def _write_atomically(path: str, data: bytes):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class HttpClient:
+    """
+    HTTP client shared by the House and Senate fetchers.
+
+    Each thread keeps one persistent connection per host, so consecutive votes reuse the
+    same TCP/TLS session. Responses are requested gzip-compressed. When a cache is configured,
+    requests for documents fetched before carry `If-None-Match`/`If-Modified-Since`, and a
+    304 answer is served from the cache. Error statuses raise `urllib.error.HTTPError`, as
+    `urlopen` does.
+    """
+
+    def __init__(self, cache: Optional[HttpCache] = None, timeout: float = 30.0):
+        self.cache = cache
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Self:
+        cache = HttpCache(settings.http_cache_path) if settings.http_cache_path else None
+        return cls(cache=cache)
+
+    def _connections(self) -> Dict[Tuple[str, str], HTTPConnection]:
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        return connections
+
+    def _connection(self, scheme: str, host: str) -> HTTPConnection:
+        connections = self._connections()
+        connection = connections.get((scheme, host))
+        if connection is None:
+            if scheme == 'https':
+                connection = HTTPSConnection(host, timeout=self.timeout)
+            elif scheme == 'http':
+                connection = HTTPConnection(host, timeout=self.timeout)
+            else:
+                raise URLError(f"Unsupported scheme {scheme}")
+            connections[(scheme, host)] = connection
+        return connection
+
+    def close(self):
+        """Close the calling thread's connections"""
+        for connection in self._connections().values():
+            connection.close()
+        self._connections().clear()
+
+    def _request(self, scheme: str, host: str, path: str, headers: Dict[str, str]) -> Tuple[int, str, Message, bytes]:
+        # A kept-alive connection may have been closed by the server since its last use.
+        # That only shows up when it is used, so retry once on a fresh connection.
+        for attempt in range(2):
+            connection = self._connection(scheme, host)
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+                if response.will_close:
+                    connection.close()
+                return response.status, response.reason, response.msg, body
+            except (HTTPException, OSError) as e:
+                connection.close()
+                # Anything but a dropped connection, e.g. a DNS failure or a timeout, won't go
+                # away on a fresh connection. Raise it as `URLError`, like `urlopen` does.
+                if attempt == 1 or not isinstance(e, (HTTPException, ConnectionError)):
+                    raise URLError(e)
+                metrics.inc(metrics.HTTP_RECONNECTS, host=host)
+                logger.debug("Connection to %s failed, reconnecting: %s", host, repr(e))
+        raise AssertionError("unreachable")
+
+    def get(self, url: str) -> HttpResponse:
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            path = urlunsplit(('', '', parts.path or '/', parts.query, ''))
+
+            headers = {'Accept-Encoding': 'gzip', 'User-Agent': USER_AGENT}
+            cached = self.cache.get(url) if self.cache is not None else None
+            if cached is not None:
+                if cached.etag is not None:
+                    headers['If-None-Match'] = cached.etag
+                if cached.last_modified is not None:
+                    headers['If-Modified-Since'] = cached.last_modified
+
+            start = perf_counter()
+            status, reason, response_headers, body = self._request(parts.scheme, parts.netloc, path, headers)
+            metrics.observe(metrics.HTTP_REQUEST_SECONDS, perf_counter() - start, host=parts.netloc)
+            metrics.inc(metrics.HTTP_REQUESTS, host=parts.netloc, status=str(status))
+            metrics.inc(metrics.HTTP_BYTES, len(body), host=parts.netloc)
+            logger.debug("%s returned %d %s", url, status, reason)
+
+            if status in REDIRECT_STATUSES and 'Location' in response_headers:
+                url = urljoin(url, response_headers['Location'])
+                continue
+
+            if status == 304 and cached is not None:
+                return HttpResponse(url, status, cached.body, dict(response_headers), not_modified=True)
+
+            if status >= 400:
+                raise HTTPError(url, status, reason, response_headers, io.BytesIO(body))
+
+            if response_headers.get('Content-Encoding', '').lower() == 'gzip':
+                body = gzip.decompress(body)
+
+            if self.cache is not None:
+                self.cache.store(url, response_headers.get('ETag'), response_headers.get('Last-Modified'), body)
+
+            return HttpResponse(url, status, body, dict(response_headers))
+
+        raise URLError(f"Too many redirects fetching {url}")
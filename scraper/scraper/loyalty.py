@@ -0,0 +1,230 @@
+from dataclasses import dataclass, field
+from itertools import batched
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+import logging
+
+import numpy as np
+from neo4j import Driver, Session, Transaction
+
+from .database import POSITIONS_RECORDED, execute_write, party_positions
+from .models import NOT_VOTING
+
+logger = logging.getLogger(__name__)
+
+# Number of legislators or roll calls written per transaction
+WRITE_BATCH_SIZE = 1000
+
+# Roll calls are stored with `party_majority_{party}` properties, see `database.party_positions`
+MAJORITY_PREFIX = 'party_majority_'
+MAJORITY_VOTES_PREFIX = 'party_majority_votes_'
+
+
+@dataclass
+class _BlockBuilder:
+    """Votes and party majorities on the roll calls of one chamber and congress"""
+    rows: Dict[int, int] = field(default_factory=dict)
+    votes: List[List[Tuple[int, int]]] = field(default_factory=list)
+    majorities: List[Dict[int, int]] = field(default_factory=list)
+
+    def add_roll_call(self, votes: List[Tuple[int, int]], majorities: Dict[int, int]):
+        self.votes.append([(self.rows.setdefault(legislator, len(self.rows)), code) for legislator, code in votes])
+        self.majorities.append(majorities)
+
+    def build(self, num_parties: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns:
+            The index of each row's legislator, a legislator × roll call matrix of vote codes and a
+            party × roll call matrix of the code each party's majority voted, 0 meaning none
+        """
+        codes = np.zeros((len(self.rows), len(self.votes)), dtype=np.int8)
+        majorities = np.zeros((num_parties, len(self.votes)), dtype=np.int8)
+        for column, (votes, party_majorities) in enumerate(zip(self.votes, self.majorities)):
+            if len(votes) != 0:
+                rows, vote_codes = zip(*votes)
+                codes[list(rows), column] = vote_codes
+            for party, code in party_majorities.items():
+                majorities[party, column] = code
+        legislators = np.fromiter(self.rows.keys(), dtype=np.int64, count=len(self.rows))
+        return legislators, codes, majorities
+
+
+@dataclass
+class PartyLoyalty:
+    """
+    How often each legislator voted with the majority of each party. Both matrices have a row per
+    legislator and a column per party.
+    """
+    legislators: List[str]
+    parties: List[str]
+    # Roll calls the legislator voted the same way as the party's majority
+    votes_with: np.ndarray
+    # Roll calls the legislator voted on where the party had a majority position
+    total_votes: np.ndarray
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Yield each legislator's loyalty as properties to set on their `Legislator` node"""
+        for i, bioguide_id in enumerate(self.legislators):
+            loyalty: Dict[str, Any] = {}
+            for j, party in enumerate(self.parties):
+                total = int(self.total_votes[i, j])
+                if total == 0:
+                    continue
+                votes_with = int(self.votes_with[i, j])
+                loyalty[f'votes_with_{party}'] = votes_with
+                loyalty[f'votes_against_{party}'] = total - votes_with
+                loyalty[f'total_votes_{party}'] = total
+                loyalty[f'percent_with_{party}'] = votes_with / total
+            yield {'bioguide_id': bioguide_id, 'loyalty': loyalty}
+
+
+def count_loyalty(codes: np.ndarray, majorities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Args:
+        codes: Legislator × roll call matrix of the vote each cast, 0 if they did not vote
+        majorities: Party × roll call matrix of the vote each party's majority cast, 0 if none
+
+    Returns:
+        `(votes_with, total_votes)`, both legislator × party
+    """
+    voted = codes != 0
+    total_votes = voted.astype(np.int32) @ (majorities != 0).T.astype(np.int32)
+
+    votes_with = np.empty_like(total_votes)
+    for party in range(majorities.shape[0]):
+        votes_with[:, party] = (voted & (codes == majorities[party])).sum(axis=1)
+
+    return votes_with, total_votes
+
+
+def _set_party_positions(tx: Transaction, rows: Sequence[Dict[str, Any]]):
+    tx.run("""
+        UNWIND $rows AS row
+        MATCH (rc: RollCall)
+        WHERE elementId(rc) = row.roll_call
+        SET rc += row.positions
+    """, rows=rows)
+
+
+def backfill_party_positions(session: Session) -> int:
+    """
+    Store party positions on roll calls inserted before they were recorded at ingest. Party
+    membership at the time of the vote wasn't kept, so each member's current party is used.
+    Each roll call is marked with `POSITIONS_RECORDED` once done, so it is only backfilled once.
+    Roll calls with positions stored before the mark was introduced are marked and left as they are.
+
+    Returns:
+        Number of roll calls updated
+    """
+    result = session.run(f"""
+        MATCH (rc: RollCall)
+        WHERE rc.{POSITIONS_RECORDED} IS NULL
+        CALL {{
+            WITH rc
+            MATCH (rc)<-[v:VOTED_ON]-(:Legislator)-[:CURRENTLY_MEMBER_OF]->(p: Party)
+            WHERE NOT any(key IN keys(rc) WHERE key STARTS WITH 'party_votes_')
+            RETURN collect([p.abbreviation, v.vote]) AS votes
+        }}
+        RETURN elementId(rc) AS roll_call
+            , any(key IN keys(rc) WHERE key STARTS WITH 'party_votes_') AS recorded
+            , votes
+    """)
+    rows = [
+        {
+            'roll_call': record['roll_call'],
+            'positions': {POSITIONS_RECORDED: True} if record['recorded'] else party_positions(record['votes']),
+        }
+        for record in result
+    ]
+
+    for chunk in batched(rows, WRITE_BATCH_SIZE):
+        execute_write(session, 'loyalty', _set_party_positions, chunk, rows=len(chunk))
+
+    return len(rows)
+
+
+def load_party_loyalty(session: Session) -> PartyLoyalty:
+    """Read every vote and the party majorities stored on each roll call, and count loyalty from them"""
+    legislators: Dict[str, int] = {}
+    parties: Dict[str, int] = {}
+    vote_codes: Dict[str, int] = {}
+    blocks: Dict[Tuple[str, int], _BlockBuilder] = {}
+
+    def code_of(vote: str) -> int:
+        code = vote_codes.get(vote)
+        if code is None:
+            code = vote_codes[vote] = len(vote_codes) + 1
+            if code > np.iinfo(np.int8).max:
+                raise ValueError(f"Too many distinct votes to encode, the latest being {vote!r}")
+        return code
+
+    result = session.run(f"""
+        MATCH (rc: RollCall)<-[v:VOTED_ON]-(l: Legislator)
+        WHERE v.vote <> $not_voting
+        WITH rc, collect([l.bioguide_id, v.vote]) AS votes
+        RETURN rc.chamber AS chamber
+            , rc.congress AS congress
+            , [
+                key IN keys(rc)
+                WHERE key STARTS WITH '{MAJORITY_PREFIX}' AND NOT key STARTS WITH '{MAJORITY_VOTES_PREFIX}'
+                | [substring(key, {len(MAJORITY_PREFIX)}), rc[key]]
+            ] AS majorities
+            , votes
+    """, not_voting=NOT_VOTING)
+
+    for record in result:
+        key = (record['chamber'], record['congress'])
+        block = blocks.get(key)
+        if block is None:
+            block = blocks[key] = _BlockBuilder()
+
+        votes = [(legislators.setdefault(bioguide_id, len(legislators)), code_of(vote)) for bioguide_id, vote in record['votes']]
+        majorities = {parties.setdefault(party, len(parties)): code_of(vote) for party, vote in record['majorities']}
+        block.add_roll_call(votes, majorities)
+
+    votes_with = np.zeros((len(legislators), len(parties)), dtype=np.int32)
+    total_votes = np.zeros((len(legislators), len(parties)), dtype=np.int32)
+    for block in blocks.values():
+        rows, codes, party_majorities = block.build(len(parties))
+        block_votes_with, block_total_votes = count_loyalty(codes, party_majorities)
+        votes_with[rows] += block_votes_with
+        total_votes[rows] += block_total_votes
+
+    return PartyLoyalty(list(legislators.keys()), list(parties.keys()), votes_with, total_votes)
+
+
+# Loyalty to the legislator's own party is copied out under fixed names so it can be sorted on
+WRITE_LOYALTY_QUERY = """
+UNWIND $rows AS row
+MATCH (l: Legislator {bioguide_id: row.bioguide_id})
+SET l += row.loyalty
+WITH l
+OPTIONAL MATCH (l)-[:CURRENTLY_MEMBER_OF]->(p: Party)
+SET l.votes_against_party = l['votes_against_' + p.abbreviation]
+    , l.total_votes_party = l['total_votes_' + p.abbreviation]
+    , l.percent_against_party = 1 - l['percent_with_' + p.abbreviation]
+"""
+
+
+def _write_loyalty(tx: Transaction, rows: Sequence[Dict[str, Any]]):
+    tx.run(WRITE_LOYALTY_QUERY, rows=rows)
+
+
+def update_party_loyalty(driver: Driver):
+    """Recount how often every legislator votes with the majority of each party"""
+    start = perf_counter()
+    with driver.session() as session:
+        backfilled = backfill_party_positions(session)
+        if backfilled != 0:
+            logger.info("Backfilled party positions on %d roll calls inserted before they were recorded", backfilled)
+
+        loyalty = load_party_loyalty(session)
+        for chunk in batched(loyalty.rows(), WRITE_BATCH_SIZE):
+            execute_write(session, 'loyalty', _write_loyalty, chunk, rows=len(chunk))
+
+    logger.info(
+        "Counted loyalty of %d legislators to %d parties in %.1f s",
+        len(loyalty.legislators),
+        len(loyalty.parties),
+        perf_counter() - start,
+    )
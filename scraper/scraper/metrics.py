@@ -0,0 +1,301 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import bisect
+import logging
+import math
+import os
+
+logger = logging.getLogger(__name__)
+
+# Label values of one series, in the order the family's labels were declared
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Counters neo4j reports in each statement's `ResultSummary`
+SUMMARY_COUNTERS = (
+    'nodes_created',
+    'nodes_deleted',
+    'relationships_created',
+    'relationships_deleted',
+    'properties_set',
+    'labels_added',
+    'labels_removed',
+    'indexes_added',
+    'indexes_removed',
+    'constraints_added',
+    'constraints_removed',
+)
+
+
+@dataclass
+class _Histogram:
+    buckets: Sequence[float]
+    counts: List[int] = field(default_factory=list)
+    sum: float = 0.0
+    count: int = 0
+
+    def __post_init__(self):
+        self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float):
+        # Buckets are cumulative when rendered, so only the first one the value fits in is counted here
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+@dataclass
+class _Family:
+    name: str
+    kind: str
+    help: str
+    labels: Tuple[str, ...]
+    buckets: Sequence[float] = DEFAULT_BUCKETS
+    series: Dict[Labels, float | _Histogram] = field(default_factory=dict)
+
+
+class Registry:
+    """
+    Counters and histograms, rendered in the Prometheus text exposition format. Safe to update
+    from any thread.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._families: Dict[str, _Family] = {}
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> str:
+        self._families[name] = _Family(name, 'counter', help, tuple(labels))
+        return name
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> str:
+        self._families[name] = _Family(name, 'histogram', help, tuple(labels), tuple(buckets))
+        return name
+
+    def _key(self, family: _Family, labels: Dict[str, str]) -> Labels:
+        if labels.keys() != set(family.labels):
+            raise ValueError(f"{family.name} takes labels {family.labels}, not {tuple(labels)}")
+        return tuple(str(labels[label]) for label in family.labels)
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        family = self._families[name]
+        key = self._key(family, labels)
+        with self._lock:
+            family.series[key] = family.series.get(key, 0) + amount  # type: ignore[operator]
+
+    def observe(self, name: str, value: float, **labels: str):
+        family = self._families[name]
+        key = self._key(family, labels)
+        with self._lock:
+            histogram = family.series.get(key)
+            if histogram is None:
+                histogram = family.series[key] = _Histogram(family.buckets)
+            histogram.observe(value)  # type: ignore[union-attr]
+
+    @contextmanager
+    def time(self, name: str, **labels: str) -> Iterator[None]:
+        """Observe how long the body of the `with` block takes, in seconds"""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - start, **labels)
+
+    def totals(self, name: str, by: str) -> Dict[str, Tuple[float, int]]:
+        """
+        Sum a family's series, grouped by the value of the label `by`.
+
+        Returns:
+            For counters the total and number of series, for histograms the sum and count of
+            observations
+        """
+        family = self._families[name]
+        index = family.labels.index(by)
+        totals: Dict[str, Tuple[float, int]] = {}
+        with self._lock:
+            for key, value in family.series.items():
+                total, count = totals.get(key[index], (0.0, 0))
+                if isinstance(value, _Histogram):
+                    totals[key[index]] = (total + value.sum, count + value.count)
+                else:
+                    totals[key[index]] = (total + value, count + 1)
+        return totals
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for family in self._families.values():
+                lines.append(f"# HELP {family.name} {family.help}")
+                lines.append(f"# TYPE {family.name} {family.kind}")
+                for key, value in sorted(family.series.items()):
+                    labels = list(zip(family.labels, key))
+                    if isinstance(value, _Histogram):
+                        cumulative = 0
+                        for bound, count in zip(value.buckets, value.counts):
+                            cumulative += count
+                            lines.append(f"{family.name}_bucket{_format_labels(labels + [('le', _format_value(bound))])} {cumulative}")
+                        lines.append(f"{family.name}_bucket{_format_labels(labels + [('le', '+Inf')])} {value.count}")
+                        lines.append(f"{family.name}_sum{_format_labels(labels)} {_format_value(value.sum)}")
+                        lines.append(f"{family.name}_count{_format_labels(labels)} {value.count}")
+                    else:
+                        lines.append(f"{family.name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            for family in self._families.values():
+                family.series.clear()
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if len(labels) == 0:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter('vote_scraper_http_requests_total', "HTTP requests by host and response status", ('host', 'status'))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram('vote_scraper_http_request_seconds', "Time taken by each HTTP request", ('host',))
+HTTP_BYTES = REGISTRY.counter('vote_scraper_http_bytes_total', "Response body bytes received, before decompression", ('host',))
+HTTP_RECONNECTS = REGISTRY.counter('vote_scraper_http_reconnects_total', "Requests retried on a new connection", ('host',))
+FETCH_RESTARTS = REGISTRY.counter('vote_scraper_fetch_restarts_total', "Fetch runs restarted after an unexpected response", ('source',))
+
+DOCUMENTS = REGISTRY.counter('vote_scraper_documents_total', "Documents parsed", ('source',))
+DOCUMENT_BYTES = REGISTRY.counter('vote_scraper_document_bytes_total', "Bytes of documents parsed", ('source',))
+PARSE_SECONDS = REGISTRY.histogram('vote_scraper_parse_seconds', "Time taken to parse and validate each document", ('source',))
+MODEL_SECONDS = REGISTRY.histogram('vote_scraper_model_seconds', "Time taken to build the rows written for each parsed document", ('source',))
+
+TRANSACTIONS = REGISTRY.counter('vote_scraper_transactions_total', "Write transactions committed", ('stage',))
+TRANSACTION_SECONDS = REGISTRY.histogram('vote_scraper_transaction_seconds', "Time taken by each write transaction, including retries", ('stage',))
+TRANSACTION_RETRIES = REGISTRY.counter('vote_scraper_transaction_retries_total', "Write transaction attempts retried after a transient error", ('stage',))
+TRANSACTION_DEADLOCKS = REGISTRY.counter('vote_scraper_transaction_deadlocks_total', "Write transaction attempts that deadlocked with another writer", ('stage',))
+ROWS_WRITTEN = REGISTRY.counter('vote_scraper_rows_written_total', "Rows passed to write transactions", ('stage',))
+NEO4J_UPDATES = REGISTRY.counter('vote_scraper_neo4j_updates_total', "Updates reported in the ResultSummary of committed statements", ('stage', 'counter'))
+
+PIPELINE_ITEMS = REGISTRY.counter('vote_scraper_pipeline_items_total', "Items handled by each pipeline stage", ('pipeline', 'stage'))
+PIPELINE_SECONDS = REGISTRY.counter(
+    'vote_scraper_pipeline_seconds_total',
+    "Time each pipeline stage spent working, waiting for input and waiting for room downstream",
+    ('pipeline', 'stage', 'state'),
+)
+
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timed = REGISTRY.time
+
+
+def record_document(source: str, size: int):
+    inc(DOCUMENTS, source=source)
+    inc(DOCUMENT_BYTES, size, source=source)
+
+
+def record_summary(stage: str, summary):
+    """Add the update counters of a neo4j `ResultSummary` to `stage`'s totals"""
+    if summary is None:
+        return
+    for counter in SUMMARY_COUNTERS:
+        value = getattr(summary.counters, counter, 0)
+        if value:
+            inc(NEO4J_UPDATES, value, stage=stage, counter=counter)
+
+
+def write_textfile(path: str, registry: Registry = REGISTRY):
+    """Write every metric to `path` for node_exporter's textfile collector, replacing it atomically"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: Registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("Metrics request: " + format, *args)
+
+
+def serve(port: int, host: str = '') -> ThreadingHTTPServer:
+    """Serve every metric at `http://host:port/metrics` from a background thread"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    logger.info("Serving metrics on port %d", server.server_address[1])
+    return server
+
+
+def _mean_ms(total: float, count: int) -> float:
+    return 1000 * total / count if count else 0.0
+
+
+def log_summary(registry: Registry = REGISTRY, level: int = logging.INFO):
+    """Log the totals of a run: what was fetched, parsed and written, and where the time went"""
+    requests = registry.totals(HTTP_REQUESTS, by='host')
+    request_seconds = registry.totals(HTTP_REQUEST_SECONDS, by='host')
+    received = registry.totals(HTTP_BYTES, by='host')
+    for host, (count, _) in sorted(requests.items()):
+        seconds, _ = request_seconds.get(host, (0.0, 0))
+        logger.log(
+            level, "Made %d requests to %s receiving %.1f MB in %.1f s, %.1f ms each on average",
+            count, host, received.get(host, (0.0, 0))[0] / 1e6, seconds, _mean_ms(seconds, int(count)),
+        )
+
+    documents = registry.totals(DOCUMENTS, by='source')
+    parse_seconds = registry.totals(PARSE_SECONDS, by='source')
+    model_seconds = registry.totals(MODEL_SECONDS, by='source')
+    for source, (count, _) in sorted(documents.items()):
+        parsed, parse_count = parse_seconds.get(source, (0.0, 0))
+        logger.log(level, "Parsed %d %s documents, %.2f ms each on average", count, source, _mean_ms(parsed, parse_count))
+        if source in model_seconds:
+            built, build_count = model_seconds[source]
+            logger.log(level, "Built rows from %d %s documents, %.2f ms each on average", build_count, source, _mean_ms(built, build_count))
+
+    transaction_seconds = registry.totals(TRANSACTION_SECONDS, by='stage')
+    rows = registry.totals(ROWS_WRITTEN, by='stage')
+    retries = registry.totals(TRANSACTION_RETRIES, by='stage')
+    deadlocks = registry.totals(TRANSACTION_DEADLOCKS, by='stage')
+    for stage, (seconds, count) in sorted(transaction_seconds.items()):
+        logger.log(
+            level, "Wrote %d %s rows in %d transactions taking %.1f s, %.1f ms each on average, with %d retries (%d deadlocks)",
+            rows.get(stage, (0.0, 0))[0], stage, count, seconds, _mean_ms(seconds, count), retries.get(stage, (0.0, 0))[0],
+            deadlocks.get(stage, (0.0, 0))[0],
+        )
+
+    updates = registry.totals(NEO4J_UPDATES, by='counter')
+    if len(updates) != 0:
+        logger.log(level, "Neo4j updates: %s", ", ".join(
+            f"{int(updates[counter][0])} {counter.replace('_', ' ')}" for counter in SUMMARY_COUNTERS if counter in updates
+        ))
+
+
+def export(textfile: Optional[str]):
+    """Log the run's summary, and write the metrics to `textfile` when one is configured"""
+    log_summary()
+    if textfile:
+        write_textfile(textfile)
+        logger.info("Wrote metrics to %s", textfile)
@@ -71,6 +71,9 @@ class RollCall(BaseModel):
   when: datetime
   question: str
 
+# Recorded for members absent from a roll call. It isn't a position, so isn't counted as one
+NOT_VOTING = 'Not Voting'
+
 class VotedOn(BaseModel):
   vote: str
 
@@ -0,0 +1,229 @@
+from dataclasses import dataclass
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, List, Sequence, Tuple, TypeVar
+import logging
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar('R')
+
+# How often a stage blocked on a queue checks whether the pipeline is shutting down
+_POLL_SECONDS = 0.1
+
+
+@dataclass
+class StageStats:
+    name: str
+    items: int = 0
+    total_seconds: float = 0.0
+    # Time spent with nothing to do because the stage before had not produced anything yet
+    input_wait_seconds: float = 0.0
+    # Time spent holding a finished item because the queue to the next stage was full
+    output_wait_seconds: float = 0.0
+
+    @property
+    def busy_seconds(self) -> float:
+        return max(self.total_seconds - self.input_wait_seconds - self.output_wait_seconds, 0.0)
+
+
+@dataclass
+class _Failure:
+    error: BaseException
+
+
+class _Done:
+    pass
+
+
+class _Stopped(Exception):
+    pass
+
+
+class _Channel:
+    """Bounded queue between two stages. Blocking calls give up once the pipeline is stopped."""
+
+    def __init__(self, depth: int, stopped: Event):
+        self._queue: Queue = Queue(maxsize=max(depth, 1))
+        self._stopped = stopped
+
+    def put(self, item: Any, stats: StageStats):
+        start = perf_counter()
+        try:
+            while True:
+                if self._stopped.is_set():
+                    raise _Stopped()
+                try:
+                    self._queue.put(item, timeout=_POLL_SECONDS)
+                    return
+                except Full:
+                    pass
+        finally:
+            stats.output_wait_seconds += perf_counter() - start
+
+    def get(self, stats: StageStats) -> Any:
+        start = perf_counter()
+        try:
+            while True:
+                if self._stopped.is_set():
+                    raise _Stopped()
+                try:
+                    return self._queue.get(timeout=_POLL_SECONDS)
+                except Empty:
+                    pass
+        finally:
+            stats.input_wait_seconds += perf_counter() - start
+
+    def drain(self, stats: StageStats) -> Iterator[Any]:
+        """Yield items until the stage before finishes, re-raising anything it failed with"""
+        while True:
+            item = self.get(stats)
+            if isinstance(item, _Done):
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            stats.items += 1
+            yield item
+
+
+class Pipeline:
+    """
+    Runs a source, any number of one-to-one transforms and a sink at the same time, each on
+    its own thread and joined by bounded queues. The source might fetch documents, a transform
+    parse them, and the sink write them to the database, so while one vote is being written
+    the next is being parsed and the ones after that fetched.
+
+    Once a queue holds `queue_depth` items the stage feeding it waits, so a slow database
+    holds back fetching rather than letting parsed votes pile up in memory.
+
+    The sink runs on the calling thread and receives an iterator over everything the last
+    transform produced. If any stage raises, the others are stopped and the error is raised
+    from `run`.
+    """
+
+    def __init__(self, name: str, queue_depth: int):
+        self.name = name
+        self.queue_depth = queue_depth
+        self.stats: List[StageStats] = []
+
+    def _run_source(self, source: Iterable[Any], output: _Channel, stats: StageStats):
+        start = perf_counter()
+        iterator = iter(source)
+        try:
+            for item in iterator:
+                output.put(item, stats)
+                stats.items += 1
+            output.put(_Done(), stats)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            try:
+                output.put(_Failure(e), stats)
+            except _Stopped:
+                pass
+        finally:
+            # Must happen on this thread, which is the one running the generator
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+            stats.total_seconds = perf_counter() - start
+
+    def _run_transform(self, transform: Callable[[Any], Any], upstream: _Channel, output: _Channel, stats: StageStats):
+        start = perf_counter()
+        try:
+            for item in upstream.drain(stats):
+                output.put(transform(item), stats)
+            output.put(_Done(), stats)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            try:
+                output.put(_Failure(e), stats)
+            except _Stopped:
+                pass
+        finally:
+            stats.total_seconds = perf_counter() - start
+
+    def run(
+        self,
+        source: Tuple[str, Iterable[Any]],
+        transforms: Sequence[Tuple[str, Callable[[Any], Any]]],
+        sink: Tuple[str, Callable[[Iterator[Any]], R]],
+    ) -> R:
+        """
+        Run every stage to completion, returning whatever the sink returns.
+
+        Args:
+            source: Name of the first stage and the items it produces
+            transforms: Name and function of each stage in between, applied to every item in turn
+            sink: Name of the last stage and a function consuming an iterator over its input
+        """
+        stopped = Event()
+        channels = [_Channel(self.queue_depth, stopped) for _ in range(len(transforms) + 1)]
+
+        source_name, source_items = source
+        sink_name, consume = sink
+        self.stats = [StageStats(source_name)] + [StageStats(name) for name, _ in transforms] + [StageStats(sink_name)]
+
+        threads = [
+            Thread(
+                target=self._run_source,
+                args=(source_items, channels[0], self.stats[0]),
+                name=f'{self.name}-{source_name}',
+                daemon=True,
+            )
+        ]
+        for i, (name, transform) in enumerate(transforms):
+            threads.append(Thread(
+                target=self._run_transform,
+                args=(transform, channels[i], channels[i + 1], self.stats[i + 1]),
+                name=f'{self.name}-{name}',
+                daemon=True,
+            ))
+
+        for thread in threads:
+            thread.start()
+
+        sink_stats = self.stats[-1]
+        start = perf_counter()
+        try:
+            return consume(channels[-1].drain(sink_stats))
+        finally:
+            sink_stats.total_seconds = perf_counter() - start
+            stopped.set()
+            for thread in threads:
+                thread.join()
+            self.log_report()
+            self.record_metrics()
+
+    def record_metrics(self):
+        for stats in self.stats:
+            metrics.inc(metrics.PIPELINE_ITEMS, stats.items, pipeline=self.name, stage=stats.name)
+            for state, seconds in (
+                ('busy', stats.busy_seconds),
+                ('input_wait', stats.input_wait_seconds),
+                ('output_wait', stats.output_wait_seconds),
+            ):
+                metrics.inc(metrics.PIPELINE_SECONDS, seconds, pipeline=self.name, stage=stats.name, state=state)
+
+    def log_report(self, level: int = logging.INFO):
+        for stats in self.stats:
+            logger.log(
+                level,
+                "%s pipeline: %s handled %d items in %.1f s; busy %.1f s, waited %.1f s for input and %.1f s for room downstream",
+                self.name,
+                stats.name,
+                stats.items,
+                stats.total_seconds,
+                stats.busy_seconds,
+                stats.input_wait_seconds,
+                stats.output_wait_seconds,
+            )
+
+        if len(self.stats) > 0:
+            slowest = max(self.stats, key=lambda s: s.busy_seconds)
+            logger.log(level, "%s pipeline: %s was the slowest stage", self.name, slowest.name)
+
@@ -0,0 +1,39 @@
+"""
+Find the House and Senate roll calls there are to fetch from a starting point, and divide them
+between workers, e.g. to plan a backfill before running it.
+
+Usage:
+    python -m scraper.plan [--year 2023] [--congress 118] [--workers 4]
+"""
+import argparse
+import logging
+
+from .settings import Settings
+from .ranges import split_ranges
+from .house import discover_house_ranges
+from .senate import discover_senate_ranges
+
+
+def main():
+    settings = Settings.from_environs()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--year", type=int, default=settings.resume_year, help="Year to start House roll calls at")
+    parser.add_argument("--congress", type=int, default=settings.resume_congress, help="Congress to start Senate roll calls at")
+    parser.add_argument("--workers", type=int, default=1, help="Number of workers to divide the roll calls between")
+    args = parser.parse_args()
+    logging.basicConfig(level=settings.log_level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    ranges = list(discover_house_ranges(settings, args.year, 1)) + list(discover_senate_ranges(settings, args.congress, 1, 1))
+    for r in ranges:
+        print(f"{str(r):<32} {len(r):>6} roll calls")
+    print(f"{'total':<32} {sum(len(r) for r in ranges):>6} roll calls")
+
+    if args.workers > 1:
+        for worker, plan in enumerate(split_ranges(ranges, args.workers)):
+            print(f"\nworker {worker}: {sum(len(r) for r in plan)} roll calls")
+            for r in plan:
+                print(f"    {r}")
+
+
+if __name__ == "__main__":
+    main()
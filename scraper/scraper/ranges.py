@@ -0,0 +1,92 @@
+from dataclasses import dataclass, replace
+from typing import Callable, Iterable, List, Optional
+import logging
+
+import scraper.models as models
+from .fetching import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RollCallRange:
+    """
+    Roll calls `first` to `last` inclusive of one session. House roll calls are numbered
+    within a calendar year, given as `year`, Senate ones within a congress and session.
+    """
+    chamber: models.Chamber
+    congress: int
+    session: int
+    first: int
+    last: int
+    year: Optional[int] = None
+
+    def __len__(self) -> int:
+        return max(self.last - self.first + 1, 0)
+
+    def __str__(self) -> str:
+        period = self.year if self.year is not None else f"{self.congress}-{self.session}"
+        return f"{self.chamber.value} {period} #{self.first}-{self.last}"
+
+
+def last_present(exists: Callable[[int], bool], after: int = 0, limiter: Optional[TokenBucket] = None) -> int:
+    """
+    Find the last roll call of a session by probing individual numbers.
+
+    Numbers are probed at `after + 1`, `after + 2`, `after + 4`, ... until one is missing, then
+    bisected between the last found and that one, so finding `n` roll calls takes about
+    `2 * log2(n)` probes however long the session.
+
+    Args:
+        exists: Whether the roll call with a number exists. Roll calls are numbered from 1
+            without gaps, so this must be true up to the last one and false after it
+        after: A number known to exist, or 0
+        limiter: Taken from before each probe, to stay within the crawl rate
+
+    Returns:
+        The last number that exists, or `after` if none after it do
+    """
+    def probe(number: int) -> bool:
+        if limiter is not None:
+            limiter.acquire()
+        return exists(number)
+
+    found, step = after, 1
+    missing = after + step
+    while probe(missing):
+        found = missing
+        step *= 2
+        missing = after + step
+
+    while missing - found > 1:
+        middle = (found + missing) // 2
+        if probe(middle):
+            found = middle
+        else:
+            missing = middle
+    return found
+
+
+def split_ranges(ranges: Iterable[RollCallRange], parts: int) -> List[List[RollCallRange]]:
+    """
+    Divide `ranges` into `parts` contiguous plans of about the same number of roll calls each,
+    splitting a range where a plan's share ends part way through it.
+    """
+    ranges = [r for r in ranges if len(r) > 0]
+    total = sum(len(r) for r in ranges)
+    parts = max(min(parts, total), 1)
+
+    plans: List[List[RollCallRange]] = [[] for _ in range(parts)]
+    part, taken = 0, 0
+    for r in ranges:
+        first = r.first
+        while first <= r.last:
+            # Roll calls before the end of this part's share, spreading any remainder over the first parts
+            share = total // parts + (1 if part < total % parts else 0)
+            last = min(r.last, first + share - taken - 1)
+            plans[part].append(replace(r, first=first, last=last))
+            taken += last - first + 1
+            first = last + 1
+            if taken == share and part < parts - 1:
+                part, taken = part + 1, 0
+    return plans
@@ -0,0 +1,138 @@
+from array import array
+from sys import intern
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+
+class ValueDictionary:
+    """
+    Encodes the values of a small domain, e.g. party abbreviations, as the codes 1, 2, 3, ...
+    in the order they are first seen. `None` is always code 0.
+
+    A dictionary is shared by every roll call parsed in the process, so each distinct value is
+    held once however many votes are buffered.
+    """
+    __slots__ = ('values', 'codes', '_lock')
+
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[Optional[str], int] = {None: 0}
+        self._lock = Lock()
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self.codes.get(value)
+                if code is None:
+                    code = len(self.values)
+                    self.values.append(intern(value))
+                    self.codes[self.values[code]] = code
+        return code
+
+    def decode(self, code: int) -> Optional[str]:
+        return self.values[code]
+
+    def decode_present(self, code: int) -> str:
+        """Decode a value known not to be `None`, i.e. anything but code 0"""
+        value = self.values[code]
+        if value is None:
+            raise ValueError(f"Code {code} is not a value")
+        return value
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+PARTIES = ValueDictionary()
+STATES = ValueDictionary()
+VOTES = ValueDictionary()
+
+
+class VoteRow(NamedTuple):
+    """One recorded vote, decoded from `RecordedVotes`. Fields missing from the roll call are `None`"""
+    id: Optional[str]
+    name: Optional[str]
+    party: Optional[str]
+    state: Optional[str]
+    vote: str
+
+
+class RecordedVotes:
+    """
+    The votes recorded on a roll call, stored a column at a time.
+
+    Member IDs and names are interned, so a legislator's strings are shared by every roll call
+    they appear on, and party, state and vote are stored as 2 byte codes into `PARTIES`,
+    `STATES` and `VOTES`. A buffered House roll call takes a few kilobytes rather than an
+    object per member and field.
+    """
+    __slots__ = ('ids', 'names', 'parties', 'states', 'votes')
+
+    def __init__(self, rows: Iterable[Tuple[Optional[str], Optional[str], Optional[str], Optional[str], str]] = ()):
+        self.ids: List[Optional[str]] = []
+        self.names: List[Optional[str]] = []
+        self.parties = array('H')
+        self.states = array('H')
+        self.votes = array('H')
+        for row in rows:
+            self.append(*row)
+
+    def append(self, id: Optional[str], name: Optional[str], party: Optional[str], state: Optional[str], vote: Optional[str]):
+        """
+        Args:
+            id: House `name-id` (the bioguide ID) or Senate `lis_member_id`
+            name: Unaccented name in the House, last name in the Senate
+            party: Party abbreviation
+            state: State postal code
+            vote: Vote cast, e.g. `Yea` or `Not Voting`
+
+        Raises:
+            ValueError: If no vote is given, since a recorded vote without one can't be written
+        """
+        if vote is None:
+            raise ValueError(f"No vote recorded for {name} ({id})")
+        self.ids.append(intern(id) if id is not None else None)
+        self.names.append(intern(name) if name is not None else None)
+        # Values seen before, nearly all of them, are looked up without a call to `encode`
+        self.parties.append(PARTIES.codes.get(party) or PARTIES.encode(party))
+        self.states.append(STATES.codes.get(state) or STATES.encode(state))
+        self.votes.append(VOTES.codes.get(vote) or VOTES.encode(vote))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> VoteRow:
+        return VoteRow(
+            self.ids[i],
+            self.names[i],
+            PARTIES.values[self.parties[i]],
+            STATES.values[self.states[i]],
+            VOTES.decode_present(self.votes[i]),
+        )
+
+    def __iter__(self) -> Iterator[VoteRow]:
+        parties, states, vote_of = PARTIES.values, STATES.values, VOTES.decode_present
+        for id, name, party, state, vote in zip(self.ids, self.names, self.parties, self.states, self.votes):
+            yield VoteRow(id, name, parties[party], states[state], vote_of(vote))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RecordedVotes):
+            return NotImplemented
+        return (self.ids == other.ids and self.names == other.names and self.parties == other.parties
+                and self.states == other.states and self.votes == other.votes)
+
+    def __repr__(self) -> str:
+        return f"RecordedVotes({list(self)!r})"
+
+    def distinct_votes(self) -> Set[str]:
+        """Every vote cast at least once, e.g. to build the properties of each only once"""
+        return {VOTES.decode_present(vote) for vote in set(self.votes)}
+
+    def party_votes(self) -> Iterator[Tuple[Optional[str], str]]:
+        """The party and vote of every member, as `party_positions` expects"""
+        parties, vote_of = PARTIES.values, VOTES.decode_present
+        for party, vote in zip(self.parties, self.votes):
+            yield parties[party], vote_of(vote)
@@ -0,0 +1,125 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Sequence
+import logging
+
+from neo4j import Driver
+
+logger = logging.getLogger(__name__)
+
+# How long to wait for new indexes to finish populating before giving up
+INDEX_ONLINE_TIMEOUT_SECONDS = 600
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    # Schema commands only. Each is run in its own transaction, and must be safe to run again
+    statements: Sequence[str]
+
+
+# Append new migrations to the end with the next version number. Never edit one that has shipped,
+# since databases that already applied it won't run it again.
+MIGRATIONS: Sequence[Migration] = (
+    Migration(1, "Uniqueness constraints on natural keys", (
+        """CREATE CONSTRAINT legislator_bioguide_id_unique IF NOT EXISTS
+            FOR (l: Legislator)
+            REQUIRE l.bioguide_id IS UNIQUE
+        """,
+        """CREATE CONSTRAINT congress_number_unique IF NOT EXISTS
+            FOR (c: Congress)
+            REQUIRE c.number IS UNIQUE
+        """,
+        """CREATE CONSTRAINT party_name_unique IF NOT EXISTS
+            FOR (p: Party)
+            REQUIRE p.name IS UNIQUE
+        """,
+        """CREATE CONSTRAINT state_code_unique IF NOT EXISTS
+            FOR (s: State)
+            REQUIRE s.code IS UNIQUE
+        """,
+        """CREATE CONSTRAINT bioguide_profile_name_unique IF NOT EXISTS
+            FOR (p: BioguideProfile)
+            REQUIRE p.name IS UNIQUE
+        """,
+    )),
+    Migration(2, "Index legislators by LIS member ID", (
+        """CREATE INDEX legislator_lis_member_id IF NOT EXISTS
+            FOR (l: Legislator)
+            ON (l.lis_member_id)
+        """,
+    )),
+    Migration(3, "Roll calls are unique by chamber, congress, session and number", (
+        """CREATE CONSTRAINT roll_call_key_unique IF NOT EXISTS
+            FOR (rc: RollCall)
+            REQUIRE (rc.chamber, rc.congress, rc.session, rc.number) IS UNIQUE
+        """,
+        """CREATE INDEX roll_call_chamber IF NOT EXISTS
+            FOR (rc: RollCall)
+            ON (rc.chamber)
+        """,
+    )),
+    Migration(4, "Index legislators by name and parties by abbreviation", (
+        """CREATE INDEX legislator_family_name IF NOT EXISTS
+            FOR (l: Legislator)
+            ON (l.family_name)
+        """,
+        """CREATE INDEX legislator_unaccented_family_name IF NOT EXISTS
+            FOR (l: Legislator)
+            ON (l.unaccented_family_name)
+        """,
+        """CREATE INDEX party_abbreviation IF NOT EXISTS
+            FOR (p: Party)
+            ON (p.abbreviation)
+        """,
+    )),
+    Migration(5, "One scrape cursor per chamber", (
+        """CREATE CONSTRAINT scrape_cursor_chamber_unique IF NOT EXISTS
+            FOR (c: ScrapeCursor)
+            REQUIRE c.chamber IS UNIQUE
+        """,
+    )),
+)
+
+
+def current_version(driver: Driver) -> int:
+    records, _, _ = driver.execute_query("MATCH (v: SchemaVersion) RETURN v.version AS version")
+    if len(records) == 0:
+        return 0
+    return records[0]['version']
+
+
+def migrate(driver: Driver, migrations: Sequence[Migration] = MIGRATIONS) -> int:
+    """
+    Apply every migration newer than the version recorded in the database, in order, then wait
+    for any indexes they created to come online.
+
+    Returns:
+        The schema version the database is now at
+    """
+    version = current_version(driver)
+    pending = [migration for migration in migrations if migration.version > version]
+    if len(pending) == 0:
+        logger.debug("Schema is up to date at version %d", version)
+        return version
+
+    with driver.session() as session:
+        for migration in sorted(pending, key=lambda m: m.version):
+            logger.info("Applying schema migration %d: %s", migration.version, migration.description)
+            for statement in migration.statements:
+                session.run(statement).consume()
+
+            # Recorded after each migration, so a failure part way resumes from the one that failed
+            session.run("""
+                MERGE (v: SchemaVersion)
+                SET v.version = $version
+                    , v.applied_at = datetime()
+            """, version=migration.version).consume()
+            version = migration.version
+
+        start = perf_counter()
+        session.run("CALL db.awaitIndexes($timeout)", timeout=INDEX_ONLINE_TIMEOUT_SECONDS).consume()
+        logger.info("Indexes online after %.1f s", perf_counter() - start)
+
+    return version
@@ -1,9 +1,9 @@
 from dataclasses import dataclass, field
-from itertools import islice
+from functools import partial
+from itertools import batched, islice
 from pprint import pprint
-from typing import List, Optional, Tuple, Iterator, no_type_check
-from urllib.request import urlopen
-from time import sleep
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Iterator, no_type_check
+from urllib.error import URLError
 import xml.etree.ElementTree as ET
 import logging
 from datetime import datetime
@@ -13,7 +13,18 @@ from neo4j import Driver, Transaction
 import scraper.models as models
 
 from ..settings import Settings
+from ..database import INSERT_ROLL_CALL_QUERY, execute_write, insert_roll_call_votes, party_positions
+from ..fetching import OrderedFetcher, TokenBucket
+from ..ranges import RollCallRange, last_present
+from ..http_client import HttpClient
+from ..archive import VoteArchive, VoteDocument
+from ..pipeline import Pipeline
+from ..recorded_votes import RecordedVotes
+from ..checkpoint import advance_cursor, read_cursor
+from ..writers import RollCallWriter
+from .. import metrics
 from .member_list import MemberList, fetch_member_list
+from .resolver import SenatorResolver, record_lis_member_ids
 
 logger = logging.getLogger(__name__)
 
@@ -52,17 +63,6 @@ class TieBreaker:
     tie_breaker_vote: Optional[str]
 
 
-@dataclass
-class Member:
-    member_full: str
-    last_name: str
-    first_name: str
-    party: str
-    state: str
-    vote_cast: str
-    lis_member_id: str
-
-
 @dataclass
 class RollCallVote:
     congress: int
@@ -82,46 +82,42 @@ class RollCallVote:
     amendment: Amendment
     count: Count
     tie_breaker: TieBreaker
-    members: List[Member]
+    members: RecordedVotes
 
 
 @no_type_check # not going to type-check chat-gpt generated code
-def parse_roll_call_vote(xml_string: str) -> RollCallVote:
+def parse_roll_call_vote(xml_string: bytes | str) -> RollCallVote:
     root = ET.fromstring(xml_string)
 
     def get_text(element, tag):
-        return element.find(tag).text if element.find(tag) is not None else None
+        # Empty elements, e.g. the amendment fields of a vote on a bill, read as None
+        return element.findtext(tag) or None
 
+    document_elem = root.find("document")
     document = Document(
-        document_congress=int(get_text(root.find("document"), "document_congress")),
-        document_type=get_text(root.find("document"), "document_type"),
-        document_number=get_text(root.find("document"), "document_number"),
-        document_name=get_text(root.find("document"), "document_name"),
-        document_title=get_text(root.find("document"), "document_title"),
-        document_short_title=get_text(root.find("document"), "document_short_title"),
+        document_congress=int(get_text(document_elem, "document_congress")),
+        document_type=get_text(document_elem, "document_type"),
+        document_number=get_text(document_elem, "document_number"),
+        document_name=get_text(document_elem, "document_name"),
+        document_title=get_text(document_elem, "document_title"),
+        document_short_title=get_text(document_elem, "document_short_title"),
     )
 
+    amendment_elem = root.find("amendment")
     amendment = Amendment(
-        amendment_number=get_text(root.find("amendment"), "amendment_number"),
-        amendment_to_amendment_number=get_text(
-            root.find("amendment"), "amendment_to_amendment_number"
-        ),
-        amendment_to_amendment_to_amendment_number=get_text(
-            root.find("amendment"), "amendment_to_amendment_to_amendment_number"
-        ),
-        amendment_to_document_number=get_text(
-            root.find("amendment"), "amendment_to_document_number"
-        ),
-        amendment_to_document_short_title=get_text(
-            root.find("amendment"), "amendment_to_document_short_title"
-        ),
-        amendment_purpose=get_text(root.find("amendment"), "amendment_purpose"),
+        amendment_number=get_text(amendment_elem, "amendment_number"),
+        amendment_to_amendment_number=get_text(amendment_elem, "amendment_to_amendment_number"),
+        amendment_to_amendment_to_amendment_number=get_text(amendment_elem, "amendment_to_amendment_to_amendment_number"),
+        amendment_to_document_number=get_text(amendment_elem, "amendment_to_document_number"),
+        amendment_to_document_short_title=get_text(amendment_elem, "amendment_to_document_short_title"),
+        amendment_purpose=get_text(amendment_elem, "amendment_purpose"),
     )
 
-    yeas = get_text(root.find("count"), "yeas")
-    nays = get_text(root.find("count"), "nays")
-    present = get_text(root.find("count"), "present")
-    absent = get_text(root.find("count"), "absent")
+    count_elem = root.find("count")
+    yeas = get_text(count_elem, "yeas")
+    nays = get_text(count_elem, "nays")
+    present = get_text(count_elem, "present")
+    absent = get_text(count_elem, "absent")
 
     count = Count(
         yeas=yeas and int(yeas),
@@ -130,23 +126,20 @@ def parse_roll_call_vote(xml_string: str) -> RollCallVote:
         absent=absent and int(absent),
     )
 
+    tie_breaker_elem = root.find("tie_breaker")
     tie_breaker = TieBreaker(
-        by_whom=get_text(root.find("tie_breaker"), "by_whom"),
-        tie_breaker_vote=get_text(root.find("tie_breaker"), "tie_breaker_vote"),
+        by_whom=get_text(tie_breaker_elem, "by_whom"),
+        tie_breaker_vote=get_text(tie_breaker_elem, "tie_breaker_vote"),
     )
 
-    members = []
-    for member in root.find("members").findall("member"):
+    members = RecordedVotes()
+    for member in root.find("members").iterfind("member"):
         members.append(
-            Member(
-                member_full=get_text(member, "member_full"),
-                last_name=get_text(member, "last_name"),
-                first_name=get_text(member, "first_name"),
-                party=get_text(member, "party"),
-                state=get_text(member, "state"),
-                vote_cast=get_text(member, "vote_cast"),
-                lis_member_id=get_text(member, "lis_member_id"),
-            )
+            id=member.findtext("lis_member_id") or None,
+            name=member.findtext("last_name") or None,
+            party=member.findtext("party") or None,
+            state=member.findtext("state") or None,
+            vote=member.findtext("vote_cast") or None,
         )
 
     return RollCallVote(
@@ -179,52 +172,160 @@ def _construct_senate_url(
 class VoteNoteFoundException(Exception):
     pass
 
+def fetch_single_senate_vote(
+    settings: Settings, congress: int, session: int, vote_number: int, client: Optional[HttpClient] = None
+) -> VoteDocument:
+    url = _construct_senate_url(settings.senate_url, congress, session, vote_number)
+    raw = (client or HttpClient()).get(url).body
+    if b'DOCTYPE html' in raw:
+        # Despite Al-Gore having invented the internet, the senate does not know what a 404 error is
+        # we detect the error page and raise an exception
+        raise VoteNoteFoundException("Unable to find vote")
+
+    return VoteDocument(models.Chamber.SENATE, congress, session, vote_number, url, raw)
+
+def parse_senate_document(document: VoteDocument, archive: Optional[VoteArchive] = None) -> RollCallVote:
+    """Parse a fetched vote, archiving the document once it is known to be a valid vote"""
+    with metrics.timed(metrics.PARSE_SECONDS, source='senate'):
+        results = parse_roll_call_vote(document.body)
+    metrics.record_document('senate', len(document.body))
+
+    if archive is not None and not archive.contains(models.Chamber.SENATE, document.congress, document.session, document.number):
+        archive.store(models.Chamber.SENATE, document.congress, document.session, document.number, document.url, document.body)
+
+    return results
+
 def scrape_single_senate_vote(
-    settings: Settings, congress: int, session: int, vote_number: int
+    settings: Settings, congress: int, session: int, vote_number: int, client: Optional[HttpClient] = None
 ) -> RollCallVote:
-    url = _construct_senate_url(settings.senate_url, congress, session, vote_number)
-    with urlopen(url) as response:
-        raw = response.read()
-        if b'DOCTYPE html' in raw:
-            # Despite Al-Gore having invented the internet, the senate does not know what a 404 error is
-            # we detect the error page and raise an exception
-            raise VoteNoteFoundException("Unable to find vote")
+    return parse_senate_document(fetch_single_senate_vote(settings, congress, session, vote_number, client))
 
-        results = parse_roll_call_vote(raw)
-        return results
+def _construct_vote_menu_url(base_url: str, congress: int, session: int) -> str:
+    return f"{base_url}/vote_menu_{congress}_{session}.xml"
+
+def parse_vote_menu(xml_string: bytes | str) -> int:
+    """Number of the last vote listed on a session's vote menu, or 0 if it lists none"""
+    root = ET.fromstring(xml_string)
+    return max((int(number.text) for number in root.iterfind('./votes/vote/vote_number') if number.text), default=0)
+
+def fetch_last_vote_number(settings: Settings, congress: int, session: int, client: Optional[HttpClient] = None) -> Optional[int]:
+    """Number of the last vote of a session according to its vote menu, or `None` if there's no menu to go by"""
+    url = _construct_vote_menu_url(settings.senate_vote_menu_url, congress, session)
+    try:
+        raw = (client or HttpClient()).get(url).body
+    except OSError as e:
+        # Including `URLError`s. The menu is only a shortcut, so any failure falls back to probing
+        logger.debug("Unable to fetch the vote menu of %d-%d: %s", congress, session, repr(e))
+        return None
+    if b'DOCTYPE html' in raw:
+        # The Senate's answer to a missing page
+        return None
+
+    try:
+        return parse_vote_menu(raw)
+    except (ET.ParseError, ValueError) as e:
+        logger.warning("Unable to read the vote menu of %d-%d: %s", congress, session, repr(e))
+        return None
+
+def senate_vote_exists(settings: Settings, congress: int, session: int, vote_number: int, client: Optional[HttpClient] = None) -> bool:
+    try:
+        fetch_single_senate_vote(settings, congress, session, vote_number, client)
+    except VoteNoteFoundException:
+        return False
+    return True
+
+def discover_senate_ranges(settings: Settings, congress: int, session: int, vote_number: int) -> Iterator[RollCallRange]:
+    """
+    Find the votes of each session from `vote_number` of `congress`-`session` on, ending with the
+    first session that has none. The last vote of each is read from the session's vote menu, or
+    found with `last_present` where there's no menu.
+    """
+    client = HttpClient.from_settings(settings)
+    limiter = TokenBucket.from_settings(settings)
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        last = fetch_last_vote_number(settings, congress, session, client)
+        if last is None:
+            last = last_present(partial(senate_vote_exists, settings, congress, session, client=client), vote_number - 1, limiter)
+
+        if last >= vote_number:
+            yield RollCallRange(models.Chamber.SENATE, congress, session, vote_number, last)
+        elif vote_number == 1:
+            logger.debug("The %dth congress, session %d has no votes. Assuming this is the end of the data.", congress, session)
+            return
+
+        vote_number = 1
+        if session == 1:
+            session += 1
+        else:
+            congress += 1
+            session = 1
+
+def fetch_senate_ranges(settings: Settings, ranges: Iterable[RollCallRange]) -> Iterator[VoteDocument]:
+    """Fetch every vote in `ranges`, known to exist, so no request is spent looking for the end of a session"""
+    client = HttpClient.from_settings(settings)
+    with OrderedFetcher.from_settings(settings) as fetcher:
+        for r in ranges:
+            with fetcher.fetch_run(partial(fetch_single_senate_vote, settings, r.congress, r.session, client=client), r.first, r.last + 1) as run:
+                for vote_number, result in run:
+                    try:
+                        yield result.result()
+                    except VoteNoteFoundException:
+                        logger.warning("Senate %d-%d-%d is missing, skipping it", r.congress, r.session, vote_number)
+            logger.info("Fetched %s", r)
+
+def fetch_senate_starting_at(settings: Settings, congress: int, session: int, vote_number: int) -> Iterator[VoteDocument]:
+    if settings.discover_ranges:
+        ranges = list(discover_senate_ranges(settings, congress, session, vote_number))
+        logger.info("Found %d senate roll calls to fetch in %d sessions", sum(len(r) for r in ranges), len(ranges))
+        yield from fetch_senate_ranges(settings, ranges)
+        return
 
-def scrape_senate_starting_at(settings: Settings, congress: int, session: int, vote_number: int) -> Iterator[RollCallVote]:
     error_indicates_empty = True
     num_votes = 0
-    
-    while True:
-        try:
-            logger.debug("Will attempt to scrape %d-%d-%d", congress, session, vote_number)
-            result = scrape_single_senate_vote(settings, congress, session, vote_number)
-            yield result
-            error_indicates_empty = False
-            vote_number += 1
-            num_votes += 1
-            sleep(settings.crawl_delay_seconds)
-        except VoteNoteFoundException as e:
-            if error_indicates_empty:
-                # First element does not exist; stop scraping
-                logger.info("First vote of the %dth congress, session %d was not found. Done! Total of %d votes", congress, session, num_votes)
-                break
-            else:
-                # Try to move to next set of votes
-                vote_number = 1
-                error_indicates_empty = True
-                if session == 1:
-                    # Move to the second session from the first
-                    session += 1
-                    logger.debug("Moving to second session of the %dth congress", congress)
-                else:
-                    congress += 1
-                    session = 1
-                    logger.debug("Moving to the %dth congress, session 1", congress)
+
+    client = HttpClient.from_settings(settings)
+    with OrderedFetcher.from_settings(settings) as fetcher:
+        while True:
+            logger.debug("Will attempt to scrape %d-%d starting at %d", congress, session, vote_number)
+            with fetcher.fetch_run(partial(fetch_single_senate_vote, settings, congress, session, client=client), vote_number) as run:
+                for vote_number, result in run:
+                    try:
+                        document = result.result()
+                    except VoteNoteFoundException as e:
+                        if error_indicates_empty:
+                            # First element does not exist; stop scraping
+                            logger.info("First vote of the %dth congress, session %d was not found. Done! Total of %d votes", congress, session, num_votes)
+                            return
+
+                        # Try to move to next set of votes
+                        vote_number = 1
+                        error_indicates_empty = True
+                        if session == 1:
+                            # Move to the second session from the first
+                            session += 1
+                            logger.debug("Moving to second session of the %dth congress", congress)
+                        else:
+                            congress += 1
+                            session = 1
+                            logger.debug("Moving to the %dth congress, session 1", congress)
+                        break
+
+                    yield document
+                    error_indicates_empty = False
+                    num_votes += 1
+
+def replay_senate_starting_at(archive: VoteArchive, congress: int, session: int, vote_number: int) -> Iterator[VoteDocument]:
+    """Read votes back out of the archive instead of fetching them"""
+    return archive.replay(models.Chamber.SENATE, congress, session, vote_number)
 
 def find_resume_point_for_senate(settings: Settings, driver: Driver) -> Tuple[int,int,int]:
+    cursor = read_cursor(driver, models.Chamber.SENATE)
+    if cursor is not None:
+        return cursor['congress'], cursor['session'], cursor['number'] + 1
+
+    # Databases written before the scrape cursor existed need one scan to find where they got to
     records, summary, keys = driver.execute_query("""
     MATCH (rc: RollCall)
     WHERE rc.chamber = 'senate'
@@ -242,7 +343,30 @@ def find_resume_point_for_senate(settings: Settings, driver: Driver) -> Tuple[in
     last_vote = records[0].data()['rc']
     return last_vote['congress'], last_vote['session'], last_vote['number'] + 1
 
-def insert_single_vote(tx: Transaction, vote: RollCallVote):
+def resolve_vote_casts(vote: RollCallVote, resolver: SenatorResolver) -> List[Dict[str, Any]]:
+    """
+    Look up the bioguide ID of every senator voting on `vote`, returning the rows
+    `INSERT_ROLL_CALL_QUERY` expects. Senators that can't be found are logged and left out.
+    """
+    voters = []
+    voted_on = {vote: models.VotedOn(vote=vote).model_dump(exclude_none=True) for vote in vote.members.distinct_votes()}
+    for vote_cast in vote.members:
+        bioguide_id = resolver.resolve(vote.congress, vote_cast.name, vote_cast.state, vote_cast.party, vote_cast.id)
+        if bioguide_id is None:
+            logger.error("Unable for find bioguide id for %s (%s-%s)", vote_cast.name, vote_cast.party, vote_cast.state)
+            continue
+
+        voters.append({
+            'bioguide_id': bioguide_id,
+            'state': vote_cast.state,
+            'party': vote_cast.party,
+            'voted_on': voted_on[vote_cast.vote],
+        })
+    return voters
+
+
+def roll_call_properties(vote: RollCallVote) -> Dict[str, Any]:
+    """The `$rc` parameter `INSERT_ROLL_CALL_QUERY` writes `vote` with"""
     roll_call_vote = models.RollCall(
         chamber=models.Chamber.SENATE,
         congress=vote.congress,
@@ -252,82 +376,103 @@ def insert_single_vote(tx: Transaction, vote: RollCallVote):
         question=vote.question
     )
 
-    query = """
-        MERGE (rc: RollCall {
-            chamber: $rc.chamber,
-            congress: $rc.congress,
-            session: $rc.session,
-            number: $rc.number
-        })
-        ON CREATE SET rc = $rc
-        MERGE (c: Congress { number: $rc.congress })
-        MERGE (rc)-[:DURING_CONGRESS]->(c)
-        """
-    tx.run(query, rc=roll_call_vote.model_dump(exclude_none=True))
+    # Tallied from every senator on the roll call, including any that couldn't be resolved
+    rc = roll_call_vote.model_dump(exclude_none=True)
+    rc.update(party_positions(vote.members.party_votes()))
+    return rc
+
+
+def insert_single_vote(tx: Transaction, vote: RollCallVote, voters: List[Dict[str, Any]]):
+    tx.run(INSERT_ROLL_CALL_QUERY, rc=roll_call_properties(vote), votes=voters)
+
+
+def insert_votes(tx: Transaction, rc_votes: Sequence[Tuple[RollCallVote, List[Dict[str, Any]]]], lis_member_ids: Dict[str, str]):
+    for rc_vote, voters in rc_votes:
+        insert_single_vote(tx, rc_vote, voters)
+
+    if len(lis_member_ids) != 0:
+        record_lis_member_ids(tx, lis_member_ids)
+
+    last, _ = rc_votes[-1]
+    advance_cursor(tx, models.Chamber.SENATE, cursor_position(last))
 
-    for vote_cast in vote.members:
-        query = """
-        MATCH (l: Legislator)
-        WHERE l.unaccented_family_name = $family_name
-        MATCH (l)-[:REPRESENTS]->(:State{ code: $state})
-        , (l)-[:IS_MEMBER_OF_PARTY]->(:Party { abbreviation: $party })
-        , (l)-[:IS_MEMBER_OF_CONGRESS]->(:Congress { number: $congress })
-        LIMIT 1
-        MATCH (rc: RollCall {chamber: $rc.chamber, congress: $rc.congress, session: $rc.session, number: $rc.number})
-        MERGE (l)-[vote: VOTED_ON]->(rc)
-        ON CREATE SET vote = $voted
-        RETURN l.bioguide_id as bioguide_id
-        """
-        voted = models.VotedOn(vote=vote_cast.vote_cast)
-        result = tx.run(query,
-            family_name=vote_cast.last_name,
-            party=vote_cast.party,
-            state=vote_cast.state,
-            congress=roll_call_vote.congress, 
-            rc=roll_call_vote.model_dump(exclude_none=True),
-            voted=voted.model_dump(exclude_none=True))
-
-        row = result.single()
-
-        if row is None:
-            logger.error("Unable for find bioguide id for %s (%s-%s)", vote_cast.last_name, vote_cast.party, vote_cast.state)
-            continue
 
-        bioguide_id = row['bioguide_id']
-
-        # update state
-        query = """
-            MATCH (l: Legislator { bioguide_id: $bioguide_id})
-            MATCH (new_state: State { code: $state })
-            MERGE (l)-[:CURRENTLY_REPRESENTS]->(new_state)
-            WITH l, new_state
-            MATCH (l)-[old_rep: CURRENTLY_REPRESENTS]->(old_state: State)
-            WHERE old_state.code <> new_state.code
-            DELETE old_rep
-        """
-        tx.run(query, bioguide_id = bioguide_id, state=vote_cast.state)
-
-
-        # update party
-        query = """
-            MATCH (l: Legislator { bioguide_id: $bioguide_id})
-            MATCH (new_party: Party { abbreviation: $party })
-            MERGE (l)-[:CURRENTLY_MEMBER_OF]->(new_party)
-            WITH l, new_party
-            MATCH (l)-[old_membership: CURRENTLY_MEMBER_OF]->(old_party: State)
-            WHERE old_party.abbreviation <> new_party.abbreviation
-            DELETE old_membership
-        """
-        tx.run(query, bioguide_id = bioguide_id, party=vote_cast.party)
-
-
-def insert_senate_votes(driver: Driver, votes: Iterator[RollCallVote]):
+def cursor_position(vote: RollCallVote) -> Dict[str, int]:
+    return {'congress': vote.congress, 'session': vote.session, 'number': vote.vote_number}
+
+
+def insert_resolved_votes(tx: Transaction, roll_calls: Sequence[Tuple[Dict[str, Any], List[Dict[str, Any]]]], lis_member_ids: Dict[str, str]):
+    """Write roll calls with `insert_roll_call_votes`, and the LIS member IDs learned resolving them"""
+    insert_roll_call_votes(tx, roll_calls)
+    if len(lis_member_ids) != 0:
+        record_lis_member_ids(tx, lis_member_ids)
+
+
+def insert_senate_votes_in_parallel(driver: Driver, votes: Iterator[RollCallVote], resolver: SenatorResolver, votes_per_transaction: int, writers: int, queue_depth: int = 16):
+    """
+    Insert roll calls as they are scraped on `writers` sessions at once, committing
+    `votes_per_transaction` roll calls at a time. See `RollCallWriter`. Senators are resolved
+    on this thread, in order, and the LIS member IDs learned are written with the roll calls
+    they were learned from.
+    """
+    with RollCallWriter(driver, 'senate', models.Chamber.SENATE, writers, queue_depth) as writer:
+        for chunk in batched(votes, max(votes_per_transaction, 1)):
+            roll_calls = [(roll_call_properties(rc_vote), resolve_vote_casts(rc_vote, resolver)) for rc_vote in chunk]
+            learned, resolver.learned_lis_member_ids = resolver.learned_lis_member_ids, {}
+            writer.write(insert_resolved_votes, roll_calls, cursor_position(chunk[-1]), learned)
+
+
+def insert_senate_votes(driver: Driver, votes: Iterator[RollCallVote], resolver: SenatorResolver, votes_per_transaction: int = 1, writers: int = 1, queue_depth: int = 16):
+    """
+    Insert roll calls as they are scraped, committing `votes_per_transaction` roll calls at a time.
+    LIS member IDs the resolver learns, and the scrape cursor, are persisted in the same
+    transaction as the votes. With more than one writer, see `insert_senate_votes_in_parallel`.
+    """
+    if writers > 1:
+        insert_senate_votes_in_parallel(driver, votes, resolver, votes_per_transaction, writers, queue_depth)
+        return
+
     with driver.session() as session:
-        for rc_vote in votes:
-            session.execute_write(insert_single_vote, rc_vote)
+        for chunk in batched(votes, max(votes_per_transaction, 1)):
+            resolved = [(rc_vote, resolve_vote_casts(rc_vote, resolver)) for rc_vote in chunk]
+            learned, resolver.learned_lis_member_ids = resolver.learned_lis_member_ids, {}
+            execute_write(session, 'senate', insert_votes, resolved, learned, rows=len(resolved))
+
+
+def create_senator_resolver(settings: Settings, driver: Optional[Driver]) -> SenatorResolver:
+    try:
+        member_list: Optional[MemberList] = fetch_member_list(settings, HttpClient.from_settings(settings))
+    except (URLError, ET.ParseError) as e:
+        logger.warning("Unable to fetch senate member list, resolving senators from the graph alone: %s", repr(e))
+        member_list = None
+    return SenatorResolver(driver, member_list)
 
 
 def scrape_senate(settings: Settings, driver: Driver):
-    year, session, vote_number = find_resume_point_for_senate(settings, driver)
-    votes = scrape_senate_starting_at(settings, year, session, vote_number)
-    insert_senate_votes(driver, votes)
+    resolver = create_senator_resolver(settings, driver)
+
+    archive = VoteArchive.from_settings(settings)
+    congress, session, vote_number = find_resume_point_for_senate(settings, driver)
+
+    if settings.replay_archive:
+        if archive is None:
+            raise ValueError("Replaying votes requires VOTE_SCRAPER_ARCHIVE_PATH to be set")
+        logger.info("Replaying senate votes from %s", archive.path)
+        documents = replay_senate_starting_at(archive, congress, session, vote_number)
+        # Already archived
+        archive = None
+    else:
+        documents = fetch_senate_starting_at(settings, congress, session, vote_number)
+
+    Pipeline('senate', settings.pipeline_queue_depth).run(
+        ('fetch', documents),
+        [('parse', partial(parse_senate_document, archive=archive))],
+        ('write', partial(
+            insert_senate_votes,
+            driver,
+            resolver=resolver,
+            votes_per_transaction=settings.votes_per_transaction,
+            writers=settings.database_writers,
+            queue_depth=settings.pipeline_queue_depth,
+        )),
+    )
@@ -1,11 +1,12 @@
 from dataclasses import dataclass
 from typing import Optional, Dict
-from urllib.request import urlopen
 import xml.etree.ElementTree as ET
 import logging
 import unidecode
 
 from ..settings import Settings
+from ..http_client import HttpClient
+from .. import metrics
 
 
 logger = logging.getLogger(__name__)
@@ -32,7 +33,7 @@ class MemberList:
     last_updated: str
 
 
-def parse_contact_information(xml_string: str) -> MemberList:
+def parse_contact_information(xml_string: bytes | str) -> MemberList:
     root = ET.fromstring(xml_string)
 
     members = {}
@@ -58,9 +59,11 @@ def parse_contact_information(xml_string: str) -> MemberList:
     return MemberList(members=members, last_updated=last_updated)
 
 
-def fetch_member_list(settings: Settings) -> MemberList:
+def fetch_member_list(settings: Settings, client: Optional[HttpClient] = None) -> MemberList:
   logger.debug("Fetching senate member contact information")
-  with urlopen(settings.senate_member_url) as response:
-    results = parse_contact_information(response.read())
-    logger.info("Got %d senate member's contact info", len(results.members))
-    return results
+  response = (client or HttpClient()).get(settings.senate_member_url)
+  with metrics.timed(metrics.PARSE_SECONDS, source='senate_member_list'):
+    results = parse_contact_information(response.body)
+  metrics.record_document('senate_member_list', len(response.body))
+  logger.info("Got %d senate member's contact info", len(results.members))
+  return results
@@ -0,0 +1,153 @@
+from typing import Dict, Iterable, Optional, Set, Tuple
+import logging
+
+import unidecode
+from neo4j import Driver, Transaction
+
+from .member_list import MemberList
+
+logger = logging.getLogger(__name__)
+
+# Unaccented family name, state code and party abbreviation
+NameKey = Tuple[str, str, str]
+
+
+def _name_key(last_name: str, state: str, party: str) -> NameKey:
+    return unidecode.unidecode(last_name).lower(), state, party
+
+
+class SenatorResolver:
+    """
+    Maps the senators named on roll call votes to bioguide IDs without querying the graph
+    for each vote cast.
+
+    Senators are looked up by LIS member ID first. IDs learned in earlier runs are read from
+    `Legislator.lis_member_id` once, up front. Senators not seen before are matched by family
+    name, state and party against an index of the congress' members, built with one query the
+    first time that congress is seen. Names shared by more than one member of a congress are
+    left out of the index. The Senate's member list settles those, as long as the senator it
+    names served in that congress, but only for the vote at hand: an LIS ID is remembered, so
+    `record_lis_member_ids` can persist it for later runs, only when the name identified a
+    single senator.
+
+    Without a driver nothing is read from the graph, and each congress' members must be given
+    to `index_congress` instead.
+    """
+
+    def __init__(self, driver: Optional[Driver], member_list: Optional[MemberList] = None):
+        self._driver = driver
+        self._by_lis_member_id: Optional[Dict[str, str]] = None
+        self._by_name_for_congress: Dict[int, Dict[NameKey, str]] = {}
+        self._ambiguous_for_congress: Dict[int, Set[NameKey]] = {}
+        self._members_of_congress: Dict[int, Set[str]] = {}
+        self._by_member_list: Dict[NameKey, str] = {}
+        self.learned_lis_member_ids: Dict[str, str] = {}
+
+        if member_list is not None:
+            for member in member_list.members.values():
+                if member.bioguide_id:
+                    key = _name_key(member.last_name, member.state, member.party)
+                    self._by_member_list[key] = member.bioguide_id
+
+    def _lis_member_ids(self) -> Dict[str, str]:
+        if self._by_lis_member_id is None:
+            if self._driver is None:
+                self._by_lis_member_id = {}
+                return self._by_lis_member_id
+            records, _, _ = self._driver.execute_query("""
+                MATCH (l: Legislator)
+                WHERE l.lis_member_id IS NOT NULL
+                RETURN l.lis_member_id AS lis_member_id, l.bioguide_id AS bioguide_id
+            """)
+            self._by_lis_member_id = {r['lis_member_id']: r['bioguide_id'] for r in records}
+            logger.debug("Loaded %d known LIS member ids", len(self._by_lis_member_id))
+        return self._by_lis_member_id
+
+    def _names_for_congress(self, congress: int) -> Dict[NameKey, str]:
+        index = self._by_name_for_congress.get(congress)
+        if index is None:
+            if self._driver is None:
+                return self.index_congress(congress, [])
+            records, _, _ = self._driver.execute_query("""
+                MATCH (l: Legislator)-[:IS_MEMBER_OF_CONGRESS]->(:Congress { number: $congress })
+                MATCH (l)-[:REPRESENTS]->(s: State)
+                MATCH (l)-[:IS_MEMBER_OF_PARTY]->(p: Party)
+                WHERE p.abbreviation IS NOT NULL
+                RETURN DISTINCT l.bioguide_id AS bioguide_id
+                    , l.unaccented_family_name AS family_name
+                    , s.code AS state
+                    , p.abbreviation AS party
+            """, congress=congress)
+            index = self.index_congress(congress, ((r['bioguide_id'], r['family_name'], r['state'], r['party']) for r in records))
+        return index
+
+    def is_indexed(self, congress: int) -> bool:
+        return congress in self._by_name_for_congress
+
+    def index_congress(self, congress: int, members: Iterable[Tuple[str, str, str, str]]) -> Dict[NameKey, str]:
+        """
+        Index the members of `congress` by name, state and party.
+
+        Args:
+            members: `(bioguide_id, unaccented family name, state, party abbreviation)` of every
+                member, once for each state they represented and party they belonged to
+        """
+        index: Dict[NameKey, str] = {}
+        ambiguous: Set[NameKey] = set()
+        bioguide_ids: Set[str] = set()
+        for bioguide_id, family_name, state, party in members:
+            bioguide_ids.add(bioguide_id)
+            key = _name_key(family_name, state, party)
+            if key in ambiguous:
+                continue
+            if key in index and index[key] != bioguide_id:
+                logger.debug("%s (%s-%s) is ambiguous in the %dth congress", family_name, party, state, congress)
+                del index[key]
+                ambiguous.add(key)
+                continue
+            index[key] = bioguide_id
+
+        logger.debug("Indexed %d members of the %dth congress", len(index), congress)
+        self._members_of_congress[congress] = bioguide_ids
+        self._ambiguous_for_congress[congress] = ambiguous
+        self._by_name_for_congress[congress] = index
+        return index
+
+    def resolve(self, congress: int, last_name: Optional[str], state: Optional[str], party: Optional[str], lis_member_id: Optional[str]) -> Optional[str]:
+        """
+        Return the bioguide ID of the senator, or `None` if they can't be found. Senators missing
+        a name, state or party can only be found by LIS member ID.
+        """
+        if lis_member_id:
+            bioguide_id = self._lis_member_ids().get(lis_member_id)
+            if bioguide_id is not None:
+                return bioguide_id
+
+        if last_name is None or state is None or party is None:
+            return None
+
+        key = _name_key(last_name, state, party)
+        bioguide_id = self._names_for_congress(congress).get(key)
+        listed_id = self._by_member_list.get(key)
+        if listed_id is not None and listed_id in self._members_of_congress[congress]:
+            bioguide_id = listed_id
+
+        if key in self._ambiguous_for_congress[congress]:
+            # A guess, however good, mustn't settle who the LIS ID belongs to for good
+            return bioguide_id
+
+        if bioguide_id is not None and lis_member_id:
+            self._lis_member_ids()[lis_member_id] = bioguide_id
+            self.learned_lis_member_ids[lis_member_id] = bioguide_id
+        return bioguide_id
+
+
+def record_lis_member_ids(tx: Transaction, lis_member_ids: Dict[str, str]):
+    tx.run("""
+        UNWIND $senators AS senator
+        MATCH (l: Legislator { bioguide_id: senator.bioguide_id })
+        SET l.lis_member_id = senator.lis_member_id
+    """, senators=[
+        {'lis_member_id': lis_member_id, 'bioguide_id': bioguide_id}
+        for lis_member_id, bioguide_id in lis_member_ids.items()
+    ])
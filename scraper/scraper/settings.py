@@ -9,6 +9,7 @@ DEFAULT_SENATE_MEMBER_URL = (
     "https://www.senate.gov/general/contact_information/senators_cfm.xml"
 )
 DEFAULT_SENATE_URL = "https://www.senate.gov/legislative/LIS/roll_call_votes"
+DEFAULT_SENATE_VOTE_MENU_URL = "https://www.senate.gov/legislative/LIS/roll_call_lists"
 DEFAULT_BIOGUIDE_PATH = "/data/bioguide/BioguideProfiles"
 DEFAULT_CRAWL_DELAY_SECONDS = 0.4
 DEFAULT_NEO4J_URI = "neo4j://localhost:7687"
@@ -16,6 +17,25 @@ DEFAULT_NEO4J_USERNAME = "neo4j"
 DEFAULT_RESUME_YEAR = 2025
 DEFAULT_RESUME_CONGRESS = 119
 DEFAULT_LOG_LEVEL = 'INFO'
+DEFAULT_BIOGUIDE_BATCH_SIZE = 250
+DEFAULT_BIOGUIDE_PARSE_WORKERS = 0
+DEFAULT_BIOGUIDE_QUEUE_DEPTH = 1000
+DEFAULT_BIOGUIDE_FULL_REFRESH = False
+DEFAULT_BIOGUIDE_STRICT = False
+DEFAULT_VOTES_PER_TRANSACTION = 1
+DEFAULT_DATABASE_WRITERS = 1
+DEFAULT_WRITE_RETRY_SECONDS = 30.0
+DEFAULT_FETCH_CONCURRENCY = 4
+DEFAULT_DISCOVER_RANGES = True
+DEFAULT_REPLAY_ARCHIVE = False
+DEFAULT_PIPELINE_QUEUE_DEPTH = 16
+DEFAULT_AGREEMENT_FULL_REBUILD = False
+DEFAULT_METRICS_PORT = 0
+
+def _parse_bool(value: Optional[str], default: bool) -> bool:
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
 
 @dataclass
 class Settings:
@@ -23,6 +43,7 @@ class Settings:
     crawl_delay_seconds: float
     senate_member_url: str
     senate_url: str
+    senate_vote_menu_url: str
     bioguide_path: str
     neo4j_uri: str
     neo4j_username: str
@@ -30,6 +51,24 @@ class Settings:
     resume_year: int
     resume_congress: int
     log_level: int
+    bioguide_batch_size: int
+    bioguide_parse_workers: int
+    bioguide_queue_depth: int
+    bioguide_full_refresh: bool
+    bioguide_strict: bool
+    votes_per_transaction: int
+    database_writers: int
+    write_retry_seconds: float
+    fetch_concurrency: int
+    discover_ranges: bool
+    http_cache_path: Optional[str]
+    archive_path: Optional[str]
+    replay_archive: bool
+    pipeline_queue_depth: int
+    agreement_full_rebuild: bool
+    metrics_port: int
+    metrics_textfile: Optional[str]
+    snapshot_path: Optional[str]
 
     @classmethod
     def from_environs(cls) -> Self:
@@ -39,6 +78,7 @@ class Settings:
                 f"{PREFIX}_SENATE_MEMBER_URL", DEFAULT_SENATE_MEMBER_URL
             ),
             senate_url=os.environ.get(f"{PREFIX}_SENATE_URL", DEFAULT_SENATE_URL),
+            senate_vote_menu_url=os.environ.get(f"{PREFIX}_SENATE_VOTE_MENU_URL", DEFAULT_SENATE_VOTE_MENU_URL),
             bioguide_path=os.environ.get(f"{PREFIX}_BIOGUIDE_PATH", DEFAULT_BIOGUIDE_PATH),
             crawl_delay_seconds=float(
                 os.environ.get(
@@ -52,5 +92,23 @@ class Settings:
             neo4j_password=os.environ.get(f"{PREFIX}_NEO4J_PASSWORD"),
             resume_year=int(os.environ.get(f'{PREFIX}_RESUME_YEAR', DEFAULT_RESUME_YEAR)),
             resume_congress=int(os.environ.get(f'{PREFIX}_RESUME_CONGRESS', DEFAULT_RESUME_CONGRESS)),
-            log_level=getattr(logging, os.environ.get(f'{PREFIX}_LOG_LEVEL', DEFAULT_LOG_LEVEL))
+            log_level=getattr(logging, os.environ.get(f'{PREFIX}_LOG_LEVEL', DEFAULT_LOG_LEVEL)),
+            bioguide_batch_size=int(os.environ.get(f'{PREFIX}_BIOGUIDE_BATCH_SIZE', DEFAULT_BIOGUIDE_BATCH_SIZE)),
+            bioguide_parse_workers=int(os.environ.get(f'{PREFIX}_BIOGUIDE_PARSE_WORKERS', DEFAULT_BIOGUIDE_PARSE_WORKERS)),
+            bioguide_queue_depth=int(os.environ.get(f'{PREFIX}_BIOGUIDE_QUEUE_DEPTH', DEFAULT_BIOGUIDE_QUEUE_DEPTH)),
+            bioguide_full_refresh=_parse_bool(os.environ.get(f'{PREFIX}_BIOGUIDE_FULL_REFRESH'), DEFAULT_BIOGUIDE_FULL_REFRESH),
+            bioguide_strict=_parse_bool(os.environ.get(f'{PREFIX}_BIOGUIDE_STRICT'), DEFAULT_BIOGUIDE_STRICT),
+            votes_per_transaction=int(os.environ.get(f'{PREFIX}_VOTES_PER_TRANSACTION', DEFAULT_VOTES_PER_TRANSACTION)),
+            database_writers=int(os.environ.get(f'{PREFIX}_DATABASE_WRITERS', DEFAULT_DATABASE_WRITERS)),
+            write_retry_seconds=float(os.environ.get(f'{PREFIX}_WRITE_RETRY_SECONDS', DEFAULT_WRITE_RETRY_SECONDS)),
+            fetch_concurrency=int(os.environ.get(f'{PREFIX}_FETCH_CONCURRENCY', DEFAULT_FETCH_CONCURRENCY)),
+            discover_ranges=_parse_bool(os.environ.get(f'{PREFIX}_DISCOVER_RANGES'), DEFAULT_DISCOVER_RANGES),
+            http_cache_path=os.environ.get(f'{PREFIX}_HTTP_CACHE_PATH'),
+            archive_path=os.environ.get(f'{PREFIX}_ARCHIVE_PATH'),
+            replay_archive=_parse_bool(os.environ.get(f'{PREFIX}_REPLAY_ARCHIVE'), DEFAULT_REPLAY_ARCHIVE),
+            pipeline_queue_depth=int(os.environ.get(f'{PREFIX}_PIPELINE_QUEUE_DEPTH', DEFAULT_PIPELINE_QUEUE_DEPTH)),
+            agreement_full_rebuild=_parse_bool(os.environ.get(f'{PREFIX}_AGREEMENT_FULL_REBUILD'), DEFAULT_AGREEMENT_FULL_REBUILD),
+            metrics_port=int(os.environ.get(f'{PREFIX}_METRICS_PORT', DEFAULT_METRICS_PORT)),
+            metrics_textfile=os.environ.get(f'{PREFIX}_METRICS_TEXTFILE'),
+            snapshot_path=os.environ.get(f'{PREFIX}_SNAPSHOT_PATH'),
         )
\ No newline at end of file
@@ -0,0 +1,353 @@
+"""
+Export legislators, roll calls and every vote cast to a columnar snapshot on disk, so analysis
+can read decades of votes without going through the database.
+
+Every column is a one dimensional `.npy` file, opened memory-mapped so nothing is read until it
+is used. Votes are stored roll call by roll call, as in a compressed sparse row matrix: the votes
+of roll call `i` are `vote_legislators[start:end]` and `vote_codes[start:end]`, where `end` is
+`roll_call_vote_ends[i]` and `start` the end of the roll call before it. Legislators, chambers and
+votes are stored as indexes into `legislators.json` and the dictionaries in `manifest.json`.
+
+Each export appends only the roll calls added since the last one, growing the columns in place.
+The manifest is written last, so a snapshot interrupted part way through an export still opens
+as it was before, and the next export overwrites what was left behind.
+
+Usage:
+    python -m scraper.snapshot export PATH
+    python -m scraper.snapshot info PATH
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+from neo4j import Driver
+
+from .settings import Settings
+from .database import connect
+from .checkpoint import read_cursor
+from .house import congress_and_session_for_year
+import scraper.models as models
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+MANIFEST = 'manifest.json'
+LEGISLATORS = 'legislators.json'
+
+# Roll calls read from the database before their votes are appended to the snapshot
+EXPORT_CHUNK_SIZE = 10000
+
+# Column files and the type of their elements. Roll call columns have one element per roll call,
+# vote columns one per vote.
+ROLL_CALL_COLUMNS: Dict[str, np.dtype] = {
+    'roll_call_chamber': np.dtype(np.uint8),
+    'roll_call_congress': np.dtype(np.int16),
+    'roll_call_session': np.dtype(np.int8),
+    'roll_call_number': np.dtype(np.int32),
+    'roll_call_when': np.dtype('datetime64[s]'),
+    'roll_call_vote_ends': np.dtype(np.int64),
+}
+VOTE_COLUMNS: Dict[str, np.dtype] = {
+    'vote_legislators': np.dtype(np.int32),
+    'vote_codes': np.dtype(np.int8),
+}
+
+
+def _read_header(f: BinaryIO) -> Tuple[Tuple[int, ...], np.dtype, int]:
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+    return shape, dtype, f.tell()
+
+
+def _append_column(path: str, dtype: np.dtype, length: int, values: np.ndarray):
+    """
+    Write `values` after the first `length` elements of the column at `path`, creating it if
+    needed. Anything after those `length` elements is left over from an interrupted export and is
+    overwritten.
+    """
+    _create_column(path, dtype)
+
+    with open(path, 'r+b') as f:
+        shape, stored_dtype, header_length = _read_header(f)
+        if stored_dtype != dtype or len(shape) != 1 or shape[0] < length:
+            raise ValueError(f"{path} does not hold {length} elements of {dtype}, is it part of this snapshot?")
+
+        f.seek(header_length + length * dtype.itemsize)
+        f.truncate()
+        f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+        # The shape is updated once the elements it covers are written. numpy leaves room in the
+        # header for the shape to grow, so it is rewritten in place.
+        f.seek(0)
+        np.lib.format.write_array_header_1_0(f, {
+            'descr': np.lib.format.dtype_to_descr(dtype),
+            'fortran_order': False,
+            'shape': (length + len(values),),
+        })
+        if f.tell() != header_length:
+            raise ValueError(f"The header of {path} can't grow in place")
+
+
+def _create_column(path: str, dtype: np.dtype):
+    if not os.path.exists(path):
+        np.save(path, np.zeros(0, dtype=dtype))
+
+
+def _read_dictionaries(path: str) -> Tuple[Dict[str, Any], List[str]]:
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest['version'] != SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot at {path} is version {manifest['version']}, expected {SNAPSHOT_VERSION}")
+    with open(os.path.join(path, LEGISLATORS)) as f:
+        return manifest, json.load(f)
+
+
+def _write_json(path: str, value: Any):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(value, f)
+    os.replace(tmp_path, path)
+
+
+@dataclass
+class Snapshot:
+    """
+    A snapshot opened for reading. Columns are read-only memory maps of exactly the roll calls and
+    votes recorded in the manifest.
+    """
+    path: str
+    manifest: Dict[str, Any]
+    # Bioguide ID of each legislator, by index
+    legislators: List[str]
+    # Every column in `ROLL_CALL_COLUMNS` and `VOTE_COLUMNS`, by name
+    columns: Dict[str, np.ndarray]
+
+    @classmethod
+    def open(cls, path: str) -> 'Snapshot':
+        manifest, legislators = _read_dictionaries(path)
+        columns = {}
+        for names, length in ((ROLL_CALL_COLUMNS, manifest['roll_calls']), (VOTE_COLUMNS, manifest['votes'])):
+            for name in names:
+                columns[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')[:length]
+        return cls(path, manifest, legislators, columns)
+
+    @property
+    def chambers(self) -> List[str]:
+        return self.manifest['chambers']
+
+    @property
+    def vote_values(self) -> List[Optional[str]]:
+        """Vote cast for each vote code. Code 0 is never stored, so a dense matrix can use it for no vote"""
+        return self.manifest['vote_values']
+
+    def __len__(self) -> int:
+        return self.manifest['roll_calls']
+
+    def votes(self, roll_call: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Index of each legislator voting on a roll call, and the code of the vote they cast"""
+        ends = self.columns['roll_call_vote_ends']
+        start = int(ends[roll_call - 1]) if roll_call > 0 else 0
+        end = int(ends[roll_call])
+        return self.columns['vote_legislators'][start:end], self.columns['vote_codes'][start:end]
+
+    def matrix(self, roll_calls: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Votes on the given roll calls as a dense legislator × roll call matrix of vote codes, 0 where
+        a legislator did not vote. Only legislators voting on at least one of the roll calls get a row.
+
+        Returns:
+            Index of each row's legislator, and the matrix
+        """
+        spans = [self.votes(int(roll_call)) for roll_call in roll_calls]
+        rows, row_of = np.unique(np.concatenate([legislators for legislators, _ in spans] or [np.zeros(0, np.int32)]), return_inverse=True)
+        codes = np.zeros((len(rows), len(spans)), dtype=np.int8)
+        start = 0
+        for column, (legislators, vote_codes) in enumerate(spans):
+            codes[row_of[start:start + len(legislators)], column] = vote_codes
+            start += len(legislators)
+        return rows, codes
+
+
+def _empty_manifest() -> Dict[str, Any]:
+    return {
+        'version': SNAPSHOT_VERSION,
+        'roll_calls': 0,
+        'votes': 0,
+        'chambers': [],
+        'vote_values': [None],
+        # Key of the last roll call exported from each chamber, as [congress, session, number]
+        'last_exported': {},
+        'exported_at': None,
+    }
+
+
+class _Appender:
+    """Buffers roll calls read from the database and appends them to the snapshot's columns"""
+
+    def __init__(self, path: str, manifest: Dict[str, Any], legislators: List[str]):
+        self.path = path
+        self.manifest = manifest
+        self.legislators = legislators
+        self._legislator_index = {bioguide_id: i for i, bioguide_id in enumerate(legislators)}
+        self._chamber_codes = {chamber: i for i, chamber in enumerate(manifest['chambers'])}
+        self._vote_codes = {vote: i for i, vote in enumerate(manifest['vote_values']) if vote is not None}
+        self._clear()
+
+        # Created up front, so a snapshot of a database without roll calls still opens
+        for name, dtype in {**ROLL_CALL_COLUMNS, **VOTE_COLUMNS}.items():
+            _create_column(os.path.join(path, f"{name}.npy"), dtype)
+
+    def _clear(self):
+        self._roll_calls: Dict[str, List[Any]] = {name: [] for name in ROLL_CALL_COLUMNS}
+        self._votes: Dict[str, List[int]] = {name: [] for name in VOTE_COLUMNS}
+
+    def _code(self, codes: Dict[str, int], values: List[Any], value: str, limit: int) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            if code > limit:
+                raise ValueError(f"Too many distinct values to encode, the latest being {value!r}")
+            values.append(value)
+        return code
+
+    def add(self, chamber: str, congress: int, session: int, number: int, when: datetime, votes: List[Tuple[str, str]]):
+        for bioguide_id, vote in votes:
+            legislator = self._legislator_index.get(bioguide_id)
+            if legislator is None:
+                legislator = self._legislator_index[bioguide_id] = len(self.legislators)
+                self.legislators.append(bioguide_id)
+            self._votes['vote_legislators'].append(legislator)
+            self._votes['vote_codes'].append(self._code(self._vote_codes, self.manifest['vote_values'], vote, np.iinfo(np.int8).max))
+
+        columns = self._roll_calls
+        columns['roll_call_chamber'].append(self._code(self._chamber_codes, self.manifest['chambers'], chamber, np.iinfo(np.uint8).max))
+        columns['roll_call_congress'].append(congress)
+        columns['roll_call_session'].append(session)
+        columns['roll_call_number'].append(number)
+        columns['roll_call_when'].append(np.datetime64(when.replace(tzinfo=None), 's'))
+        columns['roll_call_vote_ends'].append(self.manifest['votes'] + len(self._votes['vote_codes']))
+        self.manifest['last_exported'][chamber] = [congress, session, number]
+
+    def flush(self):
+        """Append everything added so far to the columns, without yet committing it to the manifest"""
+        for columns, dtypes, key in ((self._roll_calls, ROLL_CALL_COLUMNS, 'roll_calls'), (self._votes, VOTE_COLUMNS, 'votes')):
+            for name, dtype in dtypes.items():
+                _append_column(os.path.join(self.path, f"{name}.npy"), dtype, self.manifest[key], np.array(columns[name], dtype=dtype))
+        self.manifest['roll_calls'] += len(self._roll_calls['roll_call_number'])
+        self.manifest['votes'] += len(self._votes['vote_codes'])
+        self._clear()
+
+
+def _written_up_to(driver: Driver, chamber: models.Chamber) -> Optional[List[int]]:
+    """
+    Key of the last roll call of `chamber` that every roll call before it has been written up to,
+    as [congress, session, number], or `None` if the chamber has no scrape cursor
+    """
+    cursor = read_cursor(driver, chamber)
+    if cursor is None:
+        return None
+    if chamber == models.Chamber.HOUSE_OF_REPS:
+        congress, session = congress_and_session_for_year(cursor['year'])
+        return [congress, session, cursor['number']]
+    return [cursor['congress'], cursor['session'], cursor['number']]
+
+
+def export_snapshot(driver: Driver, path: str) -> Tuple[int, int]:
+    """
+    Append every roll call added since the snapshot at `path` was last exported, creating it if
+    there's none.
+
+    Roll calls are exported in order of congress, session and number within each chamber, and
+    those up to the last one exported are taken to be in the snapshot already. Parallel writers
+    commit roll calls out of that order, so only roll calls up to the chamber's scrape cursor,
+    before which none are missing, are exported. Those committed after it are exported once the
+    cursor passes them.
+
+    Returns:
+        Number of roll calls and votes appended
+    """
+    os.makedirs(path, exist_ok=True)
+    manifest_path = os.path.join(path, MANIFEST)
+    if os.path.exists(manifest_path):
+        # Columns aren't mapped, since what follows the manifest's lengths may be truncated
+        manifest, legislators = _read_dictionaries(path)
+    else:
+        manifest, legislators = _empty_manifest(), []
+
+    roll_calls, votes = manifest['roll_calls'], manifest['votes']
+    appender = _Appender(path, manifest, legislators)
+    with driver.session() as session:
+        chambers = [record['chamber'] for record in session.run("MATCH (rc: RollCall) RETURN DISTINCT rc.chamber AS chamber ORDER BY chamber")]
+        for chamber in chambers:
+            congress, roll_call_session, number = manifest['last_exported'].get(chamber, [0, 0, 0])
+            result = session.run("""
+                MATCH (rc: RollCall {chamber: $chamber})
+                WHERE (rc.congress > $congress
+                        OR (rc.congress = $congress AND (rc.session > $session OR (rc.session = $session AND rc.number > $number))))
+                    AND ($written IS NULL
+                        OR rc.congress < $written[0]
+                        OR (rc.congress = $written[0] AND (rc.session < $written[1] OR (rc.session = $written[1] AND rc.number <= $written[2]))))
+                OPTIONAL MATCH (rc)<-[v:VOTED_ON]-(l: Legislator)
+                WITH rc, collect([l.bioguide_id, v.vote]) AS votes
+                RETURN rc.congress AS congress
+                    , rc.session AS session
+                    , rc.number AS number
+                    , rc.when AS when
+                    , [vote IN votes WHERE vote[0] IS NOT NULL] AS votes
+                ORDER BY congress, session, number
+            """, chamber=chamber, congress=congress, session=roll_call_session, number=number,
+                written=_written_up_to(driver, models.Chamber(chamber)))
+
+            exported = 0
+            for record in result:
+                appender.add(chamber, record['congress'], record['session'], record['number'], record['when'].to_native(), record['votes'])
+                exported += 1
+                if exported % EXPORT_CHUNK_SIZE == 0:
+                    appender.flush()
+            appender.flush()
+            logger.info("Exported %d %s roll calls", exported, chamber)
+
+    manifest['exported_at'] = datetime.now(timezone.utc).isoformat()
+    _write_json(os.path.join(path, LEGISLATORS), legislators)
+    _write_json(manifest_path, manifest)
+
+    added = (manifest['roll_calls'] - roll_calls, manifest['votes'] - votes)
+    logger.info("Snapshot at %s now holds %d roll calls and %d votes, %d and %d of them new", path, manifest['roll_calls'], manifest['votes'], *added)
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("export", "info"))
+    parser.add_argument("path", help="Directory holding the snapshot")
+    args = parser.parse_args()
+
+    settings = Settings.from_environs()
+    logging.basicConfig(level=settings.log_level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    if args.command == "export":
+        driver = connect(settings)
+        try:
+            export_snapshot(driver, args.path)
+        finally:
+            driver.close()
+    else:
+        snapshot = Snapshot.open(args.path)
+        print(f"exported at:  {snapshot.manifest['exported_at']}")
+        print(f"legislators:  {len(snapshot.legislators)}")
+        print(f"roll calls:   {len(snapshot)}")
+        print(f"votes:        {snapshot.manifest['votes']}")
+        for chamber, last in snapshot.manifest['last_exported'].items():
+            print(f"last {chamber}:  {'-'.join(str(part) for part in last)}")
+
+
+if __name__ == "__main__":
+    main()
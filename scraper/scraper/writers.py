@@ -0,0 +1,219 @@
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from operator import itemgetter
+from queue import Queue
+from threading import Event, Thread
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Sequence, Tuple
+import logging
+
+from neo4j import Driver, Transaction
+
+import scraper.models as models
+from .database import execute_write, update_current_memberships
+from .checkpoint import advance_cursor
+
+logger = logging.getLogger(__name__)
+
+# (`$rc`, `$votes`) of a roll call, as built for `INSERT_ROLL_CALL_QUERY`
+RollCallParameters = Tuple[Dict[str, Any], List[Dict[str, Any]]]
+
+
+class ParallelWriter:
+    """
+    Runs write transactions on `writers` sessions at once, each session on its own thread.
+
+    Work is submitted with a partition key, e.g. a roll call or a bioguide ID, and work with the
+    same key always goes to the same writer, which runs it in the order it was submitted. Two
+    writers never race to MERGE the same roll call or legislator, and locks are only contended
+    on the nodes different keys share.
+
+    Each writer holds at most `queue_depth` transactions waiting to run, after which `submit`
+    blocks, so a slow database holds back whatever feeds it.
+
+    Leaving the writer's context waits for submitted work to finish. If the block raised,
+    work that hasn't started yet is cancelled instead.
+    """
+
+    def __init__(self, driver: Driver, stage: str, writers: int, queue_depth: int = 16):
+        self.stage = stage
+        self._cancelled = Event()
+        self._queues: List[Queue] = [Queue(maxsize=max(queue_depth, 1)) for _ in range(max(writers, 1))]
+        self._threads = [
+            Thread(target=self._run, args=(driver, queue), name=f'{stage}-writer-{i}', daemon=True)
+            for i, queue in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def writers(self) -> int:
+        return len(self._queues)
+
+    def partition(self, key: Hashable) -> int:
+        """Index of the writer work submitted with `key` runs on"""
+        return hash(key) % len(self._queues)
+
+    def submit(self, key: Hashable, work: Callable[..., Any], *args, rows: Optional[int] = None) -> Future:
+        """Run `execute_write(session, stage, work, *args, rows=rows)` on the writer for `key`"""
+        future: Future = Future()
+        self._queues[self.partition(key)].put((future, work, args, rows))
+        return future
+
+    def _run(self, driver: Driver, jobs: Queue):
+        with driver.session() as session:
+            while True:
+                job = jobs.get()
+                if job is None:
+                    return
+
+                future, work, args, rows = job
+                if self._cancelled.is_set():
+                    future.cancel()
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                try:
+                    future.set_result(execute_write(session, self.stage, work, *args, rows=rows))
+                except BaseException as e:
+                    future.set_exception(e)
+
+    def close(self, cancel: bool = False):
+        """Wait for the writers to finish, first cancelling any work not yet started when `cancel` is set"""
+        if cancel:
+            self._cancelled.set()
+        for queue in self._queues:
+            queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self) -> 'ParallelWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close(cancel=exc is not None)
+
+
+@dataclass
+class _PendingRollCalls:
+    future: Future
+    memberships: List[Dict[str, Any]]
+    position: Dict[str, int]
+
+
+def _finish_roll_calls(tx: Transaction, chamber: models.Chamber, legislators: List[Dict[str, Any]], position: Dict[str, int]):
+    if len(legislators) != 0:
+        update_current_memberships(tx, legislators)
+    advance_cursor(tx, chamber, position)
+
+
+class RollCallWriter:
+    """
+    Writes roll calls of one chamber on a `ParallelWriter`, partitioned by roll call, so several
+    chunks of roll calls are committed at once and in any order.
+
+    The parts of a roll call that depend on the order they are written in are taken out of
+    the parallel transactions: each voter's current state and party, which every roll call
+    would otherwise update, and the chamber's scrape cursor. Once every chunk up to some
+    point has committed, one transaction on this writer's own session moves the legislators
+    whose state or party changed over those chunks, and advances the cursor to the last of
+    them. Resuming after a failure starts after the last chunk finished this way, so chunks
+    that committed out of order are written again, which MERGE makes harmless.
+
+    Votes are written in bioguide ID order, so transactions writing different roll calls lock
+    the legislators they share in the same order rather than deadlocking.
+    """
+
+    def __init__(self, driver: Driver, stage: str, chamber: models.Chamber, writers: int, queue_depth: int = 16):
+        self.stage = stage
+        self.chamber = chamber
+        self._writer = ParallelWriter(driver, stage, writers, queue_depth)
+        self._session = driver.session()
+        self._pending: Deque[_PendingRollCalls] = deque()
+        # Current state and party of each legislator, as last written by this writer
+        self._memberships: Dict[str, Tuple[str, str]] = {}
+
+    def write(self, work: Callable[..., Any], roll_calls: Sequence[RollCallParameters], position: Dict[str, int], *args):
+        """
+        Submit a chunk of roll calls, to be written by `work(tx, roll_calls, *args)`.
+
+        Args:
+            work: Writes the roll calls without updating the voters' current state and party,
+                e.g. `insert_roll_call_votes`
+            roll_calls: Parameters of each roll call, in the order they were voted on
+            position: Scrape cursor position of the last of the roll calls
+        """
+        roll_calls = [(rc, sorted(votes, key=itemgetter('bioguide_id'))) for rc, votes in roll_calls]
+        memberships = [
+            {'bioguide_id': vote['bioguide_id'], 'state': vote['state'], 'party': vote['party']}
+            for _, votes in roll_calls
+            for vote in votes
+        ]
+        key = tuple(position.values())
+        future = self._writer.submit(key, work, roll_calls, *args, rows=len(roll_calls))
+        self._pending.append(_PendingRollCalls(future, memberships, position))
+        self._finish(wait=False)
+
+    def _finish(self, wait: bool, raise_failure: bool = True):
+        """
+        Finish every chunk that has committed along with all the chunks before it, waiting for
+        each chunk in turn when `wait` is set. A chunk that failed stops this, once the ones
+        before it are finished.
+        """
+        finished: List[_PendingRollCalls] = []
+        failure: Optional[BaseException] = None
+        while len(self._pending) != 0 and (wait or self._pending[0].future.done()):
+            future = self._pending[0].future
+            if future.cancelled():
+                break
+            failure = future.exception()
+            if failure is not None:
+                break
+            finished.append(self._pending.popleft())
+
+        if len(finished) != 0:
+            # The latest state and party of each voter over the finished roll calls
+            latest: Dict[str, Tuple[str, str]] = {}
+            for chunk in finished:
+                for membership in chunk.memberships:
+                    latest[membership['bioguide_id']] = (membership['state'], membership['party'])
+
+            changed = {bioguide_id: membership for bioguide_id, membership in latest.items() if self._memberships.get(bioguide_id) != membership}
+            legislators = [
+                {'bioguide_id': bioguide_id, 'state': state, 'party': party}
+                for bioguide_id, (state, party) in sorted(changed.items())
+            ]
+            execute_write(self._session, self.stage, _finish_roll_calls, self.chamber, legislators, finished[-1].position)
+            self._memberships.update(changed)
+
+        if failure is not None and raise_failure:
+            raise failure
+
+    def close(self):
+        """Wait for every chunk submitted to be written and finished"""
+        try:
+            self._finish(wait=True)
+        except BaseException:
+            self._abort()
+            raise
+        self._writer.close()
+        self._session.close()
+
+    def _abort(self):
+        """Cancel chunks not yet started, and finish those already written so resuming doesn't write them again"""
+        self._writer.close(cancel=True)
+        try:
+            self._finish(wait=True, raise_failure=False)
+        except Exception as e:
+            logger.error("Unable to finish %s roll calls already written: %s", self.stage, repr(e))
+        finally:
+            self._session.close()
+
+    def __enter__(self) -> 'RollCallWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc is None:
+            self.close()
+        else:
+            self._abort()
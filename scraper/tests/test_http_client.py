@@ -0,0 +1,146 @@
+import gzip
+import os
+import socket
+from typing import List, Tuple
+from urllib.error import HTTPError, URLError
+
+import pytest
+
+from benchmarks.stand_in import StandIn, _Handler
+from scraper.http_client import HttpCache, HttpClient
+
+VOTE = b"<rollcall-vote><vote-metadata><rollcall-num>1</rollcall-num></vote-metadata></rollcall-vote>"
+
+
+class _RecordingHandler(_Handler):
+    """
+    Records the client port and headers of every request. Also redirects `/moved/...` to
+    `/...`, and drops the connection after answering `/drop/...`, without telling the client,
+    as a server timing out an idle keep-alive connection does.
+    """
+    server: "_RecordingStandIn"
+
+    def do_GET(self):
+        self.server.requests.append((self.client_address[1], self.path, dict(self.headers)))
+        if self.path.startswith("/moved/"):
+            self.send_response(301)
+            self.send_header("Location", self.path[len("/moved"):])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path.startswith("/drop/"):
+            self.path = self.path[len("/drop"):]
+            super().do_GET()
+            self.close_connection = True
+        else:
+            super().do_GET()
+
+
+class _RecordingStandIn(StandIn):
+    handler_class = _RecordingHandler
+
+    def __init__(self, root: str):
+        super().__init__(root)
+        self.requests: List[Tuple[int, str, dict]] = []
+
+    def ports(self) -> List[int]:
+        return [port for port, _, _ in self.requests]
+
+
+@pytest.fixture
+def server(tmp_path):
+    os.makedirs(tmp_path / "evs" / "2024")
+    (tmp_path / "evs" / "2024" / "roll001.xml").write_bytes(VOTE)
+    (tmp_path / "evs" / "2024" / "roll002.xml").write_bytes(VOTE.replace(b">1<", b">2<"))
+    with _RecordingStandIn(str(tmp_path)) as stand_in:
+        yield stand_in
+
+
+def test_reuses_connection(server):
+    client = HttpClient()
+    client.get(f"{server.base_url}/evs/2024/roll001.xml")
+    client.get(f"{server.base_url}/evs/2024/roll002.xml")
+    client.get(f"{server.base_url}/evs/2024/roll001.xml")
+
+    assert len(server.requests) == 3
+    assert len(set(server.ports())) == 1
+
+
+def test_decompresses_gzip(server):
+    response = HttpClient().get(f"{server.base_url}/evs/2024/roll001.xml")
+
+    assert server.requests[0][2]["Accept-Encoding"] == "gzip"
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.body == VOTE
+
+
+def test_serves_not_modified_from_cache(server, tmp_path):
+    client = HttpClient(cache=HttpCache(str(tmp_path / "cache")))
+    url = f"{server.base_url}/evs/2024/roll001.xml"
+
+    first = client.get(url)
+    second = client.get(url)
+
+    assert not first.not_modified
+    assert "If-None-Match" not in server.requests[0][2]
+    assert server.requests[1][2]["If-None-Match"] == first.headers["ETag"]
+    assert server.requests[1][2]["If-Modified-Since"] == first.headers["Last-Modified"]
+    assert second.status == 304
+    assert second.not_modified
+    assert second.body == VOTE
+
+
+def test_refetches_changed_document(server, tmp_path):
+    client = HttpClient(cache=HttpCache(str(tmp_path / "cache")))
+    url = f"{server.base_url}/evs/2024/roll001.xml"
+    client.get(url)
+
+    changed = VOTE.replace(b">1<", b">10<")
+    path = tmp_path / "evs" / "2024" / "roll001.xml"
+    path.write_bytes(changed)
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 10**9))
+
+    response = client.get(url)
+    assert not response.not_modified
+    assert response.body == changed
+
+
+def test_follows_redirects(server):
+    response = HttpClient().get(f"{server.base_url}/moved/evs/2024/roll002.xml")
+
+    assert [path for _, path, _ in server.requests] == ["/moved/evs/2024/roll002.xml", "/evs/2024/roll002.xml"]
+    assert response.url == f"{server.base_url}/evs/2024/roll002.xml"
+    assert response.body == VOTE.replace(b">1<", b">2<")
+
+
+def test_raises_http_error(server):
+    with pytest.raises(HTTPError) as raised:
+        HttpClient().get(f"{server.base_url}/evs/2024/roll003.xml")
+    assert raised.value.status == 404
+
+
+def test_reconnects_after_server_closes_connection(server):
+    client = HttpClient()
+    client.get(f"{server.base_url}/drop/evs/2024/roll001.xml")
+    response = client.get(f"{server.base_url}/evs/2024/roll002.xml")
+
+    assert response.body == VOTE.replace(b">1<", b">2<")
+    ports = server.ports()
+    # The second request is only answered on a new connection
+    assert ports[-1] != ports[0]
+    assert [path for _, path, _ in server.requests][-1] == "/evs/2024/roll002.xml"
+
+
+def test_raises_url_error_on_timeout():
+    # Accepts connections, through the backlog, but never answers
+    with socket.create_server(("127.0.0.1", 0)) as silent:
+        host, port = silent.getsockname()
+        with pytest.raises(URLError) as raised:
+            HttpClient(timeout=0.2).get(f"http://{host}:{port}/evs/2024/roll001.xml")
+    assert isinstance(raised.value.reason, TimeoutError)
+
+
+def test_raises_url_error_when_refused():
+    with socket.create_server(("127.0.0.1", 0)) as closed:
+        host, port = closed.getsockname()
+    with pytest.raises(URLError):
+        HttpClient().get(f"http://{host}:{port}/evs/2024/roll001.xml")
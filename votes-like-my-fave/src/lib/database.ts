@@ -75,20 +75,12 @@ export type VotePartySummary = {
 
 export async function voteSummaryByParty(bioguide_id: string, party_abbr: string): Promise<VotePartySummary | undefined> {
   const query = `
-    MATCH (p: Party {abbreviation: $party_abbr})
-    MATCH (l: Legislator)-[:CURRENTLY_MEMBER_OF]->(p)
-    MATCH (l)-[vote:VOTED_ON]->(rc: RollCall)
-    WITH rc, vote.vote as vote, count(vote.vote) as vote_count
-    WITH rc, apoc.agg.maxItems(vote, vote_count) as max_data
     MATCH (l: Legislator { bioguide_id: $bioguide_id })
-    MATCH (l)-[vote:VOTED_ON]->(rc)
-    WHERE vote.vote <> "Not Voting"
-    WITH l, sum(toInteger(vote.vote = max_data.items[0])) as votes_with, count(vote) as total_votes
-    RETURN votes_with
-        , total_votes
-        , toFloat(votes_with)/total_votes as percent_with
-        , total_votes - votes_with as votes_against
-    LIMIT 1
+    WHERE l['total_votes_' + $party_abbr] > 0
+    RETURN l['votes_with_' + $party_abbr] as votes_with
+        , l['total_votes_' + $party_abbr] as total_votes
+        , l['percent_with_' + $party_abbr] as percent_with
+        , l['votes_against_' + $party_abbr] as votes_against
   `;
 
   const { records } = await driver.executeQuery(query, {bioguide_id, party_abbr});
@@ -127,14 +119,9 @@ export type SimilarityStatistics = {
 
 export async function getSimilaritiesFor(bioguide_id: string): Promise<SimilarityStatistics> {
   const query = `
-    MATCH (l1: Legislator { bioguide_id: $bioguide_id })
-    MATCH (l1)-[v1:VOTED_ON]-(rc: RollCall)
-          , (l2)-[v2: VOTED_ON]-(rc)
-    WHERE v1.vote <> "Not Voting" and v2.vote <> "Not Voting"
-    WITH l2, sum(toInteger(v1.vote = v2.vote)) as votes_together, sum(toInteger(v1.vote <> v2.vote)) as votes_againsts
-    WITH *, votes_together + votes_againsts as votes_total
-    WITH *, toFloat(votes_together) / votes_total as percent_agreement
-    WHERE votes_total > $min_vote_threshold
+    MATCH (l1: Legislator { bioguide_id: $bioguide_id })-[a:AGREES_WITH]-(l2: Legislator)
+    WHERE a.votes_total > $min_vote_threshold
+    WITH l2, a.votes_together as votes_together, a.votes_against as votes_againsts, a.votes_total as votes_total, a.percent_agreement as percent_agreement
     MATCH (l2)-[:CURRENTLY_MEMBER_OF]-(p: Party)
     MATCH (l2)-[:CURRENTLY_REPRESENTS]-(s: State)
     RETURN l2.bioguide_id as bioguide_id